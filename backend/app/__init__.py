@@ -1,19 +1,28 @@
 import os
+import json
 from flask import Flask
 from dotenv import load_dotenv
 from flask_cors import CORS
-from openai import OpenAI
 from .extensions import db, migrate, bcrypt, login_manager
+from .services.database import build_engine_options, configure_engine
+from .services.fx import init_fx
+from .services.copywriter import init_copywriter
+from .services.rate_limit import limiter
+from .services.profiler import init_profiler
+from .services.popular_queries import popular_queries
+from .services.maintenance import init_maintenance
+from .commands import register_commands
 
 # Import our new Blueprints
 from .routes.auth import auth_bp
 from .routes.workshop import workshop_bp
-from .routes.api import api_bp, init_api_keys
+from .routes.api import api_bp, init_api_keys, init_warm_up
 from .routes.general import general_bp
 
-def create_app():
+def create_app(test_config=None):
     """
     Application factory function.
+    `test_config` overrides any loaded configuration (used by benchmarks and scripts).
     """
     
     app = Flask(__name__)
@@ -47,7 +56,79 @@ def create_app():
         FRONTEND_URL=os.environ.get("FRONTEND_URL", "http://localhost:3000"),
         
         # --- 2. ADD NEW CONFIG KEY ---
-        CONTACT_EMAIL=os.environ.get("CONTACT_EMAIL") 
+        CONTACT_EMAIL=os.environ.get("CONTACT_EMAIL"),
+
+        # --- Database engine tuning ---
+        DB_POOL_SIZE=int(os.environ.get("DB_POOL_SIZE", 5)),
+        DB_MAX_OVERFLOW=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        DB_POOL_TIMEOUT=int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        DB_POOL_RECYCLE=int(os.environ.get("DB_POOL_RECYCLE", 280)),
+        DB_POOL_PRE_PING=os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+        DB_CONNECT_TIMEOUT=int(os.environ.get("DB_CONNECT_TIMEOUT", 10)),
+        DB_STATEMENT_TIMEOUT_MS=int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 10000)),
+        SQLITE_BUSY_TIMEOUT_MS=int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+
+        # --- eBay resilience ---
+        EBAY_TIMEOUT_SECONDS=float(os.environ.get("EBAY_TIMEOUT_SECONDS", 10)),
+        EBAY_API_BASE=os.environ.get("EBAY_API_BASE", "https://api.ebay.com"),
+        EBAY_BREAKER_THRESHOLD=int(os.environ.get("EBAY_BREAKER_THRESHOLD", 5)),
+        EBAY_BREAKER_RESET_SECONDS=int(os.environ.get("EBAY_BREAKER_RESET_SECONDS", 30)),
+        MARKET_CACHE_TTL=int(os.environ.get("MARKET_CACHE_TTL", 900)),
+        MARKET_CACHE_STALE_TTL=int(os.environ.get("MARKET_CACHE_STALE_TTL", 86400)),
+        RELATED_CACHE_TTL=int(os.environ.get("RELATED_CACHE_TTL", 900)),
+        RELATED_PREFETCH_COUNT=int(os.environ.get("RELATED_PREFETCH_COUNT", 10)),
+        MARKET_LOOKUP_CONCURRENCY=int(os.environ.get("MARKET_LOOKUP_CONCURRENCY", 4)),
+        # `flask ebay-sync`: offers per user per run (stalest first), users in parallel, calls in flight per user
+        EBAY_SYNC_BATCH_SIZE=int(os.environ.get("EBAY_SYNC_BATCH_SIZE", 200)),
+        EBAY_SYNC_USER_CONCURRENCY=int(os.environ.get("EBAY_SYNC_USER_CONCURRENCY", 2)),
+        EBAY_SYNC_PER_USER_CONCURRENCY=int(os.environ.get("EBAY_SYNC_PER_USER_CONCURRENCY", 2)),
+
+        # --- Exchange rates (refreshed by `flask fx-refresh`) ---
+        FX_RATES_FILE=os.environ.get("FX_RATES_FILE", os.path.join(app.instance_path, 'fx_rates.json')),
+        FX_RELOAD_INTERVAL=int(os.environ.get("FX_RELOAD_INTERVAL", 60)),
+
+        # --- Listing copy generator ('openai' or the offline 'stub') ---
+        LISTING_COPY_BACKEND=os.environ.get("LISTING_COPY_BACKEND", "openai" if os.environ.get("OPENAI_API_KEY") else "stub"),
+        LISTING_COPY_MODEL=os.environ.get("LISTING_COPY_MODEL", "gpt-4o-mini"),
+        LISTING_COPY_BATCH_SIZE=int(os.environ.get("LISTING_COPY_BATCH_SIZE", 10)),
+        LISTING_COPY_CACHE_TTL=int(os.environ.get("LISTING_COPY_CACHE_TTL", 30 * 86400)),
+        # How long a request waits on copy another request is already generating
+        LISTING_COPY_WAIT_SECONDS=int(os.environ.get("LISTING_COPY_WAIT_SECONDS", 120)),
+        # USD per 1k tokens, used for the cost metrics
+        LISTING_COPY_INPUT_COST_PER_1K=float(os.environ.get("LISTING_COPY_INPUT_COST_PER_1K", 0.00015)),
+        LISTING_COPY_OUTPUT_COST_PER_1K=float(os.environ.get("LISTING_COPY_OUTPUT_COST_PER_1K", 0.0006)),
+
+        # --- Rate limiting ('memory' per process, or 'sqlite' / 'sqlite:///path' shared by workers) ---
+        RATE_LIMIT_ENABLED=os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true",
+        RATE_LIMIT_STORAGE=os.environ.get("RATE_LIMIT_STORAGE", "memory"),
+        # Overrides for DEFAULT_LIMITS, e.g. {"api_bp.analyse_market": "30/minute", "auth_bp": "none"}
+        RATE_LIMITS=json.loads(os.environ.get("RATE_LIMITS", "{}")),
+        # PythonAnywhere's proxy passes the client address in X-Real-IP
+        RATE_LIMIT_CLIENT_IP_HEADER=os.environ.get("RATE_LIMIT_CLIENT_IP_HEADER", "X-Real-IP" if os.environ.get("PYTHONANYWHERE_DOMAIN") else None),
+
+        # --- Sampling profiler (off unless a token or sample rate is set) ---
+        PROFILER_TOKEN=os.environ.get("PROFILER_TOKEN"),
+        PROFILER_SAMPLE_RATE=float(os.environ.get("PROFILER_SAMPLE_RATE", 0)),
+        PROFILER_INTERVAL_MS=float(os.environ.get("PROFILER_INTERVAL_MS", 5)),
+        PROFILER_DIR=os.environ.get("PROFILER_DIR"), # defaults to instance/profiles
+        PROFILER_KEEP=int(os.environ.get("PROFILER_KEEP", 50)),
+
+        # --- Popular searches and post-reload warm-up ---
+        POPULAR_QUERIES_FILE=os.environ.get("POPULAR_QUERIES_FILE", os.path.join(app.instance_path, 'popular_queries.json')),
+        POPULAR_QUERIES_CAPACITY=int(os.environ.get("POPULAR_QUERIES_CAPACITY", 200)),
+        POPULAR_QUERIES_SAVE_INTERVAL=int(os.environ.get("POPULAR_QUERIES_SAVE_INTERVAL", 300)),
+        POPULAR_QUERIES_HALF_LIFE_DAYS=float(os.environ.get("POPULAR_QUERIES_HALF_LIFE_DAYS", 7)),
+        WARMUP_ON_START=os.environ.get("WARMUP_ON_START", "true" if os.environ.get("PYTHONANYWHERE_DOMAIN") else "false").lower() == "true",
+        WARMUP_TOP_K=int(os.environ.get("WARMUP_TOP_K", 20)),
+        WARMUP_CONCURRENCY=int(os.environ.get("WARMUP_CONCURRENCY", 2)),
+
+        # --- Maintenance (`flask maintenance`, or every MAINTENANCE_INTERVAL_HOURS in-process) ---
+        MAINTENANCE_INTERVAL_HOURS=float(os.environ.get("MAINTENANCE_INTERVAL_HOURS", 0)),
+        MAINTENANCE_CHUNK_SIZE=int(os.environ.get("MAINTENANCE_CHUNK_SIZE", 500)),
+        MAINTENANCE_PAUSE_MS=int(os.environ.get("MAINTENANCE_PAUSE_MS", 200)),
+        MAINTENANCE_MAX_SECONDS=int(os.environ.get("MAINTENANCE_MAX_SECONDS", 300)),
+        MAINTENANCE_UNCONFIRMED_USER_DAYS=int(os.environ.get("MAINTENANCE_UNCONFIRMED_USER_DAYS", 7)),
+        MAINTENANCE_CHANGE_LOG_DAYS=int(os.environ.get("MAINTENANCE_CHANGE_LOG_DAYS", 30))
     )
 
     # --- Database Configuration ---
@@ -64,8 +145,17 @@ def create_app():
         # Use a local SQLite database if live credentials aren't set
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///site.db'
 
+    if test_config:
+        app.config.update(test_config)
+
+    # Pool size, recycle, pre-ping and timeouts all come from the DB_* keys above
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
+
     # --- Initialize Extensions with the App ---
     db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, app.config)
+        init_profiler(app, db.engine)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     login_manager.init_app(app)
@@ -75,10 +165,18 @@ def create_app():
     app.register_blueprint(workshop_bp)
     app.register_blueprint(api_bp)
     app.register_blueprint(general_bp)
+    limiter.init_app(app)
 
     # --- Initialize API keys for the api_routes blueprint ---
     with app.app_context():
         init_api_keys(app)
+        init_fx(app)
+        init_copywriter(app)
+        popular_queries.init_app(app)
+        init_warm_up(app)
+        init_maintenance(app)
+
+    register_commands(app)
 
     # --- Configure CORS ---
     CORS(app, resources={r"/api/*": {"origins": [
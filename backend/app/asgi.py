@@ -0,0 +1,192 @@
+import contextvars
+import io
+import re
+import sys
+import anyio
+from werkzeug.exceptions import HTTPException
+from . import create_app
+from .routes.api_async import async_routes, close_async_client
+
+# --- ASGI Entry Point ---
+# Serves the app under an ASGI server (`uvicorn asgi:app`, see backend/asgi.py).
+# The eBay-bound endpoints are handled by the async views in routes/api_async.py,
+# which await eBay with httpx, so a slow Browse call no longer pins a worker
+# thread. Every other request goes to the unchanged Flask app on a thread.
+# Both paths run Flask's before/after request hooks (rate limiting, CORS,
+# sessions), so clients can't tell the two apart.
+
+class EarlyResponse(Exception):
+    """Carries a finished response out of an async view (rate limited, unauthorized...)."""
+    def __init__(self, response):
+        super().__init__(response.status)
+        self.response = response
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI http scope; `wsgi.input` is replaced per use."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name, value = raw_name.decode('latin-1').upper().replace('-', '_'), raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+class AsyncCall:
+    """
+    What an async view gets: the parsed path params plus Flask-aware helpers.
+    The request has one Flask request context, pushed by the first helper and
+    popped by close(), so `g`, the session and the DB session carry over from
+    begin() to run() to respond(), and teardown hooks run once. Each step runs
+    on a worker thread inside the same contextvars.Context, since the context
+    has to be popped in the Context it was pushed in.
+    """
+    def __init__(self, flask_app, environ, body, path_params):
+        self.flask_app = flask_app
+        self.path_params = path_params
+        self._environ = dict(environ, **{'wsgi.input': io.BytesIO(body)})
+        self._context = contextvars.copy_context()
+        self._request_context = None
+
+    def _in_request(self, func):
+        if self._request_context is None:
+            self._request_context = self.flask_app.request_context(self._environ)
+            self._request_context.push()
+        return func()
+
+    async def _on_thread(self, func):
+        return await anyio.to_thread.run_sync(self._context.run, self._in_request, func)
+
+    async def begin(self, prepare=None):
+        """
+        Runs Flask's before_request hooks and then `prepare()` on a worker thread
+        inside the request context, so it may use `request`, `current_user` and the
+        DB. Returns what prepare returns; raises EarlyResponse if a hook or
+        prepare answered the request itself (429, 401...).
+        """
+        def _run():
+            try:
+                rv = self.flask_app.preprocess_request()
+                if rv is None:
+                    return prepare() if prepare else None
+            except HTTPException as e:
+                rv = self.flask_app.handle_user_exception(e)
+            raise EarlyResponse(self.flask_app.finalize_request(rv))
+        return await self._on_thread(_run)
+
+    async def run(self, func):
+        """Runs `func` on a worker thread inside the request context, for DB work after begin()."""
+        return await self._on_thread(func)
+
+    async def respond(self, rv):
+        """Turns a view return value into a response, running after_request hooks (CORS, session)."""
+        return await self._on_thread(lambda: self.flask_app.finalize_request(rv))
+
+    async def close(self, error=None):
+        """Pops the request context, running the teardown hooks (DB session cleanup) once."""
+        if self._request_context is not None:
+            await anyio.to_thread.run_sync(self._context.run, self._request_context.pop, error)
+
+def call_wsgi(flask_app, environ):
+    started = {}
+    def start_response(status, headers, exc_info=None):
+        started['status'], started['headers'] = status, headers
+    chunks = flask_app(environ, start_response)
+    try:
+        body = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return int(started['status'].split(' ', 1)[0]), started['headers'], body
+
+async def send_response(send, status, headers, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+def compile_route(rule):
+    """'/api/related-items/<item_id>' -> regex with an item_id group."""
+    return re.compile('^' + re.sub(r'<(\w+)>', r'(?P<\1>[^/]+)', rule) + '$')
+
+class AllyASGI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.routes = [(set(methods), compile_route(rule), view) for rule, methods, view in async_routes]
+
+    def match(self, method, path):
+        for methods, pattern, view in self.routes:
+            if method in methods:
+                found = pattern.match(path)
+                if found:
+                    return view, found.groupdict()
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        environ = build_environ(scope, body)
+
+        view, path_params = self.match(scope['method'], scope['path'])
+        if view is None:
+            status, headers, response_body = await anyio.to_thread.run_sync(call_wsgi, self.flask_app, environ)
+            return await send_response(send, status, headers, response_body)
+
+        call = AsyncCall(self.flask_app, environ, body, path_params)
+        error = None
+        try:
+            try:
+                response = await view(call)
+            except EarlyResponse as e:
+                response = e.response
+            except Exception as e:
+                print(f"!!! Unhandled error in async view {view.__name__}: {e}")
+                error = e
+                response = await call.respond(({"error": "An unexpected error occurred"}, 500))
+        finally:
+            await call.close(error)
+        await send_response(send, response.status_code, response.headers.to_wsgi_list(), response.get_data())
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_async_client()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+def create_asgi_app(test_config=None):
+    return AllyASGI(create_app(test_config))
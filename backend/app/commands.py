@@ -0,0 +1,63 @@
+import click
+from flask import current_app
+from .services.fx import refresh_rates_file
+from .services.popular_queries import popular_queries
+from .services.maintenance import JOBS, maintenance_settings, run_maintenance
+from .services.offer_sync import sync_all_offers
+
+# --- CLI Commands ---
+# Run with `flask --app run <command>` (e.g. from a PythonAnywhere scheduled task).
+
+def register_commands(app):
+    app.cli.add_command(fx_refresh)
+    app.cli.add_command(list_popular_queries)
+    app.cli.add_command(maintenance)
+    app.cli.add_command(ebay_sync)
+
+@click.command('fx-refresh')
+def fx_refresh():
+    """Downloads the latest exchange rates into the FX rates file."""
+    path = current_app.config['FX_RATES_FILE']
+    data = refresh_rates_file(path)
+    click.echo(f"✅ Saved {len(data['rates'])} rates (base {data['base']}, as of {data['as_of']}) to {path}")
+
+@click.command('popular-queries')
+@click.option('--top', default=20, show_default=True, help="How many to show.")
+def list_popular_queries(top):
+    """Shows the searches each worker warms up after a reload."""
+    for rank, (query, marketplace_id) in enumerate(popular_queries.top(top), 1):
+        click.echo(f"{rank:>3}. {query} ({marketplace_id})")
+
+@click.command('maintenance')
+@click.option('--job', 'jobs', multiple=True, type=click.Choice(list(JOBS)), help="Run only these jobs (repeatable).")
+@click.option('--chunk-size', type=int, help="Rows per transaction.")
+@click.option('--max-seconds', type=int, help="Stop after this long; the next run picks up the rest.")
+def maintenance(jobs, chunk_size, max_seconds):
+    """Purges abandoned signups, expired reset/eBay tokens and old change-log rows."""
+    settings = maintenance_settings(current_app.config)
+    if chunk_size:
+        settings['chunk_size'] = chunk_size
+    if max_seconds:
+        settings['max_seconds'] = max_seconds
+    for report in run_maintenance(settings, jobs):
+        note = "" if report.finished else " (time budget reached)"
+        click.echo(f"🧹 {report.name}: {report.rows} rows in {report.chunks} chunks, {report.seconds:.2f}s{note}")
+
+@click.command('ebay-sync')
+def ebay_sync():
+    """Pulls offer and listing status from eBay for every connected user."""
+    config = current_app.config
+    reports = sync_all_offers(
+        current_app._get_current_object(),
+        batch_size=config['EBAY_SYNC_BATCH_SIZE'],
+        user_concurrency=config['EBAY_SYNC_USER_CONCURRENCY'],
+        per_user_concurrency=config['EBAY_SYNC_PER_USER_CONCURRENCY'],
+    )
+    for report in reports:
+        if report.error:
+            click.echo(f"❌ User {report.user_id}: {report.error}")
+        else:
+            click.echo(f"✅ User {report.user_id}: {report.offers} offers checked, {report.updated} updated, {report.missing} gone from eBay ({report.calls} calls)")
+        if report.failed:
+            click.echo(f"⚠️ User {report.user_id}: {len(report.failed)} offers failed: {', '.join(report.failed)}")
+    click.echo(f"Synced {len(reports)} users")
@@ -1,3 +1,4 @@
+import time
 from flask_login import UserMixin
 from .extensions import db, login_manager
 
@@ -14,37 +15,114 @@ class User(db.Model, UserMixin):
     reset_token = db.Column(db.String(100), unique=True, nullable=True)
     reset_token_expiry = db.Column(db.BigInteger, nullable=True)
     email_confirmed = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.BigInteger, nullable=True, default=lambda: int(time.time()))
+    # Last change sequence number handed out for this user's workshop (see WorkshopChange)
+    workshop_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     ebay_token = db.relationship('EbayToken', backref='user', uselist=False, cascade="all, delete-orphan")
     materials = db.relationship('Material', backref='owner', lazy=True, cascade="all, delete-orphan")
     products = db.relationship('Product', backref='owner', lazy=True, cascade="all, delete-orphan")
+    workshop_changes = db.relationship('WorkshopChange', lazy=True, cascade="all, delete-orphan")
+    name_tokens = db.relationship('NameToken', lazy=True, cascade="all, delete-orphan")
+    ebay_offers = db.relationship('EbayOffer', lazy=True, cascade="all, delete-orphan")
 
 class Material(db.Model): 
+    # Serves the paginated/searchable material list (see services/pagination.py)
+    __table_args__ = (db.Index('ix_material_user_id_name', 'user_id', 'name'),)
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     cost = db.Column(db.Float, nullable=False)
     quantity = db.Column(db.Float, nullable=False)
     unit = db.Column(db.String(20), nullable=False)
+    stock = db.Column(db.Float, nullable=True) # On hand, in `unit`; None means not tracked
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Volume discounts on top of the cost/quantity base price, smallest break first
+    price_tiers = db.relationship('MaterialPriceTier', backref='material', lazy=True, cascade="all, delete-orphan",
+                                  order_by='MaterialPriceTier.min_quantity')
+
+class MaterialPriceTier(db.Model): 
+    """A price break: buying at least `min_quantity` (in the material's unit) costs `cost_per_unit`."""
+    __table_args__ = (db.UniqueConstraint('material_id', 'min_quantity'),)
+    id = db.Column(db.Integer, primary_key=True)
+    material_id = db.Column(db.Integer, db.ForeignKey('material.id'), nullable=False, index=True)
+    min_quantity = db.Column(db.Float, nullable=False)
+    cost_per_unit = db.Column(db.Float, nullable=False)
 
 class Product(db.Model): 
+    __table_args__ = (db.Index('ix_product_user_id_name', 'user_id', 'name'),)
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     recipe = db.relationship('RecipeItem', backref='product', lazy=True, cascade="all, delete-orphan")
+    # Sub-assemblies: other products this product is built from
+    components = db.relationship('ProductComponent', foreign_keys='ProductComponent.product_id', backref='product', lazy=True, cascade="all, delete-orphan")
     labour_hours = db.Column(db.Float, nullable=False, default=0)
     hourly_rate = db.Column(db.Float, nullable=False, default=0)
     profit_margin = db.Column(db.Float, nullable=False, default=100)
+    # Deleting a product keeps its offers, unlinked (no delete cascade: SQLAlchemy nulls product_id)
+    ebay_offers = db.relationship('EbayOffer', backref='product', lazy=True)
 
 class RecipeItem(db.Model): 
     id = db.Column(db.Integer, primary_key=True)
     quantity = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20), nullable=True) # None means "same unit as the material"
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
-    material_id = db.Column(db.Integer, db.ForeignKey('material.id'), nullable=False)
+    # Indexed: material -> recipe lines is how price changes find affected products
+    material_id = db.Column(db.Integer, db.ForeignKey('material.id'), nullable=False, index=True)
     material = db.relationship('Material')
 
+class ProductComponent(db.Model): 
+    id = db.Column(db.Integer, primary_key=True)
+    quantity = db.Column(db.Float, nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    component_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False, index=True)
+    component = db.relationship('Product', foreign_keys=[component_id])
+
+class WorkshopChange(db.Model): 
+    """Append-only log of workshop edits, used by the delta sync endpoint."""
+    __table_args__ = (db.UniqueConstraint('user_id', 'seq'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(20), nullable=False) # 'material' or 'product'
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False) # 'upsert' or 'delete'
+    created_at = db.Column(db.BigInteger, nullable=False)
+
+class NameToken(db.Model): 
+    """One lowercased word of a material or product name; backs the list search (see services/name_search.py)."""
+    __table_args__ = (
+        db.Index('ix_name_token_user_id_entity_token', 'user_id', 'entity', 'token'),
+        db.Index('ix_name_token_entity_entity_id', 'entity', 'entity_id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    entity = db.Column(db.String(20), nullable=False) # 'material' or 'product'
+    entity_id = db.Column(db.Integer, nullable=False)
+    token = db.Column(db.String(100), nullable=False)
+
 class EbayToken(db.Model): 
     id = db.Column(db.Integer, primary_key=True)
     refresh_token = db.Column(db.String(500), nullable=False)
     refresh_token_expiry = db.Column(db.BigInteger, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
\ No newline at end of file
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+class EbayOffer(db.Model): 
+    """An offer created from the publisher, kept in step with eBay by `flask ebay-sync`."""
+    # The sync walks each user's offers stalest first
+    __table_args__ = (db.UniqueConstraint('user_id', 'sku'), db.Index('ix_ebay_offer_user_id_synced_at', 'user_id', 'synced_at'))
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=True, index=True)
+    sku = db.Column(db.String(50), nullable=False)
+    offer_id = db.Column(db.String(40), nullable=True)
+    marketplace_id = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False) # eBay's offer status (UNPUBLISHED, PUBLISHED), or NOT_FOUND
+    listing_id = db.Column(db.String(40), nullable=True)
+    listing_status = db.Column(db.String(30), nullable=True) # ACTIVE, OUT_OF_STOCK, ENDED... once published
+    price = db.Column(db.Float, nullable=True)
+    currency = db.Column(db.String(3), nullable=True)
+    available_quantity = db.Column(db.Integer, nullable=True)
+    sold_quantity = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.BigInteger, nullable=False)
+    synced_at = db.Column(db.BigInteger, nullable=True)
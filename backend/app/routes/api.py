@@ -2,11 +2,27 @@ import os
 import statistics
 import time
 import base64
+import uuid
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from flask import jsonify, request, redirect, current_app, Blueprint
 from flask_login import login_required, current_user
+from sqlalchemy.orm import selectinload
 import requests
+import httpx
 from ..extensions import db
-from ..models import User, EbayToken
+from ..models import User, EbayToken, EbayOffer, Product, RecipeItem, ProductComponent
+from ..services.cache import TTLCache
+from ..services.listing_codec import SnapshotCodec, ListingsCodec
+from ..services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..services.background import submit_once, submit_once_to, copy_executor, SingleFlight, RunAgain
+from ..services.copywriter import get_generator, product_attributes, copy_cache_key
+from ..services.profiler import span as profiler_span
+from ..services.popular_queries import popular_queries
+from ..services.listing_filter import filter_listings, DEFAULT_EXCLUDE_KEYWORDS
+from ..services.fx import convert_listing_prices, currency_for_marketplace, get_rate_table, is_known_currency, MARKETPLACE_CURRENCIES
+from ..services.batch_costing import batch_unit_costs
+from .workshop import load_component_graph, cost_product_subset, load_product_subset, parse_batch_sizes
 
 # --- API Clients & Globals ---
 # These will be initialized by the app factory
@@ -15,6 +31,49 @@ EBAY_PROD_CLIENT_SECRET = None
 EBAY_PROD_RUNAME = None
 ebay_app_oauth_token = None
 ebay_app_token_expiry = 0
+EBAY_TIMEOUT = 10
+EBAY_API_BASE = "https://api.ebay.com"
+
+class EbayUnavailableError(Exception):
+    """eBay could not be reached (no token, open circuit, timeout or 5xx)."""
+
+def _is_upstream_failure(exc):
+    # 4xx responses mean eBay is up and rejected *our* request, so they don't trip a breaker.
+    # Covers both requests (WSGI views) and httpx (async views, see routes/api_async.py).
+    if isinstance(exc, (requests.exceptions.HTTPError, httpx.HTTPStatusError)) and exc.response is not None:
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, (requests.exceptions.RequestException, httpx.TransportError))
+
+# One breaker per eBay endpoint family, so a Browse outage doesn't block OAuth or Sell calls
+ebay_breakers = {
+    'identity': CircuitBreaker('ebay-identity', is_failure=_is_upstream_failure),
+    'browse': CircuitBreaker('ebay-browse', is_failure=_is_upstream_failure),
+    'sell': CircuitBreaker('ebay-sell', is_failure=_is_upstream_failure),
+}
+
+# Last-known-good market data per (query, marketplace). Fresh entries are served
+# directly; stale ones only when eBay is failing. Listings are kept in the
+# compact binary encoding from listing_codec.py, decoded on each hit.
+market_cache = TTLCache(ttl=900, stale_ttl=86400, max_entries=500, codec=SnapshotCodec)
+
+# Related-items modal data, keyed by (item_id, marketplace). Item metadata
+# (category + title) rarely changes, so it is kept much longer than results.
+item_metadata_cache = TTLCache(ttl=21600, max_entries=5000)
+related_items_cache = TTLCache(ttl=900, max_entries=1000, codec=ListingsCodec)
+RELATED_PREFETCH_COUNT = 10
+
+# Identical market lookups in flight at the same time share one eBay call
+market_fetches = SingleFlight()
+# Bounded pool for fanning out the per-product lookups of pricing recommendations
+market_lookup_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ally-market')
+RECOMMENDATION_MAX_PRODUCTS = 200
+
+# Listing-copy jobs by id; results are kept for an hour after the job is created
+listing_copy_jobs = TTLCache(ttl=3600, max_entries=1000)
+LISTING_COPY_MAX_PRODUCTS = 100
+
+PLATFORM_FEE_PERCENTAGE, PLATFORM_FIXED_FEE, SHIPPING_COST = 0.10, 0.20, 3.20 # This might need to be dynamic later
+FEE_CURRENCY = 'GBP' # The fixed fee and shipping above are in this currency
 
 # Create a Blueprint for our external API routes
 api_bp = Blueprint('api_bp', __name__)
@@ -23,40 +82,73 @@ api_bp = Blueprint('api_bp', __name__)
 # This function will be called by the app factory to load the keys
 def init_api_keys(app):
     """Initializes API keys from the app's config."""
-    global EBAY_PROD_CLIENT_ID, EBAY_PROD_CLIENT_SECRET, EBAY_PROD_RUNAME
+    global EBAY_PROD_CLIENT_ID, EBAY_PROD_CLIENT_SECRET, EBAY_PROD_RUNAME, EBAY_TIMEOUT, EBAY_API_BASE, RELATED_PREFETCH_COUNT, market_lookup_pool
     EBAY_PROD_CLIENT_ID = app.config.get("EBAY_PROD_CLIENT_ID")
     EBAY_PROD_CLIENT_SECRET = app.config.get("EBAY_PROD_CLIENT_SECRET")
     EBAY_PROD_RUNAME = app.config.get("EBAY_PROD_RUNAME")
+    EBAY_TIMEOUT = app.config.get("EBAY_TIMEOUT_SECONDS", EBAY_TIMEOUT)
+    EBAY_API_BASE = app.config.get("EBAY_API_BASE", EBAY_API_BASE)
 
-def get_ebay_app_oauth_token():
-    global ebay_app_oauth_token, ebay_app_token_expiry, EBAY_PROD_CLIENT_ID, EBAY_PROD_CLIENT_SECRET
-    
-    if ebay_app_oauth_token and time.time() < ebay_app_token_expiry: 
-        return ebay_app_oauth_token
-    
-    url = "https://api.ebay.com/identity/v1/oauth2/token"
+    for breaker in ebay_breakers.values():
+        breaker.failure_threshold = app.config.get("EBAY_BREAKER_THRESHOLD", breaker.failure_threshold)
+        breaker.reset_timeout = app.config.get("EBAY_BREAKER_RESET_SECONDS", breaker.reset_timeout)
+    market_cache.ttl = app.config.get("MARKET_CACHE_TTL", market_cache.ttl)
+    market_cache.stale_ttl = app.config.get("MARKET_CACHE_STALE_TTL", market_cache.stale_ttl)
+    related_items_cache.ttl = app.config.get("RELATED_CACHE_TTL", related_items_cache.ttl)
+    RELATED_PREFETCH_COUNT = app.config.get("RELATED_PREFETCH_COUNT", RELATED_PREFETCH_COUNT)
+    # Replaces the module-level default; in-flight lookups on the old pool still finish
+    market_lookup_pool.shutdown(wait=False)
+    market_lookup_pool = ThreadPoolExecutor(max_workers=app.config.get("MARKET_LOOKUP_CONCURRENCY", 4), thread_name_prefix='ally-market')
+
+def ebay_request(family, method, url, **kwargs):
+    """
+    Sends a request to eBay through the circuit breaker for that endpoint family.
+    Raises CircuitOpenError without calling eBay while the circuit is open, and
+    raises HTTPError for 5xx/429 so they count as upstream failures.
+    Other responses (including 4xx) are returned for the caller to handle.
+    """
+    def _send():
+        with profiler_span('http', f"{method} {urlsplit(url).path}"):
+            response = requests.request(method, url, timeout=EBAY_TIMEOUT, **kwargs)
+        if response.status_code >= 500 or response.status_code == 429:
+            response.raise_for_status()
+        return response
+    return ebay_breakers[family].call(_send)
+
+# --- Request Builders ---
+# The eBay calls are described here once and sent either with requests (the
+# WSGI views below) or with httpx (the async views in routes/api_async.py).
+
+def identity_token_request(body):
+    """(url, headers, form body) for the OAuth token endpoint."""
     credentials = f"{EBAY_PROD_CLIENT_ID}:{EBAY_PROD_CLIENT_SECRET}"
     base64_credentials = base64.b64encode(credentials.encode()).decode()
     headers = {"Content-Type": "application/x-www-form-urlencoded", "Authorization": f"Basic {base64_credentials}"}
-    body = {"grant_type": "client_credentials", "scope": "https://api.ebay.com/oauth/api_scope"}
-    
-    try:
-        response = requests.post(url, headers=headers, data=body)
-        response.raise_for_status()
-        data = response.json()
-        ebay_app_oauth_token = data['access_token']
-        ebay_app_token_expiry = time.time() + (data['expires_in'] - 300)
+    return f"{EBAY_API_BASE}/identity/v1/oauth2/token", headers, body
+
+def app_token_request():
+    return identity_token_request({"grant_type": "client_credentials", "scope": "https://api.ebay.com/oauth/api_scope"})
+
+def user_token_request(refresh_token):
+    return identity_token_request({
+        "grant_type": "refresh_token", 
+        "refresh_token": refresh_token, 
+        "scope": "https://api.ebay.com/oauth/api_scope/sell.inventory" 
+    })
+
+def cached_app_token():
+    if ebay_app_oauth_token and time.time() < ebay_app_token_expiry: 
         return ebay_app_oauth_token
-    except Exception as e:
-        print(f"!!! Error getting eBay App token: {e}")
-        return None
+    return None
 
-def search_ebay_production(search_term, marketplace_id='EBAY_GB', category_id=None, exclude_item_id=None):
-    token = get_ebay_app_oauth_token()
-    if not token: 
-        return []
-    
-    url = "https://api.ebay.com/buy/browse/v1/item_summary/search"
+def store_app_token(data):
+    global ebay_app_oauth_token, ebay_app_token_expiry
+    ebay_app_oauth_token = data['access_token']
+    ebay_app_token_expiry = time.time() + (data['expires_in'] - 300)
+    return ebay_app_oauth_token
+
+def browse_search_request(token, search_term, marketplace_id, category_id=None, exclude_item_id=None):
+    """(url, headers, params) for a Browse item_summary search."""
     headers = {"Authorization": f"Bearer {token}", "X-EBAY-C-MARKETPLACE-ID": marketplace_id}
     params = {"q": search_term, "limit": 100}
     if category_id:
@@ -64,33 +156,318 @@ def search_ebay_production(search_term, marketplace_id='EBAY_GB', category_id=No
         params['limit'] = 50
     if exclude_item_id:
         params['filter'] = f"itemId:-{{{exclude_item_id}}}"
-        
+    return f"{EBAY_API_BASE}/buy/browse/v1/item_summary/search", headers, params
+
+def normalize_item_summaries(data):
+    normalized_results = []
+    for item in data.get('itemSummaries', []):
+        if 'price' in item and 'value' in item['price']:
+            normalized_results.append({
+                'listing_id': item['itemId'], 
+                'title': item['title'], 
+                'price': {
+                    'amount': int(float(item['price']['value']) * 100), 
+                    'divisor': 100, 
+                    'currency_code': item['price']['currency']
+                }, 
+                'source': 'eBay'
+            })
+    return normalized_results
+
+def item_request(token, item_id, marketplace_id):
+    headers = {"Authorization": f"Bearer {token}", "X-EBAY-C-MARKETPLACE-ID": marketplace_id}
+    return f"{EBAY_API_BASE}/buy/browse/v1/item/{item_id}", headers
+
+def parse_item_metadata(item_data):
+    return {
+        'category_id': item_data.get('categoryPath', '').split('|')[0],
+        'title': item_data.get('title')
+    }
+
+def sell_headers(user_access_token):
+    return {"Authorization": f"Bearer {user_access_token}", "Content-Type": "application/json", "Content-Language": "en-GB"}
+
+def merchant_location_payload():
+    return {
+        "location": { "address": { "country": "GB" } }, # Simple address, eBay will ask user to fill it out later
+        "name": "Primary dispatch location",
+        "merchantLocationStatus": "ENABLED",
+        "locationTypes": ["WAREHOUSE"]
+    }
+
+def inventory_item_payload(title, description):
+    return {
+        "product": { "title": title, "description": description }, 
+        "condition": "NEW", 
+        "packageWeightAndSize": {
+            "dimensions": { "height": 10, "length": 10, "width": 10, "unit": "CENTIMETER" }, 
+            "weight": { "value": 250, "unit": "GRAM" }
+        }, 
+        "availability": { "shipToLocationAvailability": { "quantity": 1 } }
+    }
+
+OFFER_MARKETPLACE_ID = "EBAY_GB"
+OFFER_CURRENCY = "GBP"
+
+def offer_payload(sku, description, price):
+    return {
+        "sku": sku, 
+        "marketplaceId": OFFER_MARKETPLACE_ID, 
+        "format": "FIXED_PRICE", 
+        "listingDescription": description, 
+        "availableQuantity": 1, 
+        "pricingSummary": {"price": { "value": str(price), "currency": OFFER_CURRENCY }}, 
+        "listingPolicies": {
+            "fulfillmentPolicyId": "375545969023", 
+            "paymentPolicyId": "375545763023", 
+            "returnPolicyId": "375545771023"
+        }, 
+        "categoryId": "11700", 
+        "merchantLocationKey": "ALLY_DEFAULT"
+    }
+
+def offers_request(user_access_token, sku, offset=0, limit=25):
+    """(url, headers, params) for one page of getOffers for a SKU."""
+    return f"{EBAY_API_BASE}/sell/inventory/v1/offer", sell_headers(user_access_token), {"sku": sku, "limit": limit, "offset": offset}
+
+def parse_offer(offer):
+    """EbayOffer column values from a Sell Inventory offer."""
+    price = offer.get('pricingSummary', {}).get('price', {})
+    listing = offer.get('listing') or {}
+    return {
+        'offer_id': offer.get('offerId'),
+        'marketplace_id': offer.get('marketplaceId'),
+        'status': offer.get('status'),
+        'price': float(price['value']) if price.get('value') else None,
+        'currency': price.get('currency'),
+        'available_quantity': offer.get('availableQuantity'),
+        'listing_id': listing.get('listingId'),
+        'listing_status': listing.get('listingStatus'),
+        'sold_quantity': listing.get('soldQuantity'),
+    }
+
+def get_ebay_app_oauth_token():
+    token = cached_app_token()
+    if token:
+        return token
+    
+    url, headers, body = app_token_request()
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = ebay_request('identity', 'POST', url, headers=headers, data=body)
         response.raise_for_status()
-        data = response.json()
-        normalized_results = []
-        for item in data.get('itemSummaries', []):
-            if 'price' in item and 'value' in item['price']:
-                normalized_results.append({
-                    'listing_id': item['itemId'], 
-                    'title': item['title'], 
-                    'price': {
-                        'amount': int(float(item['price']['value']) * 100), 
-                        'divisor': 100, 
-                        'currency_code': item['price']['currency']
-                    }, 
-                    'source': 'eBay'
-                })
-        return normalized_results
+        return store_app_token(response.json())
+    except Exception as e:
+        print(f"!!! Error getting eBay App token: {e}")
+        return None
+
+def fetch_ebay_listings(search_term, marketplace_id='EBAY_GB', category_id=None, exclude_item_id=None):
+    """Like search_ebay_production, but raises instead of returning [] when eBay fails."""
+    token = get_ebay_app_oauth_token()
+    if not token: 
+        raise EbayUnavailableError("Could not get an eBay app token")
+    
+    url, headers, params = browse_search_request(token, search_term, marketplace_id, category_id, exclude_item_id)
+    response = ebay_request('browse', 'GET', url, headers=headers, params=params)
+    response.raise_for_status()
+    return normalize_item_summaries(response.json())
+
+def search_ebay_production(search_term, marketplace_id='EBAY_GB', category_id=None, exclude_item_id=None):
+    try:
+        return fetch_ebay_listings(search_term, marketplace_id, category_id, exclude_item_id)
     except Exception as e: 
         print(f"!!! eBay Browse API Error: {e}")
         return []
 
-def analyse_prices(item_list):
-    if not item_list: 
+# --- Related Items ---
+
+def get_item_metadata(item_id, marketplace_id):
+    """Returns {'category_id', 'title'} for a listing, from cache where possible."""
+    key = (item_id, marketplace_id)
+    metadata = item_metadata_cache.get(key)
+    if metadata is not None:
+        return metadata
+    
+    token = get_ebay_app_oauth_token()
+    if not token:
+        raise EbayUnavailableError("Could not get an eBay app token")
+    
+    item_url, headers = item_request(token, item_id, marketplace_id)
+    item_response = ebay_request('browse', 'GET', item_url, headers=headers)
+    item_response.raise_for_status()
+    
+    metadata = parse_item_metadata(item_response.json())
+    item_metadata_cache.set(key, metadata)
+    return metadata
+
+def get_related_listings(item_id, marketplace_id):
+    key = (item_id, marketplace_id)
+    listings = related_items_cache.get(key)
+    if listings is not None:
+        return listings
+    
+    metadata = get_item_metadata(item_id, marketplace_id)
+    if not metadata['category_id'] or not metadata['title']:
+        listings = []
+    else:
+        listings = fetch_ebay_listings(
+            search_term=metadata['title'], 
+            marketplace_id=marketplace_id, 
+            category_id=metadata['category_id'], 
+            exclude_item_id=item_id
+        )
+    related_items_cache.set(key, listings)
+    return listings
+
+def prefetch_item_metadata(item_ids, marketplace_id):
+    """Warms the metadata cache so the related-items modal only needs one eBay call."""
+    for item_id in item_ids:
+        if item_metadata_cache.get((item_id, marketplace_id)) is not None:
+            continue
+        try:
+            get_item_metadata(item_id, marketplace_id)
+        except CircuitOpenError:
+            return
+        except Exception as e:
+            print(f"!!! Could not prefetch item {item_id}: {e}")
+
+# --- Market Snapshot Cache (stale-while-revalidate) ---
+
+def market_cache_key(search_query, marketplace_id):
+    return (" ".join(search_query.lower().split()), marketplace_id)
+
+def fetch_market_snapshot(search_query, marketplace_id):
+    listings = fetch_ebay_listings(search_query, marketplace_id=marketplace_id)
+    snapshot = {"listings": listings, "fetched_at": int(time.time())}
+    market_cache.set(market_cache_key(search_query, marketplace_id), snapshot)
+    return snapshot
+
+def refresh_market_snapshot(search_query, marketplace_id, attempt=0, attempts=3):
+    """Background retry used while stale data is being served. Waits between attempts off the pool."""
+    try:
+        fetch_market_snapshot(search_query, marketplace_id)
+        print(f"✅ Refreshed market data for '{search_query}' ({marketplace_id})")
+        return
+    except CircuitOpenError as e:
+        delay = e.retry_after + 1
+    except Exception as e:
+        print(f"!!! Market refresh attempt {attempt + 1} failed: {e}")
+        delay = 5 * 2 ** attempt
+    if attempt + 1 >= attempts:
+        print(f"❌ Giving up refreshing market data for '{search_query}' ({marketplace_id})")
+        return
+    raise RunAgain(delay, attempt=attempt + 1)
+
+def get_market_snapshot(search_query, marketplace_id):
+    """
+    Returns (snapshot, is_stale). Fresh cache hits skip eBay entirely. If eBay
+    fails, the last-known-good snapshot is returned and a background refresh
+    is queued. Raises EbayUnavailableError when there is nothing to fall back on.
+    """
+    key = market_cache_key(search_query, marketplace_id)
+    entry = market_cache.lookup(key)
+    if entry and entry.fresh:
+        return entry.value, False
+    
+    try:
+        return market_fetches.do(key, fetch_market_snapshot, search_query, marketplace_id), False
+    except Exception as e:
+        print(f"!!! eBay unavailable for '{search_query}' ({marketplace_id}): {e}")
+        if entry is None:
+            raise EbayUnavailableError(str(e))
+        submit_once(('market-refresh',) + key, refresh_market_snapshot, search_query, marketplace_id)
+        return entry.value, True
+
+# --- Post-reload Warm-up ---
+# A reload empties the market cache and the app token, so the first users
+# after a deploy would pay full eBay latency for the most common searches.
+# Each worker refreshes the top searches in the background on its first request.
+
+_warm_up_pending = False
+
+def init_warm_up(app):
+    global _warm_up_pending
+    if not app.config.get('WARMUP_ON_START'):
+        return
+    _warm_up_pending = True
+    top_k, concurrency = app.config.get('WARMUP_TOP_K', 20), app.config.get('WARMUP_CONCURRENCY', 2)
+
+    @app.before_request
+    def start_warm_up():
+        global _warm_up_pending
+        if _warm_up_pending:
+            _warm_up_pending = False
+            submit_once(('warm-up',), warm_up_market_cache, top_k, concurrency)
+
+def warm_query(key):
+    try:
+        get_market_snapshot(*key)
+        return True
+    except Exception as e:
+        print(f"!!! Warm-up failed for '{key[0]}' ({key[1]}): {e}")
+        return False
+
+def warm_up_market_cache(top_k, concurrency):
+    """Fetches the app token, then the top_k most popular searches, `concurrency` at a time."""
+    started = time.perf_counter()
+    if not get_ebay_app_oauth_token():
+        print("!!! Skipping warm-up: no eBay app token")
+        return 0
+    queries = popular_queries.top(top_k)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ally-warmup') as pool:
+        warmed = sum(pool.map(warm_query, queries))
+    print(f"🔥 Warmed {warmed}/{len(queries)} popular searches in {time.perf_counter() - started:.1f}s")
+    return warmed
+
+def curate_listings(listings, search_query, extra_exclusions=(), apply_filter=True):
+    """
+    Relevant to the query, no bundles/spares, near-duplicates collapsed.
+    Returns (curated, filter stats); never empty if `listings` isn't.
+    """
+    if apply_filter:
+        curated_listings, filter_stats = filter_listings(listings, search_query, DEFAULT_EXCLUDE_KEYWORDS + tuple(extra_exclusions))
+    else:
+        curated_listings, filter_stats = listings, None
+    if not curated_listings:
+        # Never let an over-eager filter zero out the analysis
+        curated_listings = listings
+    return curated_listings, filter_stats
+
+def fixed_costs(currency):
+    """PLATFORM_FIXED_FEE and SHIPPING_COST converted into `currency`."""
+    factor = get_rate_table().factor(FEE_CURRENCY, currency)
+    if factor is None:
+        raise ValueError(f"No exchange rate for {currency}")
+    return PLATFORM_FIXED_FEE * factor, SHIPPING_COST * factor
+
+def listing_profit(price, cost, currency=FEE_CURRENCY):
+    """`price` and `cost` are in `currency`."""
+    fixed_fee, shipping = fixed_costs(currency)
+    fees = (price * PLATFORM_FEE_PERCENTAGE) + fixed_fee
+    return price - cost - fees - shipping
+
+def break_even_price(cost, currency=FEE_CURRENCY):
+    """Lowest price at which fees and shipping are covered."""
+    fixed_fee, shipping = fixed_costs(currency)
+    return (cost + fixed_fee + shipping) / (1 - PLATFORM_FEE_PERCENTAGE)
+
+def price_quantiles(prices):
+    if not prices:
+        return None
+    if len(prices) == 1:
+        p25 = p50 = p75 = prices[0]
+    else:
+        p25, p50, p75 = statistics.quantiles(prices, n=4, method='inclusive')
+    return {"count": len(prices), "p25": round(p25, 2), "median": round(p50, 2), "p75": round(p75, 2),
+            "min": round(min(prices), 2), "max": round(max(prices), 2)}
+
+def analyse_prices(item_list, currency=None):
+    """Price statistics; with `currency` set, every listing is converted into it first."""
+    if currency:
+        prices = convert_listing_prices(item_list, currency)
+    else:
+        prices = [(item['price']['amount'] / item['price']['divisor']) for item in item_list]
+    if not prices: 
         return {"count": 0, "average_price": 0, "min_price": 0, "max_price": 0}
-    prices = [(item['price']['amount'] / item['price']['divisor']) for item in item_list]
     return {
         "count": len(prices), 
         "average_price": round(statistics.mean(prices), 2), 
@@ -102,17 +479,9 @@ def get_ebay_user_access_token(user):
     if not user.ebay_token: 
         return None
     
-    url = "https://api.ebay.com/identity/v1/oauth2/token"
-    credentials = f"{EBAY_PROD_CLIENT_ID}:{EBAY_PROD_CLIENT_SECRET}"
-    base64_credentials = base64.b64encode(credentials.encode()).decode()
-    headers = { "Content-Type": "application/x-www-form-urlencoded", "Authorization": f"Basic {base64_credentials}" }
-    body = { 
-        "grant_type": "refresh_token", 
-        "refresh_token": user.ebay_token.refresh_token, 
-        "scope": "https://api.ebay.com/oauth/api_scope/sell.inventory" 
-    }
+    url, headers, body = user_token_request(user.ebay_token.refresh_token)
     try:
-        response = requests.post(url, headers=headers, data=body)
+        response = ebay_request('identity', 'POST', url, headers=headers, data=body)
         response.raise_for_status()
         data = response.json()
         return data['access_token']
@@ -122,22 +491,24 @@ def get_ebay_user_access_token(user):
 
 def ensure_merchant_location(user_access_token, location_key="ALLY_DEFAULT"):
     headers = {"Authorization": f"Bearer {user_access_token}", "Content-Type": "application/json", "Accept": "application/json"}
-    check_url = f"https://api.ebay.com/sell/inventory/v1/location/{location_key}"
-    check_response = requests.get(check_url, headers=headers)
+    check_url = f"{EBAY_API_BASE}/sell/inventory/v1/location/{location_key}"
+    try:
+        check_response = ebay_request('sell', 'GET', check_url, headers=headers)
+    except Exception as e:
+        print(f"❌ Could not check inventory location: {e}")
+        return False
     
     if check_response.status_code == 200:
         print(f"✅ Inventory location '{location_key}' already exists.")
         return True
         
     print(f"⚙️ Creating new inventory location '{location_key}'...")
-    create_url = f"https://api.ebay.com/sell/inventory/v1/location/{location_key}"
-    payload = {
-        "location": { "address": { "country": "GB" } }, # Simple address, eBay will ask user to fill it out later
-        "name": "Primary dispatch location",
-        "merchantLocationStatus": "ENABLED",
-        "locationTypes": ["WAREHOUSE"]
-    }
-    create_response = requests.post(create_url, headers=headers, json=payload)
+    create_url = f"{EBAY_API_BASE}/sell/inventory/v1/location/{location_key}"
+    try:
+        create_response = ebay_request('sell', 'POST', create_url, headers=headers, json=merchant_location_payload())
+    except Exception as e:
+        print(f"❌ Failed to create inventory location: {e}")
+        return False
     
     if create_response.status_code in [200, 201, 204]:
         print(f"✅ Inventory location '{location_key}' created successfully.")
@@ -148,71 +519,201 @@ def ensure_merchant_location(user_access_token, location_key="ALLY_DEFAULT"):
 
 # --- API Endpoint Definitions ---
 
+def parse_analyse_args(args):
+    """Reads /api/analyse's query string; raises ValueError/TypeError on bad input."""
+    params = {
+        'material_cost': float(args.get('cost', 0)),
+        'search_query': args.get('query', 'jesmonite tray'),
+        'marketplace_id': args.get('marketplace', 'EBAY_GB'),
+        'apply_filter': args.get('filter', 'true').lower() != 'false',
+        'extra_exclusions': tuple(k.strip() for k in args.get('exclude', '').split(',') if k.strip()),
+    }
+    # Stats are reported in the user's currency so costs and prices are comparable
+    if args.get('currency'):
+        params['currency'] = args.get('currency').upper()
+    elif current_user.is_authenticated:
+        params['currency'] = current_user.currency
+    else:
+        params['currency'] = currency_for_marketplace(params['marketplace_id'])
+    if not is_known_currency(params['currency']):
+        raise ValueError(f"Unknown currency {params['currency']}")
+    if args.get('product_id'):
+        params['batch_costs'] = product_batch_costs(int(args['product_id']), parse_batch_sizes(args.get('batch_sizes')), params['currency'])
+    return params
+
+def product_batch_costs(product_id, batch_sizes, currency):
+    """
+    [(batch size, unit cost in `currency`)] for one of the current user's
+    products (costed in their own currency); ValueError if it isn't theirs.
+    """
+    if not current_user.is_authenticated:
+        raise ValueError("Log in to price your own products")
+    factor = get_rate_table().factor(current_user.currency, currency)
+    if factor is None:
+        raise ValueError(f"No exchange rate from {current_user.currency} to {currency}")
+    products, materials = load_product_subset(current_user.id, [product_id], load_component_graph(current_user.id))
+    if product_id not in {p.id for p in products}:
+        raise ValueError(f"Product {product_id} not found")
+    unit_costs = batch_unit_costs(products, materials, batch_sizes)[product_id]
+    return [(batch_size, unit_cost * factor) for batch_size, unit_cost in zip(batch_sizes, unit_costs)]
+
 @api_bp.route("/api/analyse", methods=["GET"])
 def analyse_market():
     try: 
-        material_cost = float(request.args.get('cost', 0))
-        search_query = request.args.get('query', 'jesmonite tray')
-        marketplace_id = request.args.get('marketplace', 'EBAY_GB')
+        params = parse_analyse_args(request.args)
     except (ValueError, TypeError): 
         return jsonify({"error": "Invalid request parameters"}), 400
     
-    ebay_listings = search_ebay_production(search_query, marketplace_id=marketplace_id)
-    ebay_analysis = analyse_prices(ebay_listings)
-    average_price = ebay_analysis['average_price'] if ebay_analysis['count'] > 0 else 0
-    
-    PLATFORM_FEE_PERCENTAGE, PLATFORM_FIXED_FEE, SHIPPING_COST = 0.10, 0.20, 3.20 # This might need to be dynamic later
-    scenarios = []
+    popular_queries.record(market_cache_key(params['search_query'], params['marketplace_id']))
+    try:
+        snapshot, is_stale = get_market_snapshot(params['search_query'], params['marketplace_id'])
+    except EbayUnavailableError:
+        return jsonify({"error": "eBay is currently unavailable. Please try again shortly."}), 503
+    return jsonify(build_market_analysis(snapshot, is_stale, **params))
+
+def profit_scenarios(average_price, cost, currency):
     pricing_tiers = {
         "The Budget Leader": average_price * 0.9, 
         "The Competitor": average_price, 
         "The Premium Brand": average_price * 1.15
     }
+    return [{"name": name, "price": round(price, 2), "profit": round(listing_profit(price, cost, currency), 2)}
+            for name, price in pricing_tiers.items()]
+
+def build_market_analysis(snapshot, is_stale, material_cost, search_query, marketplace_id, apply_filter, extra_exclusions, currency, batch_costs=None):
+    """The /api/analyse response body for a market snapshot (shared with the async view)."""
+    ebay_listings = snapshot['listings']
+    full_analysis = analyse_prices(ebay_listings, currency)
     
-    for name, price in pricing_tiers.items():
-        fees = (price * PLATFORM_FEE_PERCENTAGE) + PLATFORM_FIXED_FEE
-        profit = price - material_cost - fees - SHIPPING_COST
-        scenarios.append({"name": name, "price": round(price, 2), "profit": round(profit, 2)})
+    # Prices are analysed on the curated set; the full set is still returned for the 'full' view
+    curated_listings, filter_stats = curate_listings(ebay_listings, search_query, extra_exclusions, apply_filter)
+    ebay_analysis = analyse_prices(curated_listings, currency)
+    
+    if RELATED_PREFETCH_COUNT and curated_listings and not is_stale:
+        top_ids = [listing['listing_id'] for listing in curated_listings[:RELATED_PREFETCH_COUNT]]
+        submit_once(('item-prefetch', marketplace_id) + tuple(top_ids), prefetch_item_metadata, top_ids, marketplace_id)
+    
+    average_price = ebay_analysis['average_price'] if ebay_analysis['count'] > 0 else 0
+    
+    scenarios = profit_scenarios(average_price, material_cost, currency)
     
     full_response = {
-        "listings": {"etsy": [], "ebay": ebay_listings}, 
-        "analysis": {"overall": ebay_analysis, "etsy": analyse_prices([]), "ebay": ebay_analysis}, 
-        "profit_scenarios": scenarios
+        "listings": {"etsy": [], "ebay": ebay_listings, "ebay_curated": curated_listings}, 
+        "analysis": {"overall": ebay_analysis, "etsy": analyse_prices([]), "ebay": ebay_analysis, "ebay_full": full_analysis}, 
+        "filter": filter_stats,
+        "profit_scenarios": scenarios,
+        "currency": currency,
+        "fx_version": get_rate_table().version,
+        "stale": is_stale,
+        "fetched_at": snapshot['fetched_at']
     }
-    return jsonify(full_response)
+    if batch_costs is not None:
+        # With ?product_id, the same scenarios at the product's per-unit cost for each batch size
+        full_response["batch_scenarios"] = [
+            {"batch_size": batch_size, "unit_cost": round(unit_cost, 2), "scenarios": profit_scenarios(average_price, unit_cost, currency)}
+            for batch_size, unit_cost in batch_costs
+        ]
+    return full_response
 
 @api_bp.route('/api/related-items/<item_id>', methods=['GET'])
 def get_related_items(item_id):
-    token = get_ebay_app_oauth_token()
-    if not token: 
-        return jsonify({"error": "Could not authenticate with eBay"}), 500
-    
+    marketplace_id = request.args.get('marketplace', 'EBAY_GB')
     try:
-        marketplace_id = 'EBAY_GB' # Default to GB for now
-        item_url = f"https://api.ebay.com/buy/browse/v1/item/{item_id}"
-        headers = {"Authorization": f"Bearer {token}", "X-EBAY-C-MARKETPLACE-ID": marketplace_id}
-        
-        item_response = requests.get(item_url, headers=headers)
-        item_response.raise_for_status()
-        item_data = item_response.json()
-        
-        category_id = item_data.get('categoryPath', '').split('|')[0]
-        original_title = item_data.get('title')
-        
-        if not category_id or not original_title: 
-            return jsonify({"listings": []})
-            
-        related_listings = search_ebay_production(
-            search_term=original_title, 
-            marketplace_id=marketplace_id, 
-            category_id=category_id, 
-            exclude_item_id=item_id
-        )
+        related_listings = get_related_listings(item_id, marketplace_id)
         return jsonify({"listings": related_listings})
+    except (CircuitOpenError, EbayUnavailableError) as e:
+        print(f"!!! eBay unavailable in get_related_items: {e}")
+        return jsonify({"error": "eBay is currently unavailable. Please try again shortly."}), 503
     except Exception as e:
         print(f"An unexpected error occurred in get_related_items: {e}")
         return jsonify({"error": "An unexpected error occurred"}), 500
 
+def market_price_stats(search_query, marketplace_id, currency):
+    """Quantiles of the curated listings for one search, in `currency`. Runs on market_lookup_pool."""
+    snapshot, is_stale = get_market_snapshot(search_query, marketplace_id)
+    curated_listings, _ = curate_listings(snapshot['listings'], search_query)
+    return {"prices": price_quantiles(convert_listing_prices(curated_listings, currency)), "stale": is_stale, "fetched_at": snapshot['fetched_at']}
+
+def recommend_price(total_cost, suggested_price, prices, currency):
+    """
+    Keeps the workshop's suggested price when it sits inside the market's
+    interquartile range, otherwise moves it to the nearest edge; never below
+    break-even. Without market data the suggested price stands.
+    """
+    floor = break_even_price(total_cost, currency)
+    if prices is None:
+        price, basis = suggested_price, 'cost'
+    else:
+        price, basis = min(max(suggested_price, prices['p25']), prices['p75']), 'market'
+    if price < floor:
+        price, basis = floor, 'break_even'
+    return {"price": round(price, 2), "profit": round(listing_profit(price, total_cost, currency), 2), "basis": basis}
+
+@api_bp.route('/api/pricing/recommendations', methods=['GET'])
+@login_required
+def get_pricing_recommendations():
+    """
+    For each of the user's products: its workshop cost and suggested price next
+    to live market quantiles for its name, and a recommended price per
+    marketplace. Products with the same normalized name share one lookup.
+    """
+    marketplaces = [m.strip().upper() for m in request.args.get('marketplaces', 'EBAY_GB').split(',') if m.strip()]
+    unknown = [m for m in marketplaces if m not in MARKETPLACE_CURRENCIES]
+    if not marketplaces or unknown:
+        return jsonify({"error": f"Unknown marketplace(s): {', '.join(unknown)}"}), 400
+    currency = (request.args.get('currency') or current_user.currency).upper()
+    # Workshop costs are in the user's currency; quote everything in the one asked for
+    cost_factor = get_rate_table().factor(current_user.currency, currency) if is_known_currency(currency) else None
+    if cost_factor is None:
+        return jsonify({"error": f"Unknown currency: {currency}"}), 400
+    
+    query = db.session.query(Product.id).filter(Product.user_id == current_user.id).order_by(Product.id)
+    if request.args.get('product_ids'):
+        try:
+            query = query.filter(Product.id.in_([int(pid) for pid in request.args['product_ids'].split(',')]))
+        except ValueError:
+            return jsonify({"error": "Invalid product_ids"}), 400
+    product_ids = [row.id for row in query.limit(RECOMMENDATION_MAX_PRODUCTS)]
+    products = cost_product_subset(current_user.id, product_ids, load_component_graph(current_user.id))
+    for product in products:
+        product['total_cost'] = round(product['total_cost'] * cost_factor, 2)
+        product['suggested_price'] = round(product['suggested_price'] * cost_factor, 2)
+    
+    # One lookup per distinct (search term, marketplace), at most market_lookup_pool's size at a time
+    lookups = {}
+    for product in products:
+        for marketplace_id in marketplaces:
+            key = market_cache_key(product['name'], marketplace_id)
+            if key not in lookups:
+                lookups[key] = market_lookup_pool.submit(market_price_stats, key[0], marketplace_id, currency)
+    
+    market = {}
+    for key, future in lookups.items():
+        try:
+            market[key] = future.result()
+        except Exception as e:
+            print(f"!!! Market lookup failed for '{key[0]}' ({key[1]}): {e}")
+            market[key] = None
+    
+    recommendations = []
+    for product in products:
+        per_marketplace = {}
+        for marketplace_id in marketplaces:
+            stats = market[market_cache_key(product['name'], marketplace_id)]
+            prices = stats['prices'] if stats else None
+            per_marketplace[marketplace_id] = {
+                "market": prices,
+                "stale": stats['stale'] if stats else None,
+                "unavailable": stats is None,
+                "recommended": recommend_price(product['total_cost'], product['suggested_price'], prices, currency),
+            }
+        recommendations.append({
+            "id": product['id'], "name": product['name'],
+            "total_cost": product['total_cost'], "suggested_price": product['suggested_price'],
+            "marketplaces": per_marketplace,
+        })
+    return jsonify({"products": recommendations, "currency": currency, "lookups": len(lookups)})
+
 @api_bp.route('/api/ebay/get-auth-url', methods=['GET'])
 @login_required
 def get_ebay_auth_url():
@@ -234,14 +735,10 @@ def ebay_callback():
     if not auth_code or not user_id: 
         return redirect(f'{live_frontend_url}/publisher?error=true')
     
-    url = "https://api.ebay.com/identity/v1/oauth2/token"
-    credentials = f"{EBAY_PROD_CLIENT_ID}:{EBAY_PROD_CLIENT_SECRET}"
-    base64_credentials = base64.b64encode(credentials.encode()).decode()
-    headers = {"Content-Type": "application/x-www-form-urlencoded", "Authorization": f"Basic {base64_credentials}"}
-    body = {"grant_type": "authorization_code", "code": auth_code, "redirect_uri": EBAY_PROD_RUNAME}
+    url, headers, body = identity_token_request({"grant_type": "authorization_code", "code": auth_code, "redirect_uri": EBAY_PROD_RUNAME})
     
     try:
-        response = requests.post(url, headers=headers, data=body)
+        response = ebay_request('identity', 'POST', url, headers=headers, data=body)
         response.raise_for_status()
         data = response.json()
         
@@ -259,6 +756,54 @@ def ebay_callback():
         
     return redirect(f'{live_frontend_url}/publisher?error=true')
 
+# --- Offer Records ---
+# Offers created here are stored against the product, so the publisher reads
+# listing status from the DB; `flask ebay-sync` keeps them in step with eBay.
+
+def owned_product_id(user_id, product_id):
+    """Validates an optional product id from a request; raises LookupError if it isn't the user's."""
+    if product_id in (None, ''):
+        return None
+    product_id = int(product_id)
+    if not db.session.query(Product.id).filter(Product.id == product_id, Product.user_id == user_id).first():
+        raise LookupError(f"Product {product_id} not found")
+    return product_id
+
+def record_ebay_offer(user_id, product_id, sku, offer_id, price):
+    try:
+        db.session.add(EbayOffer(
+            user_id=user_id, product_id=product_id, sku=sku, offer_id=offer_id,
+            marketplace_id=OFFER_MARKETPLACE_ID, status='UNPUBLISHED', currency=OFFER_CURRENCY,
+            price=float(price) if price not in (None, '') else None, available_quantity=1, created_at=int(time.time())
+        ))
+        db.session.commit()
+    except Exception as e:
+        # The draft exists on eBay either way; the next sync can't find it, but the user still gets it
+        db.session.rollback()
+        print(f"!!! Could not record eBay offer {offer_id} ({sku}): {e}")
+
+def serialize_offer(offer):
+    return {
+        'id': offer.id, 'product_id': offer.product_id, 'sku': offer.sku, 'offer_id': offer.offer_id,
+        'marketplace_id': offer.marketplace_id, 'status': offer.status,
+        'listing_id': offer.listing_id, 'listing_status': offer.listing_status,
+        'price': offer.price, 'currency': offer.currency,
+        'available_quantity': offer.available_quantity, 'sold_quantity': offer.sold_quantity,
+        'created_at': offer.created_at, 'synced_at': offer.synced_at
+    }
+
+@api_bp.route('/api/ebay/offers', methods=['GET'])
+@login_required
+def list_ebay_offers():
+    """The user's offers as of the last sync; never calls eBay."""
+    query = EbayOffer.query.filter_by(user_id=current_user.id)
+    if request.args.get('product_id'):
+        try:
+            query = query.filter_by(product_id=int(request.args['product_id']))
+        except ValueError:
+            return jsonify({"error": "Invalid product_id"}), 400
+    return jsonify({"offers": [serialize_offer(offer) for offer in query.order_by(EbayOffer.id.desc())]})
+
 @api_bp.route('/api/ebay/create-draft', methods=['POST'])
 @login_required
 def create_ebay_draft():
@@ -266,6 +811,10 @@ def create_ebay_draft():
     title = data.get('title')
     description = data.get('description')
     price = data.get('price')
+    try:
+        product_id = owned_product_id(current_user.id, data.get('product_id'))
+    except (LookupError, ValueError):
+        return jsonify({"error": "Product not found"}), 404
     
     user_access_token = get_ebay_user_access_token(current_user)
     if not user_access_token:
@@ -275,43 +824,21 @@ def create_ebay_draft():
         return jsonify({"error": "Could not verify or create your eBay inventory location."}), 500
         
     sku = f"ALLY-{int(time.time())}"
-    inventory_url = f"https://api.ebay.com/sell/inventory/v1/inventory_item/{sku}"
-    inventory_headers = {"Authorization": f"Bearer {user_access_token}", "Content-Type": "application/json", "Content-Language": "en-GB"}
-    inventory_payload = {
-        "product": { "title": title, "description": description }, 
-        "condition": "NEW", 
-        "packageWeightAndSize": {
-            "dimensions": { "height": 10, "length": 10, "width": 10, "unit": "CENTIMETER" }, 
-            "weight": { "value": 250, "unit": "GRAM" }
-        }, 
-        "availability": { "shipToLocationAvailability": { "quantity": 1 } }
-    }
+    inventory_url = f"{EBAY_API_BASE}/sell/inventory/v1/inventory_item/{sku}"
+    inventory_headers = sell_headers(user_access_token)
+    inventory_payload = inventory_item_payload(title, description)
     
     response = None 
     try:
-        response = requests.put(inventory_url, headers=inventory_headers, json=inventory_payload)
+        response = ebay_request('sell', 'PUT', inventory_url, headers=inventory_headers, json=inventory_payload)
         response.raise_for_status()
         
-        offer_url = f"https://api.ebay.com/sell/inventory/v1/offer"
-        offer_payload = {
-            "sku": sku, 
-            "marketplaceId": "EBAY_GB", 
-            "format": "FIXED_PRICE", 
-            "listingDescription": description, 
-            "availableQuantity": 1, 
-            "pricingSummary": {"price": { "value": str(price), "currency": "GBP" }}, 
-            "listingPolicies": {
-                "fulfillmentPolicyId": "375545969023", 
-                "paymentPolicyId": "375545763023", 
-                "returnPolicyId": "375545771023"
-            }, 
-            "categoryId": "11700", 
-            "merchantLocationKey": "ALLY_DEFAULT"
-        }
-        response = requests.post(offer_url, headers=inventory_headers, json=offer_payload)
+        offer_url = f"{EBAY_API_BASE}/sell/inventory/v1/offer"
+        response = ebay_request('sell', 'POST', offer_url, headers=inventory_headers, json=offer_payload(sku, description, price))
         response.raise_for_status()
         
         offer_data = response.json()
+        record_ebay_offer(current_user.id, product_id, sku, offer_data.get('offerId'), price)
         return jsonify({"message": "Successfully created a draft offer on eBay!", "offerId": offer_data.get('offerId')}), 201
         
     except requests.exceptions.HTTPError as e:
@@ -323,6 +850,85 @@ def create_ebay_draft():
         print(f"!!! HTTP Error creating eBay draft: {e}")
         print(f"--- eBay Full Error Response: {error_details} ---")
         return jsonify({"error": "Failed to create draft on eBay.", "details": error_details}), 500
+    except CircuitOpenError as e:
+        print(f"!!! eBay Sell API unavailable: {e}")
+        return jsonify({"error": "eBay is currently unavailable. Please try again shortly."}), 503
     except Exception as e:
         print(f"!!! An unexpected error occurred creating eBay draft: {e}")
-        return jsonify({"error": "An unknown error occurred"}), 500
\ No newline at end of file
+        return jsonify({"error": "An unknown error occurred"}), 500
+
+# --- Listing Copy ---
+
+def run_listing_copy_job(job_id, items):
+    """Background half of a listing-copy job; `items` is [(product_id, key, attributes)]."""
+    job = listing_copy_jobs.get(job_id)
+    if job is None: # expired or evicted before a worker got to it
+        return
+    try:
+        job['status'] = 'running'
+        generated = get_generator().generate([(key, attrs) for _, key, attrs in items])
+        job['results'] = {product_id: generated.get(key) for product_id, key, _ in items}
+        job['status'] = 'done'
+    except Exception as e:
+        print(f"!!! Listing copy job {job_id} failed: {e}")
+        job['status'] = 'failed'
+    finally:
+        job['finished_at'] = int(time.time())
+
+@api_bp.route('/api/listing-copy/jobs', methods=['POST'])
+@login_required
+def create_listing_copy_job():
+    """
+    Starts generating eBay titles/descriptions for {"product_ids": [...]}.
+    Poll GET /api/listing-copy/jobs/<job_id> for the results.
+    """
+    data = request.get_json() or {}
+    try:
+        product_ids = [int(pid) for pid in data.get('product_ids', [])]
+    except (TypeError, ValueError):
+        return jsonify({"error": "product_ids must be a list of ids"}), 400
+    if not product_ids or len(product_ids) > LISTING_COPY_MAX_PRODUCTS:
+        return jsonify({"error": f"Send between 1 and {LISTING_COPY_MAX_PRODUCTS} product ids"}), 400
+    
+    products = Product.query.filter(Product.id.in_(product_ids), Product.user_id == current_user.id).options(
+        selectinload(Product.recipe).joinedload(RecipeItem.material),
+        selectinload(Product.components).joinedload(ProductComponent.component)
+    ).all()
+    if len(products) != len(set(product_ids)):
+        return jsonify({"error": "One or more products not found"}), 404
+    
+    items = []
+    for product in products:
+        attrs = product_attributes(product.name, [ri.material.name for ri in product.recipe], [pc.component.name for pc in product.components])
+        items.append((product.id, copy_cache_key(attrs), attrs))
+    
+    job_id = uuid.uuid4().hex
+    job = {"job_id": job_id, "user_id": current_user.id, "status": "queued", "results": None,
+           "created_at": int(time.time()), "finished_at": None}
+    listing_copy_jobs.set(job_id, job)
+    submit_once_to(copy_executor, ('listing-copy', job_id), run_listing_copy_job, job_id, items)
+    return jsonify({"job_id": job_id, "status": job['status']}), 202
+
+@api_bp.route('/api/listing-copy/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_listing_copy_job(job_id):
+    job = listing_copy_jobs.get(job_id)
+    if job is None or job['user_id'] != current_user.id:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({key: value for key, value in job.items() if key != 'user_id'})
+
+@api_bp.route('/api/listing-copy/metrics', methods=['GET'])
+@login_required
+def get_listing_copy_metrics():
+    generator = get_generator()
+    return jsonify({"backend": generator.backend.name, **generator.metrics.snapshot()})
+
+@api_bp.route('/api/ebay/status', methods=['GET'])
+@login_required
+def get_ebay_status():
+    return jsonify({
+        "circuits": [breaker.snapshot() for breaker in ebay_breakers.values()],
+        "cached_searches": len(market_cache),
+        "cached_items": len(item_metadata_cache),
+        "cached_related": len(related_items_cache)
+    })
@@ -0,0 +1,247 @@
+import asyncio
+import time
+import httpx
+from flask import request
+from flask_login import current_user
+from ..extensions import login_manager
+from ..services.background import submit_once
+from ..services.circuit_breaker import CircuitOpenError
+from ..services.popular_queries import popular_queries
+from . import api
+
+# --- Async eBay Views ---
+# Async versions of the upstream-bound endpoints in routes/api.py, used when
+# the app runs under ASGI (see app/asgi.py). Requests are built and responses
+# parsed by the same helpers as the WSGI views, and they share the circuit
+# breakers and caches; only the waiting on eBay is different.
+
+async_routes = [] # (rule, methods, view)
+
+def async_route(rule, methods):
+    def register(view):
+        async_routes.append((rule, methods, view))
+        return view
+    return register
+
+_client = None
+_app_token_lock = None
+_market_fetches = {} # cache key -> asyncio.Task, for identical concurrent lookups
+
+def get_async_client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=api.EBAY_TIMEOUT, limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+    return _client
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def async_ebay_request(family, method, url, **kwargs):
+    """ebay_request for httpx: same breaker, same 5xx/429 handling."""
+    async def _send():
+        response = await get_async_client().request(method, url, **kwargs)
+        if response.status_code >= 500 or response.status_code == 429:
+            response.raise_for_status()
+        return response
+    return await api.ebay_breakers[family].call_async(_send)
+
+async def async_get_app_token():
+    global _app_token_lock
+    token = api.cached_app_token()
+    if token:
+        return token
+    if _app_token_lock is None:
+        _app_token_lock = asyncio.Lock()
+    async with _app_token_lock:
+        # Another request may have fetched it while we waited
+        token = api.cached_app_token()
+        if token:
+            return token
+        url, headers, body = api.app_token_request()
+        try:
+            response = await async_ebay_request('identity', 'POST', url, headers=headers, data=body)
+            response.raise_for_status()
+            return api.store_app_token(response.json())
+        except Exception as e:
+            print(f"!!! Error getting eBay App token: {e}")
+            return None
+
+async def async_fetch_ebay_listings(search_term, marketplace_id='EBAY_GB', category_id=None, exclude_item_id=None):
+    token = await async_get_app_token()
+    if not token:
+        raise api.EbayUnavailableError("Could not get an eBay app token")
+    url, headers, params = api.browse_search_request(token, search_term, marketplace_id, category_id, exclude_item_id)
+    response = await async_ebay_request('browse', 'GET', url, headers=headers, params=params)
+    response.raise_for_status()
+    return api.normalize_item_summaries(response.json())
+
+async def async_fetch_market_snapshot(search_query, marketplace_id):
+    listings = await async_fetch_ebay_listings(search_query, marketplace_id=marketplace_id)
+    snapshot = {"listings": listings, "fetched_at": int(time.time())}
+    api.market_cache.set(api.market_cache_key(search_query, marketplace_id), snapshot)
+    return snapshot
+
+async def async_get_market_snapshot(search_query, marketplace_id):
+    """Same contract as api.get_market_snapshot."""
+    key = api.market_cache_key(search_query, marketplace_id)
+    entry = api.market_cache.lookup(key)
+    if entry and entry.fresh:
+        return entry.value, False
+
+    try:
+        task = _market_fetches.get(key)
+        if task is None:
+            task = asyncio.ensure_future(async_fetch_market_snapshot(search_query, marketplace_id))
+            _market_fetches[key] = task
+            task.add_done_callback(lambda _: _market_fetches.pop(key, None))
+        # shield: one caller disconnecting mustn't cancel the fetch for the others
+        return await asyncio.shield(task), False
+    except Exception as e:
+        print(f"!!! eBay unavailable for '{search_query}' ({marketplace_id}): {e}")
+        if entry is None:
+            raise api.EbayUnavailableError(str(e))
+        submit_once(('market-refresh',) + key, api.refresh_market_snapshot, search_query, marketplace_id)
+        return entry.value, True
+
+async def async_get_item_metadata(item_id, marketplace_id):
+    key = (item_id, marketplace_id)
+    metadata = api.item_metadata_cache.get(key)
+    if metadata is not None:
+        return metadata
+
+    token = await async_get_app_token()
+    if not token:
+        raise api.EbayUnavailableError("Could not get an eBay app token")
+    item_url, headers = api.item_request(token, item_id, marketplace_id)
+    item_response = await async_ebay_request('browse', 'GET', item_url, headers=headers)
+    item_response.raise_for_status()
+
+    metadata = api.parse_item_metadata(item_response.json())
+    api.item_metadata_cache.set(key, metadata)
+    return metadata
+
+async def async_get_related_listings(item_id, marketplace_id):
+    key = (item_id, marketplace_id)
+    listings = api.related_items_cache.get(key)
+    if listings is not None:
+        return listings
+
+    metadata = await async_get_item_metadata(item_id, marketplace_id)
+    if not metadata['category_id'] or not metadata['title']:
+        listings = []
+    else:
+        listings = await async_fetch_ebay_listings(
+            search_term=metadata['title'],
+            marketplace_id=marketplace_id,
+            category_id=metadata['category_id'],
+            exclude_item_id=item_id
+        )
+    api.related_items_cache.set(key, listings)
+    return listings
+
+async def async_get_user_access_token(refresh_token):
+    url, headers, body = api.user_token_request(refresh_token)
+    try:
+        response = await async_ebay_request('identity', 'POST', url, headers=headers, data=body)
+        response.raise_for_status()
+        return response.json()['access_token']
+    except Exception as e:
+        print(f"!!! Could not refresh eBay user access token: {e}")
+        return None
+
+async def async_ensure_merchant_location(user_access_token, location_key="ALLY_DEFAULT"):
+    headers = {"Authorization": f"Bearer {user_access_token}", "Content-Type": "application/json", "Accept": "application/json"}
+    location_url = f"{api.EBAY_API_BASE}/sell/inventory/v1/location/{location_key}"
+    try:
+        check_response = await async_ebay_request('sell', 'GET', location_url, headers=headers)
+        if check_response.status_code == 200:
+            return True
+        print(f"⚙️ Creating new inventory location '{location_key}'...")
+        create_response = await async_ebay_request('sell', 'POST', location_url, headers=headers, json=api.merchant_location_payload())
+    except Exception as e:
+        print(f"❌ Could not check or create inventory location: {e}")
+        return False
+    if create_response.status_code in [200, 201, 204]:
+        return True
+    print(f"❌ Failed to create inventory location: {create_response.text}")
+    return False
+
+# --- Views ---
+
+@async_route('/api/analyse', methods=['GET'])
+async def analyse_market(call):
+    try:
+        params = await call.begin(lambda: api.parse_analyse_args(request.args))
+    except (ValueError, TypeError):
+        return await call.respond(({"error": "Invalid request parameters"}, 400))
+
+    popular_queries.record(api.market_cache_key(params['search_query'], params['marketplace_id']))
+    try:
+        snapshot, is_stale = await async_get_market_snapshot(params['search_query'], params['marketplace_id'])
+    except api.EbayUnavailableError:
+        return await call.respond(({"error": "eBay is currently unavailable. Please try again shortly."}, 503))
+    return await call.respond(api.build_market_analysis(snapshot, is_stale, **params))
+
+@async_route('/api/related-items/<item_id>', methods=['GET'])
+async def get_related_items(call):
+    marketplace_id = await call.begin(lambda: request.args.get('marketplace', 'EBAY_GB'))
+    try:
+        related_listings = await async_get_related_listings(call.path_params['item_id'], marketplace_id)
+        return await call.respond({"listings": related_listings})
+    except (CircuitOpenError, api.EbayUnavailableError) as e:
+        print(f"!!! eBay unavailable in get_related_items: {e}")
+        return await call.respond(({"error": "eBay is currently unavailable. Please try again shortly."}, 503))
+    except Exception as e:
+        print(f"An unexpected error occurred in get_related_items: {e}")
+        return await call.respond(({"error": "An unexpected error occurred"}, 500))
+
+@async_route('/api/ebay/create-draft', methods=['POST'])
+async def create_ebay_draft(call):
+    def prepare():
+        if not current_user.is_authenticated:
+            return login_manager.unauthorized()
+        data = request.get_json()
+        token = current_user.ebay_token
+        product_id = api.owned_product_id(current_user.id, data.get('product_id'))
+        return data, token.refresh_token if token else None, current_user.id, product_id
+    try:
+        data, refresh_token, user_id, product_id = await call.begin(prepare)
+    except (LookupError, ValueError):
+        return await call.respond(({"error": "Product not found"}, 404))
+
+    user_access_token = await async_get_user_access_token(refresh_token) if refresh_token else None
+    if not user_access_token:
+        return await call.respond(({"error": "Could not authenticate with eBay. Please reconnect your account."}, 500))
+
+    if not await async_ensure_merchant_location(user_access_token):
+        return await call.respond(({"error": "Could not verify or create your eBay inventory location."}, 500))
+
+    sku = f"ALLY-{int(time.time())}"
+    headers = api.sell_headers(user_access_token)
+    try:
+        response = await async_ebay_request('sell', 'PUT', f"{api.EBAY_API_BASE}/sell/inventory/v1/inventory_item/{sku}",
+                                            headers=headers, json=api.inventory_item_payload(data.get('title'), data.get('description')))
+        response.raise_for_status()
+        response = await async_ebay_request('sell', 'POST', f"{api.EBAY_API_BASE}/sell/inventory/v1/offer",
+                                            headers=headers, json=api.offer_payload(sku, data.get('description'), data.get('price')))
+        response.raise_for_status()
+        offer_id = response.json().get('offerId')
+        await call.run(lambda: api.record_ebay_offer(user_id, product_id, sku, offer_id, data.get('price')))
+        return await call.respond(({"message": "Successfully created a draft offer on eBay!", "offerId": offer_id}, 201))
+    except httpx.HTTPStatusError as e:
+        try:
+            error_details = e.response.json()
+        except ValueError:
+            error_details = e.response.text
+        print(f"!!! HTTP Error creating eBay draft: {e}")
+        print(f"--- eBay Full Error Response: {error_details} ---")
+        return await call.respond(({"error": "Failed to create draft on eBay.", "details": error_details}, 500))
+    except CircuitOpenError as e:
+        print(f"!!! eBay Sell API unavailable: {e}")
+        return await call.respond(({"error": "eBay is currently unavailable. Please try again shortly."}, 503))
+    except Exception as e:
+        print(f"!!! An unexpected error occurred creating eBay draft: {e}")
+        return await call.respond(({"error": "An unknown error occurred"}, 500))
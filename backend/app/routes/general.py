@@ -1,7 +1,10 @@
 import os
-from flask import jsonify, request, current_app, Blueprint
+from flask import jsonify, request, current_app, Blueprint, Response
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
+from ..extensions import db
+from ..services.database import check_database
+from ..services.profiler import is_profiler_admin, list_profiles, read_profile
 
 # Create a Blueprint for our general routes
 general_bp = Blueprint('general_bp', __name__)
@@ -63,4 +66,33 @@ def contact_form():
         return jsonify({"error": "An internal error occurred sending the email."}), 500
     except Exception as e:
         print(f"!!! Error in contact_form: {e}")
-        return jsonify({"error": "An internal error occurred."}), 500
\ No newline at end of file
+        return jsonify({"error": "An internal error occurred."}), 500
+
+@general_bp.route('/api/health/db', methods=['GET'])
+def database_health():
+    try:
+        return jsonify({"status": "ok", **check_database(db.engine)}), 200
+    except Exception as e:
+        print(f"!!! Database health check failed: {e}")
+        return jsonify({"status": "error", "error": "Database unavailable"}), 503
+
+# --- Profiles (see services/profiler.py); authorized by the X-Ally-Profile token ---
+
+@general_bp.route('/api/admin/profiles', methods=['GET'])
+def get_profiles():
+    if not is_profiler_admin(current_app):
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify({"profiles": list_profiles()})
+
+@general_bp.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    if not is_profiler_admin(current_app):
+        return jsonify({"error": "Unauthorized"}), 403
+    kind = 'json' if request.args.get('format') == 'json' else 'folded'
+    data = read_profile(profile_id, kind)
+    if data is None:
+        return jsonify({"error": "Profile not found"}), 404
+    if kind == 'json':
+        return jsonify(data)
+    # Collapsed stacks, for flamegraph.pl or speedscope
+    return Response(data, mimetype='text/plain', headers={"Content-Disposition": f"attachment; filename={profile_id}.folded"})
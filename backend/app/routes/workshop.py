@@ -1,69 +1,437 @@
+import math
 from flask import jsonify, request
 from flask_login import login_required, current_user
 from flask import Blueprint
+from sqlalchemy.orm import selectinload
 from ..extensions import db
-from ..models import Material, Product, RecipeItem, User
+from ..models import Material, MaterialPriceTier, Product, RecipeItem, ProductComponent, User
+from ..services.costing import serialize_material, cost_products, price_impact
+from ..services.units import canonical_unit, conversion_factor, UnitConversionError
+from ..services.bom import check_components, dependents_closure, topological_order
+from ..services.pagination import keyset_page, page_size
+from ..services.name_search import name_search_filter
+from ..services.changes import record_change, record_changes, current_workshop_seq, changes_since
+from ..services.summary import workshop_summary
+from ..services.planner import material_requirements, capacity, shortfalls, plan_production
+from ..services.batch_costing import batch_costing, DEFAULT_BATCH_SIZES, MAX_BATCH_SIZES
+from ..services.cache import TTLCache
 
 # Create a Blueprint for our workshop routes
 workshop_bp = Blueprint('workshop_bp', __name__)
 
+# Dashboard summaries keyed by (user_id, workshop_seq): any edit bumps the seq,
+# so an entry is never stale, it just stops being asked for
+summary_cache = TTLCache(ttl=3600, max_entries=1000)
+
+def load_user_workshop(user_id):
+    """All of a user's materials and products, with recipes and components eagerly loaded."""
+    user_materials = Material.query.filter_by(user_id=user_id).options(selectinload(Material.price_tiers)).all()
+    # Load every recipe/component list in one extra query each instead of one per product
+    user_products = Product.query.filter_by(user_id=user_id).options(
+        selectinload(Product.recipe), selectinload(Product.components)
+    ).all()
+    return user_materials, user_products
+
+def load_component_graph(user_id, exclude_product_id=None):
+    """The user's sub-assembly edges as {product_id: [component ids]}, without loading products."""
+    edges = (
+        db.session.query(ProductComponent.product_id, ProductComponent.component_id)
+        .join(Product, Product.id == ProductComponent.product_id)
+        .filter(Product.user_id == user_id)
+    )
+    if exclude_product_id is not None:
+        edges = edges.filter(ProductComponent.product_id != exclude_product_id)
+    graph = {}
+    for parent_id, component_id in edges:
+        graph.setdefault(parent_id, []).append(component_id)
+    return graph
+
+def load_product_subset(user_id, product_ids, graph):
+    """`product_ids`, their sub-assemblies and the materials those use, instead of the whole workshop."""
+    needed_ids = topological_order(graph, product_ids)
+    products = Product.query.filter(Product.id.in_(needed_ids), Product.user_id == user_id).options(
+        selectinload(Product.recipe), selectinload(Product.components)
+    ).all()
+    material_ids = {ri.material_id for p in products for ri in p.recipe}
+    materials = Material.query.filter(Material.id.in_(material_ids), Material.user_id == user_id).options(
+        selectinload(Material.price_tiers)
+    ).all()
+    return products, materials
+
+def cost_product_subset(user_id, product_ids, graph):
+    """Costs just `product_ids`, loading only what they need."""
+    if not product_ids:
+        return []
+    products, materials = load_product_subset(user_id, product_ids, graph)
+    return cost_products(products, materials, only_ids=set(product_ids))
+
+def products_using_materials(user_id, material_ids, graph):
+    """
+    Products that use any of `material_ids`, directly or through sub-assemblies.
+    The direct users come from the recipe_item.material_id index.
+    """
+    direct_ids = {pid for (pid,) in db.session.query(RecipeItem.product_id).join(Product, Product.id == RecipeItem.product_id).filter(
+        RecipeItem.material_id.in_(material_ids), Product.user_id == user_id
+    )}
+    return dependents_closure(graph, direct_ids)
+
 @workshop_bp.route('/api/workshop', methods=['GET'])
 @login_required
 def get_workshop_data():
-    user_materials = Material.query.filter_by(user_id=current_user.id).all()
-    user_products = Product.query.filter_by(user_id=current_user.id).all()
+    # Read the seq first: anything written while we load will show up again in the next delta
+    seq = current_workshop_seq(current_user.id)
+    user_materials, user_products = load_user_workshop(current_user.id)
+    
+    materials_data = [serialize_material(m) for m in user_materials]
+    products_data = cost_products(user_products, user_materials)
+    return jsonify({"materials": materials_data, "products": products_data, "seq": seq})
+
+@workshop_bp.route('/api/workshop/changes', methods=['GET'])
+@login_required
+def get_workshop_changes():
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"error": "Invalid 'since' parameter"}), 400
     
-    materials_data = [{'id': m.id, 'name': m.name, 'cost': m.cost, 'quantity': m.quantity, 'unit': m.unit} for m in user_materials]
-    products_data = []
+    seq, changes = changes_since(current_user.id, since)
+    if changes is None:
+        # The log doesn't reach back that far; the client must reload /api/workshop
+        return jsonify({"reset": True, "seq": seq})
     
-    # Create a dictionary for easy lookup
-    materials_dict = {m.id: m for m in user_materials}
+    def ids(entity, op):
+        return {entity_id for (e, entity_id), o in changes.items() if e == entity and o == op}
+    material_upserts, material_deletes = ids('material', 'upsert'), ids('material', 'delete')
+    product_upserts, product_deletes = ids('product', 'upsert'), ids('product', 'delete')
     
-    # Calculate cost per unit for each material
-    for m_data in materials_data:
-        material = materials_dict.get(m_data['id'])
-        if material and material.quantity > 0:
-            m_data['cost_per_unit'] = round(material.cost / material.quantity, 4)
-        else:
-            m_data['cost_per_unit'] = 0
-            
-    # Calculate costs for each product
-    for p in user_products:
-        material_cost = 0
-        for ri in p.recipe:
-            # Find the material's cost per unit from our pre-calculated list
-            material_info = next((m for m in materials_data if m['id'] == ri.material_id), None)
-            cost_per_unit = material_info.get('cost_per_unit', 0) if material_info else 0
-            material_cost += cost_per_unit * ri.quantity
-        
-        material_cost = round(material_cost, 2)
-        labour_cost = round(p.labour_hours * p.hourly_rate, 2)
-        total_cost = material_cost + labour_cost
-        suggested_price = round(total_cost * (1 + (p.profit_margin / 100)), 2)
-        
-        products_data.append({
-            'id': p.id, 'name': p.name,
-            'recipe': [{'material_id': ri.material_id, 'quantity': ri.quantity} for ri in p.recipe],
-            'labour_hours': p.labour_hours, 'hourly_rate': p.hourly_rate, 'profit_margin': p.profit_margin,
-            'material_cost': material_cost, 'labour_cost': labour_cost, 'total_cost': total_cost, 'suggested_price': suggested_price
+    materials = Material.query.filter(Material.id.in_(material_upserts), Material.user_id == current_user.id).options(
+        selectinload(Material.price_tiers)
+    ).all() if material_upserts else []
+    
+    # Products whose cost may have moved: edited ones, users of changed materials,
+    # and everything built from those as a sub-assembly
+    touched_materials = material_upserts | material_deletes
+    direct_ids = set(product_upserts)
+    if touched_materials:
+        direct_ids.update(pid for (pid,) in db.session.query(RecipeItem.product_id).filter(RecipeItem.material_id.in_(touched_materials)))
+    graph = load_component_graph(current_user.id)
+    affected_ids = dependents_closure(graph, direct_ids) - product_deletes
+    
+    return jsonify({
+        "seq": seq,
+        "materials": {"upserted": [serialize_material(m) for m in materials], "deleted": sorted(material_deletes)},
+        "products": {"upserted": cost_product_subset(current_user.id, affected_ids, graph), "deleted": sorted(product_deletes)}
+    })
+
+@workshop_bp.route('/api/workshop/summary', methods=['GET'])
+@login_required
+def get_workshop_summary():
+    seq = current_workshop_seq(current_user.id)
+    key = (current_user.id, seq)
+    summary = summary_cache.get(key)
+    if summary is None:
+        summary = workshop_summary(current_user.id)
+        summary_cache.set(key, summary)
+    return jsonify(dict(summary, seq=seq))
+
+# --- Production Planner ---
+
+def parse_unit_counts(raw, field):
+    """{"<product id>": units} -> {int id: int units}; raises ValueError."""
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"'{field}' must map product ids to units")
+    counts = {int(product_id): int(units) for product_id, units in raw.items()}
+    if any(units < 0 for units in counts.values()):
+        raise ValueError(f"'{field}' can't be negative")
+    return counts
+
+@workshop_bp.route('/api/workshop/plan', methods=['POST'])
+@login_required
+def plan_workshop_production():
+    """
+    Body (all optional): {"mix": {product_id: units}} to check a target mix
+    against stock, {"limits": {product_id: max units}} to cap the batch plan.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        mix = parse_unit_counts(data.get('mix'), 'mix')
+        limits = parse_unit_counts(data.get('limits'), 'limits')
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    user_materials, user_products = load_user_workshop(current_user.id)
+    product_names = {p.id: p.name for p in user_products}
+    unknown = (set(mix) | set(limits)) - set(product_names)
+    if unknown:
+        return jsonify({"error": f"Unknown products: {sorted(unknown)}"}), 404
+    
+    material_names = {m.id: m.name for m in user_materials}
+    stock = {m.id: m.stock for m in user_materials}
+    requirements = material_requirements(user_products, user_materials)
+    profits = {p['id']: round(p['suggested_price'] - p['total_cost'], 2) for p in cost_products(user_products, user_materials)}
+    
+    products = []
+    for product in user_products:
+        units, bottleneck = capacity(requirements[product.id], stock)
+        products.append({
+            "id": product.id, "name": product.name, "profit_per_unit": profits[product.id],
+            "max_units": units, # None: no tracked material limits it
+            "bottleneck": {"id": bottleneck, "name": material_names[bottleneck]} if bottleneck else None,
         })
-        
-    return jsonify({"materials": materials_data, "products": products_data})
+    
+    def usage_rows(usage, missing):
+        return [
+            {"material_id": material_id, "name": material_names[material_id], "required": round(used, 4),
+             "stock": stock[material_id], "shortfall": round(missing.get(material_id, 0), 4)}
+            for material_id, used in sorted(usage.items())
+        ]
+    
+    plan, remaining = plan_production(requirements, profits, stock, limits)
+    plan_usage, _ = shortfalls(requirements, plan, stock)
+    response = {
+        "products": products,
+        "plan": {
+            "items": [{"id": product_id, "name": product_names[product_id], "units": units, "profit": round(profits[product_id] * units, 2)}
+                      for product_id, units in sorted(plan.items(), key=lambda item: -profits[item[0]] * item[1])],
+            "total_profit": round(sum(profits[product_id] * units for product_id, units in plan.items()), 2),
+            "materials": usage_rows(plan_usage, {}),
+        },
+    }
+    if mix:
+        usage, missing = shortfalls(requirements, mix, stock)
+        response["mix"] = {"feasible": not missing, "materials": usage_rows(usage, missing)}
+    return jsonify(response)
+
+# --- Batch Costing ---
+
+def parse_batch_sizes(raw):
+    """'1,10,100' -> sorted unique [1, 10, 100]; the defaults if missing. Raises ValueError."""
+    if not raw:
+        return list(DEFAULT_BATCH_SIZES)
+    try:
+        sizes = sorted({int(size) for size in raw.split(',') if size.strip()})
+    except ValueError:
+        raise ValueError("Batch sizes must be positive whole numbers")
+    if not sizes or sizes[0] < 1:
+        raise ValueError("Batch sizes must be positive whole numbers")
+    if len(sizes) > MAX_BATCH_SIZES:
+        raise ValueError(f"At most {MAX_BATCH_SIZES} batch sizes")
+    return sizes
+
+@workshop_bp.route('/api/workshop/batch-costs', methods=['GET'])
+@login_required
+def get_batch_costs():
+    """
+    Per-unit cost and suggested price of every product (or ?product_ids=1,2)
+    at each of ?batch_sizes=1,10,100, with material price breaks applied.
+    """
+    try:
+        batch_sizes = parse_batch_sizes(request.args.get('batch_sizes'))
+        product_ids = {int(pid) for pid in request.args['product_ids'].split(',')} if request.args.get('product_ids') else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if product_ids is None:
+        user_materials, user_products = load_user_workshop(current_user.id)
+    else:
+        user_products, user_materials = load_product_subset(current_user.id, list(product_ids), load_component_graph(current_user.id))
+        if not product_ids <= {p.id for p in user_products}:
+            return jsonify({"error": "One or more products not found"}), 404
+    return jsonify({"batch_sizes": batch_sizes, "products": batch_costing(user_products, user_materials, batch_sizes, only_ids=product_ids)})
+
+# --- Paginated Lists ---
+MATERIAL_SORTS = {'name': Material.name, 'cost': Material.cost, 'id': Material.id}
+PRODUCT_SORTS = {'name': Product.name, 'id': Product.id}
+
+def list_page_args(sorts):
+    """Reads sort/order/limit/cursor/q from the query string; raises ValueError on bad input."""
+    sort = request.args.get('sort', 'name')
+    if sort not in sorts:
+        raise ValueError(f"Can't sort by '{sort}'")
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    return {
+        'sort_column': sorts[sort],
+        'descending': order == 'desc',
+        'limit': page_size(request.args.get('limit')),
+        'cursor': request.args.get('cursor'),
+    }
+
+@workshop_bp.route('/api/materials', methods=['GET'])
+@login_required
+def list_materials():
+    try:
+        args = list_page_args(MATERIAL_SORTS)
+        query = Material.query.filter(Material.user_id == current_user.id).options(selectinload(Material.price_tiers))
+        if request.args.get('q'):
+            query = query.filter(name_search_filter(Material.id, 'material', current_user.id, request.args['q']))
+        materials, next_cursor = keyset_page(query, id_column=Material.id, **args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"materials": [serialize_material(m) for m in materials], "next_cursor": next_cursor})
+
+@workshop_bp.route('/api/products', methods=['GET'])
+@login_required
+def list_products():
+    try:
+        args = list_page_args(PRODUCT_SORTS)
+        query = Product.query.filter(Product.user_id == current_user.id)
+        if request.args.get('q'):
+            query = query.filter(name_search_filter(Product.id, 'product', current_user.id, request.args['q']))
+        products, next_cursor = keyset_page(query, id_column=Product.id, **args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Only this page (and the sub-assemblies it uses) gets loaded and costed
+    page_ids = [p.id for p in products]
+    costed = {p['id']: p for p in cost_product_subset(current_user.id, page_ids, load_component_graph(current_user.id))}
+    return jsonify({"products": [costed[pid] for pid in page_ids], "next_cursor": next_cursor})
+
+def parse_recipe_items(items):
+    """
+    Turns the request's recipe lines into (material_id, quantity, unit) tuples.
+    A line's unit is optional; when given it must convert to the material's unit.
+    """
+    material_ids = [int(item['material_id']) for item in items]
+    material_units = dict(
+        db.session.query(Material.id, Material.unit)
+        .filter(Material.id.in_(material_ids), Material.user_id == current_user.id)
+    )
+    parsed = []
+    for material_id, item in zip(material_ids, items):
+        if item.get('unit') is not None and not isinstance(item['unit'], str):
+            raise ValueError(f"Unit for material {material_id} must be text")
+        unit = canonical_unit(item.get('unit')) or None
+        if unit and material_id in material_units:
+            conversion_factor(unit, material_units[material_id])
+        parsed.append((material_id, float(item['quantity']), unit))
+    return parsed
+
+def parse_components(items, product_id=None):
+    """
+    Turns the request's sub-assembly lines into (component_id, quantity) tuples.
+    Components must be the user's own products and must not create a cycle.
+    """
+    components = [(int(item['product_id']), float(item['quantity'])) for item in items]
+    component_ids = {component_id for component_id, _ in components}
+    owned = {pid for (pid,) in db.session.query(Product.id).filter(Product.id.in_(component_ids), Product.user_id == current_user.id)}
+    if owned != component_ids:
+        raise ValueError("Components must be your own products")
+    
+    if product_id is not None and component_ids:
+        graph = load_component_graph(current_user.id, exclude_product_id=product_id)
+        check_components(graph, product_id, component_ids)
+    return components
+
+def sync_recipe(product, recipe):
+    """
+    Brings product.recipe in line with `recipe` ((material_id, quantity, unit)
+    tuples), touching only lines that actually changed. Unchanged lines keep
+    their row and id. Returns True if anything changed.
+    """
+    existing = {}
+    for ri in product.recipe:
+        existing.setdefault((ri.material_id, ri.unit), []).append(ri)
+    
+    changed = False
+    for material_id, quantity, unit in recipe:
+        matches = existing.get((material_id, unit))
+        if matches:
+            ri = matches.pop(0)
+            if ri.quantity != quantity:
+                ri.quantity = quantity
+                changed = True
+        else:
+            product.recipe.append(RecipeItem(material_id=material_id, quantity=quantity, unit=unit))
+            changed = True
+    
+    for leftovers in existing.values():
+        for ri in leftovers:
+            product.recipe.remove(ri) # delete-orphan removes the row
+            changed = True
+    return changed
+
+def sync_components(product, components):
+    """Same as sync_recipe, for (component_id, quantity) sub-assembly lines."""
+    existing = {}
+    for pc in product.components:
+        existing.setdefault(pc.component_id, []).append(pc)
+    
+    changed = False
+    for component_id, quantity in components:
+        matches = existing.get(component_id)
+        if matches:
+            pc = matches.pop(0)
+            if pc.quantity != quantity:
+                pc.quantity = quantity
+                changed = True
+        else:
+            product.components.append(ProductComponent(component_id=component_id, quantity=quantity))
+            changed = True
+    
+    for leftovers in existing.values():
+        for pc in leftovers:
+            product.components.remove(pc)
+            changed = True
+    return changed
 
 # --- Material Routes ---
 
+def parse_stock(value):
+    """Optional on-hand stock; None (or missing) means the material isn't tracked."""
+    if value is None:
+        return None
+    stock = float(value)
+    if stock < 0:
+        raise ValueError("Stock can't be negative")
+    return stock
+
+def parse_price_tiers(items):
+    """[{"min_quantity": 10, "cost_per_unit": 0.8}, ...] -> sorted [(min_quantity, cost_per_unit)]; raises ValueError."""
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        raise ValueError("price_tiers must be a list")
+    tiers = sorted((float(item['min_quantity']), float(item['cost_per_unit'])) for item in items)
+    if not all(math.isfinite(min_quantity) and math.isfinite(cost) for min_quantity, cost in tiers):
+        raise ValueError("Tier quantities and costs must be numbers")
+    if any(min_quantity <= 0 or cost < 0 for min_quantity, cost in tiers):
+        raise ValueError("Tier quantities must be positive and costs can't be negative")
+    if len({min_quantity for min_quantity, _ in tiers}) != len(tiers):
+        raise ValueError("Two tiers start at the same quantity")
+    return tiers
+
+def sync_price_tiers(material, tiers):
+    """Replaces the material's price breaks with `tiers` (from parse_price_tiers)."""
+    material.price_tiers = [MaterialPriceTier(min_quantity=min_quantity, cost_per_unit=cost) for min_quantity, cost in tiers]
+
 @workshop_bp.route('/api/materials', methods=['POST'])
 @login_required
 def add_material():
     data = request.get_json()
+    try:
+        stock = parse_stock(data.get('stock'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid stock"}), 400
+    try:
+        tiers = parse_price_tiers(data.get('price_tiers'))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid price_tiers: {e}"}), 400
     new_material = Material(
         name=data['name'], 
         cost=float(data['cost']), 
         quantity=float(data['quantity']), 
         unit=data['unit'], 
+        stock=stock,
         owner=current_user
     )
+    sync_price_tiers(new_material, tiers)
     db.session.add(new_material)
+    db.session.flush() # Assigns new_material.id
+    record_change(current_user.id, 'material', new_material.id)
     db.session.commit()
     return jsonify({"message": "Material added"}), 201
 
@@ -75,12 +443,86 @@ def update_material(material_id):
         return jsonify({"error": "Unauthorized"}), 403
     
     data = request.get_json()
+    
+    # Recipe lines with their own unit must still be convertible after a unit change
+    recipe_units = db.session.query(RecipeItem.unit).filter(
+        RecipeItem.material_id == material.id, RecipeItem.unit.isnot(None)
+    ).distinct()
+    try:
+        for (recipe_unit,) in recipe_units:
+            conversion_factor(recipe_unit, data['unit'])
+    except UnitConversionError:
+        return jsonify({"error": f"Recipes use this material in '{recipe_unit}', which can't be converted to '{data['unit']}'."}), 400
+    
+    try:
+        # Clients that don't know about stock leave it as it is
+        stock = parse_stock(data['stock']) if 'stock' in data else material.stock
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid stock"}), 400
+    try:
+        tiers = parse_price_tiers(data['price_tiers']) if 'price_tiers' in data else None
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid price_tiers: {e}"}), 400
+    
     material.name = data['name']
     material.cost = float(data['cost'])
     material.quantity = float(data['quantity'])
     material.unit = data['unit']
+    material.stock = stock
+    if tiers is not None:
+        # Flush the old rows out first: the new ones may reuse their min_quantity
+        material.price_tiers = []
+        db.session.flush()
+        sync_price_tiers(material, tiers)
+    record_change(current_user.id, 'material', material.id)
     db.session.commit()
-    return jsonify({"message": "Material updated"}), 200
+    
+    # Re-cost only the products that use this material, directly or via sub-assemblies
+    graph = load_component_graph(current_user.id)
+    affected_products = cost_product_subset(current_user.id, products_using_materials(current_user.id, [material.id], graph), graph)
+    return jsonify({"message": "Material updated", "products": affected_products}), 200
+
+@workshop_bp.route('/api/materials/impact', methods=['POST'])
+@login_required
+def material_price_impact():
+    """
+    What-if for supplier price changes, nothing is saved. Body:
+    {"changes": [{"material_id": 1, "cost": 25.0} or {"material_id": 1, "percent": 10}]}
+    Returns old vs new cost, price and margin for every product affected.
+    """
+    data = request.get_json() or {}
+    changes = data.get('changes')
+    if not isinstance(changes, list) or not changes:
+        return jsonify({"error": "No changes given"}), 400
+    try:
+        requested = {int(change['material_id']): change for change in changes}
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Each change needs a material_id"}), 400
+    
+    materials = {m.id: m for m in Material.query.filter(Material.id.in_(requested), Material.user_id == current_user.id)}
+    if len(materials) != len(requested):
+        return jsonify({"error": "One or more materials not found"}), 404
+    try:
+        cost_overrides = {}
+        for material_id, change in requested.items():
+            if 'cost' in change:
+                cost_overrides[material_id] = float(change['cost'])
+            else:
+                cost_overrides[material_id] = materials[material_id].cost * (1 + float(change['percent']) / 100)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Each change needs a numeric 'cost' or 'percent'"}), 400
+    
+    graph = load_component_graph(current_user.id)
+    affected_ids = products_using_materials(current_user.id, list(requested), graph)
+    if not affected_ids:
+        return jsonify({"products": [], "unprofitable": 0})
+    
+    # Load once, cost twice: as things are and with the proposed prices
+    products, used_materials = load_product_subset(current_user.id, affected_ids, graph)
+    before = cost_products(products, used_materials, only_ids=affected_ids)
+    after = cost_products(products, used_materials, only_ids=affected_ids, cost_overrides=cost_overrides)
+    rows = price_impact(before, after)
+    return jsonify({"products": rows, "unprofitable": sum(1 for row in rows if row['unprofitable'])})
 
 @workshop_bp.route('/api/materials/<int:material_id>', methods=['DELETE'])
 @login_required
@@ -90,6 +532,7 @@ def delete_material(material_id):
         return jsonify({"error": "Unauthorized"}), 403
     
     db.session.delete(material)
+    record_change(current_user.id, 'material', material.id, op='delete')
     db.session.commit()
     return jsonify({"message": "Material deleted"}), 200
 
@@ -99,23 +542,24 @@ def delete_material(material_id):
 @login_required
 def add_product():
     data = request.get_json()
+    try:
+        recipe = parse_recipe_items(data['recipe'])
+        components = parse_components(data.get('components', []))
+    except ValueError as e: # unit mismatches, cycles and bad component ids
+        return jsonify({"error": str(e)}), 400
+    
     new_product = Product(
         name=data['name'], 
         owner=current_user,
         labour_hours=float(data.get('labour_hours', 0)),
         hourly_rate=float(data.get('hourly_rate', 0)),
-        profit_margin=float(data.get('profit_margin', 100))
+        profit_margin=float(data.get('profit_margin', 100)),
+        recipe=[RecipeItem(material_id=material_id, quantity=quantity, unit=unit) for material_id, quantity, unit in recipe],
+        components=[ProductComponent(component_id=component_id, quantity=quantity) for component_id, quantity in components]
     )
     db.session.add(new_product)
-    db.session.commit() # Commit to get product.id
-
-    for item in data['recipe']:
-        recipe_item = RecipeItem(
-            material_id=int(item['material_id']), 
-            quantity=float(item['quantity']), 
-            product_id=new_product.id
-        )
-        db.session.add(recipe_item)
+    db.session.flush() # Assigns new_product.id within the same transaction
+    record_change(current_user.id, 'product', new_product.id)
     db.session.commit()
     return jsonify({"message": "Product added"}), 201
 
@@ -127,25 +571,94 @@ def update_product(product_id):
         return jsonify({"error": "Unauthorized"}), 403
     
     data = request.get_json()
+    try:
+        recipe = parse_recipe_items(data['recipe'])
+        # Components are only replaced when the request sends them
+        components = parse_components(data['components'], product_id=product.id) if 'components' in data else None
+    except ValueError as e: # unit mismatches, cycles and bad component ids
+        return jsonify({"error": str(e)}), 400
     
-    product.name = data['name']
-    product.labour_hours = float(data.get('labour_hours', 0))
-    product.hourly_rate = float(data.get('hourly_rate', 0))
-    product.profit_margin = float(data.get('profit_margin', 100))
-    
-    # Recreate the recipe
-    RecipeItem.query.filter_by(product_id=product.id).delete()
-    for item in data['recipe']:
-        recipe_item = RecipeItem(
-            material_id=int(item['material_id']), 
-            quantity=float(item['quantity']), 
-            product_id=product.id
-        )
-        db.session.add(recipe_item)
+    fields = {
+        'name': data['name'],
+        'labour_hours': float(data.get('labour_hours', 0)),
+        'hourly_rate': float(data.get('hourly_rate', 0)),
+        'profit_margin': float(data.get('profit_margin', 100)),
+    }
+    changed = False
+    for field, value in fields.items():
+        if getattr(product, field) != value:
+            setattr(product, field, value)
+            changed = True
     
+    # Only insert/update/delete the recipe lines that changed
+    changed = sync_recipe(product, recipe) or changed
+    if components is not None:
+        changed = sync_components(product, components) or changed
+    
+    # A save that changed nothing doesn't bump the workshop seq
+    if changed:
+        record_change(current_user.id, 'product', product.id)
     db.session.commit()
     return jsonify({"message": "Product updated"}), 200
 
+# Fields the batch endpoint may change, and the operations it understands
+BATCH_PRODUCT_FIELDS = ('labour_hours', 'hourly_rate', 'profit_margin')
+BATCH_OPERATIONS = ('set', 'add', 'multiply')
+
+def parse_batch_changes(changes):
+    """{'hourly_rate': {'add': 2}} -> {Product.hourly_rate: <SQL expression>}"""
+    if not isinstance(changes, dict) or not changes:
+        raise ValueError("Nothing to change")
+    values = {}
+    for field, change in changes.items():
+        if field not in BATCH_PRODUCT_FIELDS:
+            raise ValueError(f"'{field}' can't be batch edited")
+        if not isinstance(change, dict) or len(change) != 1:
+            raise ValueError(f"'{field}' needs exactly one of: {', '.join(BATCH_OPERATIONS)}")
+        operation, amount = next(iter(change.items()))
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}'")
+        amount = float(amount)
+        column = getattr(Product, field)
+        if operation == 'set':
+            values[column] = amount
+        elif operation == 'add':
+            values[column] = column + amount
+        else:
+            values[column] = column * amount
+    return values
+
+@workshop_bp.route('/api/products/batch', methods=['PUT'])
+@login_required
+def batch_update_products():
+    """
+    Applies the same change to many products in one UPDATE, e.g.
+    {"changes": {"hourly_rate": {"add": 2}}} raises the rate everywhere.
+    Optional "product_ids" limits it; either every product changes or none do.
+    """
+    data = request.get_json() or {}
+    try:
+        values = parse_batch_changes(data.get('changes'))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    query = db.session.query(Product.id).filter(Product.user_id == current_user.id)
+    if data.get('product_ids') is not None:
+        try:
+            product_ids = {int(pid) for pid in data['product_ids']}
+        except (ValueError, TypeError):
+            return jsonify({"error": "product_ids must be a list of ids"}), 400
+        query = query.filter(Product.id.in_(product_ids))
+    target_ids = [row.id for row in query]
+    if data.get('product_ids') is not None and len(target_ids) != len(product_ids):
+        return jsonify({"error": "One or more products not found"}), 404
+    
+    if target_ids:
+        Product.query.filter(Product.id.in_(target_ids)).update(values, synchronize_session=False)
+        record_changes(current_user.id, 'product', target_ids)
+    db.session.commit()
+    return jsonify({"message": f"{len(target_ids)} products updated", "updated": len(target_ids)}), 200
+
 @workshop_bp.route('/api/products/<int:product_id>', methods=['DELETE'])
 @login_required
 def delete_product(product_id):
@@ -153,6 +666,10 @@ def delete_product(product_id):
     if product.user_id != current_user.id: 
         return jsonify({"error": "Unauthorized"}), 403
     
+    if ProductComponent.query.filter_by(component_id=product.id).first():
+        return jsonify({"error": "This product is used as a component of other products. Remove it from them first."}), 409
+    
     db.session.delete(product)
+    record_change(current_user.id, 'product', product.id, op='delete')
     db.session.commit()
     return jsonify({"message": "Product deleted"}), 200
\ No newline at end of file
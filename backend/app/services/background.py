@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Background Work ---
+# A single small pool shared by the whole process, so a burst of refreshes
+# can't spawn an unbounded number of threads inside a web worker.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ally-bg')
+# Listing copy waits on a language model for a minute or more per job, so it
+# gets its own workers and can't hold up the quick eBay refreshes above.
+copy_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ally-copy')
+_in_flight = set()
+_lock = threading.Lock()
+
+class RunAgain(Exception):
+    """
+    Raised by a background job to be run again after `delay` seconds, with
+    `kwargs` updated. The wait happens on a timer thread rather than a pool
+    worker, and the job's key stays claimed so the same work isn't queued twice.
+    """
+    def __init__(self, delay, **kwargs):
+        super().__init__(f"run again in {delay}s")
+        self.delay = delay
+        self.kwargs = kwargs
+
+def submit_once(key, func, *args, **kwargs):
+    """
+    Runs `func` on the background pool unless a job with the same key is
+    already queued, running or waiting to run again. Returns True if the job
+    was submitted.
+    """
+    return submit_once_to(_executor, key, func, *args, **kwargs)
+
+def submit_once_to(executor, key, func, *args, **kwargs):
+    """submit_once on a given pool, e.g. copy_executor."""
+    with _lock:
+        if key in _in_flight:
+            return False
+        _in_flight.add(key)
+    executor.submit(_run, executor, key, func, args, kwargs)
+    return True
+
+def _run(executor, key, func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except RunAgain as again:
+        timer = threading.Timer(again.delay, executor.submit, (_run, executor, key, func, args, dict(kwargs, **again.kwargs)))
+        timer.daemon = True
+        timer.start()
+        return
+    except Exception as e:
+        print(f"!!! Background job {key} failed: {e}")
+    with _lock:
+        _in_flight.discard(key)
+
+def is_in_flight(key):
+    with _lock:
+        return key in _in_flight
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller
+    runs the function, everyone who arrives while it is running waits for
+    and shares its result (or exception).
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = func(*args, **kwargs)
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
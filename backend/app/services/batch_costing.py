@@ -0,0 +1,91 @@
+import bisect
+from .costing import material_cost_per_unit, component_graph
+from .planner import material_requirements
+from .bom import topological_order
+
+# --- Batch Costing ---
+# Per-unit product cost at several batch sizes, for the whole catalog at once.
+# Making n of a product buys n times its flattened material needs, and each
+# material's price breaks (MaterialPriceTier) apply to that total. With the
+# planner's sparse product x material requirement matrix `need`:
+#     unit_cost[p][n] = flat[p] + sum over tiered m of need[p][m] * (rate_m(need[p][m] * n) - base_m)
+# flat[p] (every material at its base price, plus labour) takes one pass over
+# the matrix; only the entries in tiered columns are then evaluated per batch
+# size, each a bisect into the material's break points. Sub-assemblies are
+# expanded into raw materials and labour, and nothing is rounded until the
+# end, so batch size 1 can differ from /api/workshop by a cent or so.
+
+DEFAULT_BATCH_SIZES = (1, 10, 25, 50, 100)
+MAX_BATCH_SIZES = 20
+
+def tier_schedule(material):
+    """(break points, rates per unit) with the base price first, or None if the material has no tiers."""
+    if not material.price_tiers:
+        return None
+    thresholds, rates = [0.0], [material_cost_per_unit(material)]
+    for tier in material.price_tiers: # ordered by min_quantity
+        thresholds.append(tier.min_quantity)
+        rates.append(tier.cost_per_unit)
+    return thresholds, rates
+
+def rate_at(schedule, quantity):
+    """Cost per unit when buying `quantity` in one go."""
+    thresholds, rates = schedule
+    return rates[bisect.bisect_right(thresholds, quantity * (1 + 1e-9)) - 1]
+
+def labour_per_unit(products):
+    """{product_id: labour cost of one unit, sub-assemblies included}."""
+    by_id = {p.id: p for p in products}
+    labour = {}
+    for product_id in topological_order(component_graph(products), list(by_id)):
+        product = by_id[product_id]
+        labour[product_id] = product.labour_hours * product.hourly_rate + sum(
+            labour[pc.component_id] * pc.quantity for pc in product.components
+        )
+    return labour
+
+def batch_unit_costs(products, materials, batch_sizes):
+    """
+    {product_id: [cost of one unit when making n, for n in batch_sizes]}.
+    `products` must include every product that can appear as a component.
+    """
+    requirements = material_requirements(products, materials)
+    labour = labour_per_unit(products)
+    base_rates = {m.id: material_cost_per_unit(m) for m in materials}
+    schedules = {}
+    for m in materials:
+        schedule = tier_schedule(m)
+        if schedule:
+            schedules[m.id] = schedule
+
+    costs = {}
+    for product_id, need in requirements.items():
+        flat = labour[product_id]
+        tiered = []
+        for material_id, quantity in need.items():
+            flat += quantity * base_rates[material_id]
+            if material_id in schedules and quantity > 0:
+                tiered.append((quantity, base_rates[material_id], schedules[material_id]))
+        costs[product_id] = [
+            flat + sum(quantity * (rate_at(schedule, quantity * n) - base_rate) for quantity, base_rate, schedule in tiered)
+            for n in batch_sizes
+        ]
+    return costs
+
+def batch_costing(products, materials, batch_sizes, only_ids=None):
+    """Rows for the batch costing endpoint: per-unit cost and suggested price at each batch size."""
+    costs = batch_unit_costs(products, materials, batch_sizes)
+    rows = []
+    for product in products:
+        if only_ids is not None and product.id not in only_ids:
+            continue
+        markup = 1 + product.profit_margin / 100
+        rows.append({
+            'id': product.id, 'name': product.name,
+            'batches': [
+                {'batch_size': n, 'unit_cost': round(cost, 2), 'suggested_price': round(cost * markup, 2),
+                 'batch_cost': round(cost * n, 2)}
+                for n, cost in zip(batch_sizes, costs[product.id])
+            ],
+        })
+    return rows
@@ -0,0 +1,66 @@
+from collections import defaultdict, deque
+
+# --- Bill of Materials Graph ---
+# Products can use other products as components. The graph is a dict of
+# product_id -> [component product ids] and must stay acyclic.
+
+class CycleError(ValueError):
+    """Raised when sub-assemblies would (or do) contain themselves."""
+
+def topological_order(graph, roots):
+    """
+    Returns `roots` and everything they depend on, with every component before
+    the products that use it. Iterative, so deep assemblies can't hit the
+    recursion limit.
+    """
+    order, state = [], {}  # state: 1 = on the current path, 2 = done
+    for root in roots:
+        if state.get(root) == 2:
+            continue
+        stack = [(root, iter(graph.get(root, ())))]
+        state[root] = 1
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                state[node] = 2
+                order.append(node)
+            elif state.get(child) == 1:
+                raise CycleError(f"Product {child} is part of a component cycle")
+            elif child not in state:
+                state[child] = 1
+                stack.append((child, iter(graph.get(child, ()))))
+    return order
+
+def reaches(graph, start_ids, target_id):
+    """True if `target_id` is one of `start_ids` or a (transitive) component of them."""
+    seen, queue = set(), deque(start_ids)
+    while queue:
+        node = queue.popleft()
+        if node == target_id:
+            return True
+        if node in seen:
+            continue
+        seen.add(node)
+        queue.extend(graph.get(node, ()))
+    return False
+
+def check_components(graph, product_id, component_ids):
+    """Raises CycleError if giving `product_id` these components would create a cycle."""
+    if reaches(graph, component_ids, product_id):
+        raise CycleError("A product can't use itself, directly or through its components")
+
+def dependents_closure(graph, seed_ids):
+    """`seed_ids` plus every product that uses any of them, however indirectly."""
+    parents = defaultdict(list)
+    for product_id, component_ids in graph.items():
+        for component_id in component_ids:
+            parents[component_id].append(product_id)
+    result, queue = set(seed_ids), deque(seed_ids)
+    while queue:
+        for parent_id in parents.get(queue.popleft(), ()):
+            if parent_id not in result:
+                result.add(parent_id)
+                queue.append(parent_id)
+    return result
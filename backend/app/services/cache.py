@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+CacheEntry = namedtuple('CacheEntry', ['value', 'stored_at', 'fresh'])
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with LRU eviction.
+
+    Entries are fresh for `ttl` seconds and are then kept for a further
+    `stale_ttl` seconds, during which `lookup` still returns them (marked
+    not fresh) so callers can fall back to last-known-good data.
+
+    With a `codec` (an object with encode/decode, see listing_codec.py) values
+    are stored encoded and decoded on every lookup, outside the lock.
+    """
+    def __init__(self, ttl, stale_ttl=0, max_entries=1000, codec=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.codec = codec
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at = item
+            age = now - stored_at
+            if age > self.ttl + self.stale_ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        if self.codec is not None:
+            value = self.codec.decode(value)
+        return CacheEntry(value, stored_at, age <= self.ttl)
+
+    def get(self, key):
+        """Returns the value only while it is fresh."""
+        entry = self.lookup(key)
+        return entry.value if entry and entry.fresh else None
+
+    def set(self, key, value):
+        if self.codec is not None:
+            value = self.codec.encode(value)
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,73 @@
+import time
+from sqlalchemy import insert, update
+from ..extensions import db
+from ..models import User, WorkshopChange
+
+# --- Workshop Change Log ---
+# Every material/product write records (entity, id, op) under a per-user,
+# monotonically increasing sequence number, in the same transaction as the
+# write. Clients remember the last seq they saw and ask only for what changed.
+
+def next_workshop_seq(user_id):
+    """
+    Increments and returns the user's sequence. The UPDATE takes a row lock on
+    MySQL, so concurrent writes for the same user get distinct, ordered seqs.
+    """
+    db.session.execute(update(User).where(User.id == user_id).values(workshop_seq=User.workshop_seq + 1))
+    return db.session.query(User.workshop_seq).filter(User.id == user_id).scalar()
+
+def record_change(user_id, entity, entity_id, op='upsert'):
+    """Adds a change row to the current session; the caller commits."""
+    seq = next_workshop_seq(user_id)
+    db.session.add(WorkshopChange(
+        user_id=user_id, seq=seq, entity=entity, entity_id=entity_id, op=op, created_at=int(time.time())
+    ))
+    return seq
+
+def record_changes(user_id, entity, entity_ids, op='upsert'):
+    """
+    Batch version of record_change: reserves len(entity_ids) seqs with a single
+    UPDATE and inserts the rows in one executemany. Returns the last seq.
+    """
+    entity_ids = list(entity_ids)
+    if not entity_ids:
+        return None
+    db.session.execute(update(User).where(User.id == user_id).values(workshop_seq=User.workshop_seq + len(entity_ids)))
+    last_seq = db.session.query(User.workshop_seq).filter(User.id == user_id).scalar()
+    first_seq = last_seq - len(entity_ids) + 1
+    now = int(time.time())
+    db.session.execute(insert(WorkshopChange), [
+        {'user_id': user_id, 'seq': first_seq + i, 'entity': entity, 'entity_id': entity_id, 'op': op, 'created_at': now}
+        for i, entity_id in enumerate(entity_ids)
+    ])
+    return last_seq
+
+def current_workshop_seq(user_id):
+    return db.session.query(User.workshop_seq).filter(User.id == user_id).scalar() or 0
+
+def changes_since(user_id, since):
+    """
+    Returns (seq, changes) where changes maps (entity, id) -> last op after
+    `since`, or (seq, None) if the log no longer covers that range (the caller
+    must then do a full reload).
+    """
+    seq = current_workshop_seq(user_id)
+    if since == seq:
+        return seq, {}
+    if since > seq:
+        return seq, None
+
+    rows = (
+        db.session.query(WorkshopChange.seq, WorkshopChange.entity, WorkshopChange.entity_id, WorkshopChange.op)
+        .filter(WorkshopChange.user_id == user_id, WorkshopChange.seq > since)
+        .order_by(WorkshopChange.seq)
+        .all()
+    )
+    # The log is gap-free per user, so a missing first entry means it was pruned
+    if not rows or rows[0].seq != since + 1:
+        return seq, None
+
+    changes = {}
+    for row in rows:
+        changes[(row.entity, row.entity_id)] = row.op
+    return seq, changes
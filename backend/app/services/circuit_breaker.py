@@ -0,0 +1,95 @@
+import threading
+import time
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be failing."""
+    def __init__(self, name, retry_after):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After `failure_threshold` consecutive failures
+    the circuit opens and calls fail immediately for `reset_timeout` seconds.
+    After that a single trial call is let through (half-open): success closes
+    the circuit, failure opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # Decides which exceptions count against the upstream (e.g. not a 404)
+        self.is_failure = is_failure or (lambda exc: True)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(self.name, max(self.reset_timeout - elapsed, 0))
+            # Let exactly one trial request through
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"⚠️ Circuit '{self.name}' opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _record_exception(self, exc):
+        if self.is_failure(exc):
+            self.record_failure()
+        else:
+            # The upstream answered (e.g. a 4xx), so it is healthy
+            self.record_success()
+
+    def call(self, func, *args, **kwargs):
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record_exception(e)
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """Same as call, for a coroutine function. The lock is never held across an await."""
+        self._before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._record_exception(e)
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self):
+        return {"name": self.name, "state": self.state, "failures": self._failures}
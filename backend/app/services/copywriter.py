@@ -0,0 +1,220 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from .cache import TTLCache
+
+# --- Listing Copy Generator ---
+# Writes eBay titles and descriptions for workshop products. Several products
+# go into one model call, outputs are cached under a hash of (product
+# attributes, prompt version), and a product that is already being generated
+# by another request is waited on rather than generated twice. The backend is
+# pluggable: OpenAI in production, a deterministic stub for tests/benchmarks.
+
+PROMPT_VERSION = 1
+TITLE_MAX_LENGTH = 80 # eBay's title limit
+
+SYSTEM_PROMPT = (
+    "You write eBay listings for handmade products. For every product you are given, "
+    f"write a title (at most {TITLE_MAX_LENGTH} characters, no ALL CAPS, no emojis) and a short, "
+    "honest description (2-3 sentences) based only on the details provided. "
+    'Reply with JSON: {"listings": [{"id": <id>, "title": "...", "description": "..."}]}'
+)
+
+def product_attributes(name, material_names, component_names):
+    """What the copy depends on (and is cached by)."""
+    return {
+        'name': name.strip(),
+        'materials': sorted(material_names),
+        'components': sorted(component_names),
+    }
+
+def copy_cache_key(attributes):
+    payload = json.dumps([PROMPT_VERSION, attributes], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class StubCopyBackend:
+    """Deterministic, offline backend. `latency` simulates a model round trip."""
+    name = 'stub'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate(self, batch):
+        """`batch` is [(key, attributes)]; returns ({key: {title, description}}, usage)."""
+        if self.latency:
+            time.sleep(self.latency)
+        results = {}
+        for key, attrs in batch:
+            made_from = ", ".join(attrs['materials'] + attrs['components']) or "quality materials"
+            results[key] = {
+                'title': f"Handmade {attrs['name']}"[:TITLE_MAX_LENGTH],
+                'description': f"{attrs['name']}, handmade to order from {made_from}. Each piece is unique.",
+            }
+        # Rough token counts so cost metrics behave like the real thing
+        prompt_tokens = 60 + sum(len(json.dumps(attrs)) // 4 for _, attrs in batch)
+        completion_tokens = sum(len(r['title'] + r['description']) // 4 for r in results.values())
+        return results, {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens}
+
+class OpenAICopyBackend:
+    name = 'openai'
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+
+    def generate(self, batch):
+        ids = {str(i): key for i, (key, _) in enumerate(batch)}
+        products = [dict(attrs, id=str(i)) for i, (_, attrs) in enumerate(batch)]
+        response = self.client.chat.completions.create(
+            model=self.model,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps({"products": products})},
+            ],
+        )
+        listings = json.loads(response.choices[0].message.content).get('listings', [])
+        results = {}
+        for listing in listings:
+            key = ids.get(str(listing.get('id')))
+            if key and listing.get('title'):
+                results[key] = {'title': listing['title'][:TITLE_MAX_LENGTH], 'description': listing.get('description', '')}
+        usage = {'prompt_tokens': response.usage.prompt_tokens, 'completion_tokens': response.usage.completion_tokens}
+        return results, usage
+
+class CopyMetrics:
+    """Running totals; cost is in USD at the configured per-1k-token prices."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.generated = self.batches = self.cache_hits = self.joined = self.failures = 0
+        self.prompt_tokens = self.completion_tokens = 0
+        self.cost = self.latency = 0.0
+
+    def record_batch(self, count, seconds, usage, cost):
+        with self._lock:
+            self.batches += 1
+            self.generated += count
+            self.latency += seconds
+            self.prompt_tokens += usage['prompt_tokens']
+            self.completion_tokens += usage['completion_tokens']
+            self.cost += cost
+
+    def add(self, field, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def snapshot(self):
+        with self._lock:
+            per_listing = self.generated or 1
+            return {
+                'generated': self.generated, 'batches': self.batches, 'cache_hits': self.cache_hits,
+                'joined_in_flight': self.joined, 'failures': self.failures,
+                'prompt_tokens': self.prompt_tokens, 'completion_tokens': self.completion_tokens,
+                'total_cost_usd': round(self.cost, 6),
+                'cost_per_listing_usd': round(self.cost / per_listing, 6),
+                # A listing's latency is the duration of the batch call it was part of
+                'avg_batch_latency_ms': round(self.latency / (self.batches or 1) * 1000, 1),
+                'avg_latency_per_listing_ms': round(self.latency / per_listing * 1000, 1),
+            }
+
+class ListingCopyGenerator:
+    def __init__(self, backend, cache, batch_size=10, input_cost_per_1k=0.0, output_cost_per_1k=0.0, wait_timeout=120):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.wait_timeout = wait_timeout # How long to wait on another request's generation
+        self.input_cost_per_1k = input_cost_per_1k
+        self.output_cost_per_1k = output_cost_per_1k
+        self.metrics = CopyMetrics()
+        self._pending = {} # cache key -> Future, for generations in progress
+        self._lock = threading.Lock()
+
+    def generate(self, items):
+        """
+        `items` is [(key, attributes)]. Returns {key: copy or None}; None means
+        the backend failed (or skipped) that product.
+        """
+        results, waiting, mine = {}, {}, {}
+        with self._lock:
+            for key, attrs in items:
+                if key in results or key in waiting or key in mine:
+                    continue
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[key] = cached
+                    self.metrics.add('cache_hits')
+                elif key in self._pending:
+                    waiting[key] = self._pending[key]
+                    self.metrics.add('joined')
+                else:
+                    mine[key] = attrs
+                    self._pending[key] = Future()
+
+        claimed = list(mine.items())
+        try:
+            for start in range(0, len(claimed), self.batch_size):
+                self._run_batch(claimed[start:start + self.batch_size])
+        finally:
+            # Whatever went wrong above, requests waiting on these keys must not hang
+            with self._lock:
+                futures = {key: self._pending.pop(key) for key in mine}
+            for future in futures.values():
+                if not future.done():
+                    future.set_result(None)
+
+        for key, future in futures.items():
+            results[key] = future.result()
+        for key, future in waiting.items():
+            try:
+                results[key] = future.result(timeout=self.wait_timeout)
+            except FutureTimeoutError:
+                results[key] = None
+        return results
+
+    def _run_batch(self, batch):
+        started = time.perf_counter()
+        try:
+            generated, usage = self.backend.generate(batch)
+        except Exception as e:
+            print(f"!!! Listing copy batch of {len(batch)} failed: {e}")
+            self.metrics.add('failures', len(batch))
+            generated = {}
+        else:
+            try:
+                cost = (usage['prompt_tokens'] * self.input_cost_per_1k + usage['completion_tokens'] * self.output_cost_per_1k) / 1000
+                self.metrics.record_batch(len(generated), time.perf_counter() - started, usage, cost)
+                for key, _ in batch:
+                    if key in generated:
+                        self.cache.set(key, generated[key])
+            except Exception as e:
+                # The copy itself is fine; only the bookkeeping failed
+                print(f"!!! Could not record listing copy batch: {e}")
+        for key, _ in batch:
+            self._pending[key].set_result(generated.get(key))
+
+_generator = None
+
+def init_copywriter(app):
+    global _generator
+    backend_name = app.config.get('LISTING_COPY_BACKEND')
+    if backend_name == 'openai':
+        from openai import OpenAI
+        backend = OpenAICopyBackend(OpenAI(api_key=app.config.get('OPENAI_API_KEY')), app.config.get('LISTING_COPY_MODEL'))
+    else:
+        backend = StubCopyBackend()
+    _generator = ListingCopyGenerator(
+        backend,
+        TTLCache(ttl=app.config.get('LISTING_COPY_CACHE_TTL', 30 * 86400), max_entries=5000),
+        batch_size=app.config.get('LISTING_COPY_BATCH_SIZE', 10),
+        input_cost_per_1k=app.config.get('LISTING_COPY_INPUT_COST_PER_1K', 0.0),
+        output_cost_per_1k=app.config.get('LISTING_COPY_OUTPUT_COST_PER_1K', 0.0),
+        wait_timeout=app.config.get('LISTING_COPY_WAIT_SECONDS', 120),
+    )
+
+def get_generator():
+    return _generator
@@ -0,0 +1,123 @@
+from .units import canonical_unit, CONVERSION_FACTORS
+from .bom import topological_order
+
+# --- Workshop Costing ---
+# Shared by the workshop routes. Materials are resolved once (cost per unit
+# and canonical unit), then every recipe line is a couple of dict lookups.
+# Sub-assemblies are costed in topological order and memoized, so each one
+# is computed once per request however many products use it.
+
+def material_cost_per_unit(material):
+    return material.cost / material.quantity if material.quantity > 0 else 0
+
+def serialize_material(material):
+    return {
+        'id': material.id, 'name': material.name, 'cost': material.cost,
+        'quantity': material.quantity, 'unit': material.unit, 'stock': material.stock,
+        'cost_per_unit': round(material_cost_per_unit(material), 4),
+        'price_tiers': [{'min_quantity': t.min_quantity, 'cost_per_unit': t.cost_per_unit} for t in material.price_tiers]
+    }
+
+def resolve_materials(materials, cost_overrides=None):
+    """
+    material_id -> (cost per material unit, canonical material unit).
+    `cost_overrides` ({material_id: pack cost}) prices materials hypothetically.
+    """
+    overrides = cost_overrides or {}
+    resolved = {}
+    for m in materials:
+        if m.id in overrides:
+            cost_per_unit = overrides[m.id] / m.quantity if m.quantity > 0 else 0
+        else:
+            cost_per_unit = material_cost_per_unit(m)
+        resolved[m.id] = (cost_per_unit, canonical_unit(m.unit))
+    return resolved
+
+def recipe_line_factor(recipe_unit, material_unit):
+    """Multiplier from the recipe line's unit to the material's unit, or None if incompatible."""
+    if not recipe_unit or recipe_unit == material_unit:
+        return 1.0
+    return CONVERSION_FACTORS.get((recipe_unit, material_unit))
+
+def cost_product(product, resolved_materials, component_costs):
+    """`component_costs` must already hold the costed data of every component."""
+    material_cost = 0
+    unit_errors = []
+    for ri in product.recipe:
+        info = resolved_materials.get(ri.material_id)
+        if info is None:
+            continue
+        cost_per_unit, material_unit = info
+        factor = recipe_line_factor(ri.unit, material_unit)
+        if factor is None:
+            unit_errors.append(ri.material_id)
+            continue
+        material_cost += cost_per_unit * ri.quantity * factor
+
+    component_cost = 0
+    for pc in product.components:
+        component_cost += component_costs[pc.component_id]['total_cost'] * pc.quantity
+
+    material_cost = round(material_cost, 2)
+    component_cost = round(component_cost, 2)
+    labour_cost = round(product.labour_hours * product.hourly_rate, 2)
+    total_cost = material_cost + component_cost + labour_cost
+    suggested_price = round(total_cost * (1 + (product.profit_margin / 100)), 2)
+
+    data = {
+        'id': product.id, 'name': product.name,
+        'recipe': [{'material_id': ri.material_id, 'quantity': ri.quantity, 'unit': ri.unit} for ri in product.recipe],
+        'components': [{'product_id': pc.component_id, 'quantity': pc.quantity} for pc in product.components],
+        'labour_hours': product.labour_hours, 'hourly_rate': product.hourly_rate, 'profit_margin': product.profit_margin,
+        'material_cost': material_cost, 'component_cost': component_cost, 'labour_cost': labour_cost,
+        'total_cost': total_cost, 'suggested_price': suggested_price
+    }
+    if unit_errors:
+        # Lines whose unit no longer matches the material are left out of the cost
+        data['unit_errors'] = unit_errors
+    return data
+
+def component_graph(products):
+    return {p.id: [pc.component_id for pc in p.components] for p in products}
+
+def cost_products(products, materials, only_ids=None, cost_overrides=None):
+    """
+    Costs the user's products. `products` must include every product that can
+    appear as a component. With `only_ids`, just those products (plus the
+    sub-assemblies they need) are costed and returned.
+    """
+    resolved = resolve_materials(materials, cost_overrides)
+    by_id = {p.id: p for p in products}
+    targets = [p.id for p in products if only_ids is None or p.id in only_ids]
+
+    costs = {}
+    for product_id in topological_order(component_graph(products), targets):
+        costs[product_id] = cost_product(by_id[product_id], resolved, costs)
+    return [costs[product_id] for product_id in targets]
+
+def margin_percent(price, cost):
+    return round((price - cost) / price * 100, 2) if price else None
+
+def price_impact(before, after):
+    """
+    Compares two costings of the same products (lists from cost_products). The
+    margin is measured at the current suggested price, i.e. what the seller is
+    charging today, so a negative margin means the product now sells at a loss.
+    """
+    after_by_id = {p['id']: p for p in after}
+    rows = []
+    for old in before:
+        new = after_by_id[old['id']]
+        price = old['suggested_price']
+        old_margin = margin_percent(price, old['total_cost'])
+        new_margin = margin_percent(price, new['total_cost'])
+        rows.append({
+            'id': old['id'], 'name': old['name'],
+            'old_total_cost': old['total_cost'], 'new_total_cost': new['total_cost'],
+            'old_suggested_price': price, 'new_suggested_price': new['suggested_price'],
+            'old_margin_percent': old_margin, 'new_margin_percent': new_margin,
+            'margin_delta': round(new_margin - old_margin, 2) if price else None,
+            'unprofitable': new['total_cost'] >= price,
+        })
+    rows.sort(key=lambda row: (row['margin_delta'] is None, row['margin_delta'] or 0))
+    return rows
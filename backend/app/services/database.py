@@ -0,0 +1,81 @@
+import time
+from sqlalchemy import event, text
+
+# --- Engine Configuration Helpers ---
+# create_app builds SQLALCHEMY_ENGINE_OPTIONS from these before db.init_app,
+# then calls configure_engine once the engine exists.
+
+def is_sqlite_uri(uri):
+    return uri.startswith("sqlite")
+
+def build_engine_options(config):
+    """Turns the DB_* config values into SQLAlchemy engine options."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+
+    if is_sqlite_uri(uri):
+        # sqlite3's own busy handler, in seconds. The PRAGMA below covers it too,
+        # but this also applies while the connection is being opened.
+        return {
+            "connect_args": {"timeout": config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+        }
+
+    statement_timeout_ms = config['DB_STATEMENT_TIMEOUT_MS']
+    connect_args = {"connect_timeout": config['DB_CONNECT_TIMEOUT']}
+    if statement_timeout_ms:
+        # MAX_EXECUTION_TIME stops long SELECTs on the server side; the socket
+        # timeouts are a slightly looser backstop in case the server never answers.
+        socket_timeout = int(statement_timeout_ms / 1000) + 5
+        connect_args["init_command"] = f"SET SESSION MAX_EXECUTION_TIME={int(statement_timeout_ms)}"
+        connect_args["read_timeout"] = socket_timeout
+        connect_args["write_timeout"] = socket_timeout
+
+    return {
+        "pool_size": config['DB_POOL_SIZE'],
+        "max_overflow": config['DB_MAX_OVERFLOW'],
+        "pool_timeout": config['DB_POOL_TIMEOUT'],
+        # PythonAnywhere's MySQL drops idle connections after 300s,
+        # so connections must be recycled before that.
+        "pool_recycle": config['DB_POOL_RECYCLE'],
+        "pool_pre_ping": config['DB_POOL_PRE_PING'],
+        "connect_args": connect_args,
+    }
+
+def configure_engine(engine, config):
+    """Applies per-connection tuning that can't be expressed as engine options."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    busy_timeout_ms = int(config['SQLITE_BUSY_TIMEOUT_MS'])
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers carry on while a write is in progress
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        cursor.close()
+
+# --- Health Checks ---
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    # Only QueuePool exposes sizing; SQLite file databases may use other pools
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+def check_database(engine):
+    """Runs a trivial query and reports latency plus pool usage."""
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    latency_ms = (time.perf_counter() - start) * 1000
+    return {
+        "dialect": engine.dialect.name,
+        "latency_ms": round(latency_ms, 2),
+        "pool": pool_stats(engine),
+    }
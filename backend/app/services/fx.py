@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+import requests
+
+# --- Exchange Rates ---
+# Rates live in a small JSON file (base currency + rates). The file is
+# refreshed by `flask fx-refresh` (run as a scheduled task) and reloaded into
+# memory when its mtime changes, so requests never wait on an FX lookup.
+# Until the first refresh, the bundled fx_rates.default.json is used.
+
+ECB_DAILY_URL = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
+ECB_NAMESPACE = {"ecb": "http://www.ecb.int/vocabulary/2002-08-01/eurofxref"}
+
+MARKETPLACE_CURRENCIES = {
+    'EBAY_GB': 'GBP', 'EBAY_US': 'USD', 'EBAY_AU': 'AUD', 'EBAY_CA': 'CAD',
+    'EBAY_DE': 'EUR', 'EBAY_FR': 'EUR', 'EBAY_IT': 'EUR', 'EBAY_ES': 'EUR', 'EBAY_IE': 'EUR',
+}
+
+class RateTable:
+    def __init__(self, base, rates, as_of=None, version=0):
+        self.base = base
+        self.rates = dict(rates)
+        self.rates[base] = 1.0
+        self.as_of = as_of
+        self.version = version
+
+    def factor(self, from_currency, to_currency):
+        """Multiplier converting an amount in `from_currency` into `to_currency`, or None."""
+        if from_currency == to_currency:
+            return 1.0
+        from_rate = self.rates.get(from_currency)
+        to_rate = self.rates.get(to_currency)
+        if not from_rate or not to_rate:
+            return None
+        return to_rate / from_rate
+
+_rates_path = None
+_default_rates_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'fx_rates.default.json')
+_reload_interval = 60
+_table = RateTable('EUR', {})
+_file_mtime = None
+_checked_at = 0
+_lock = threading.Lock()
+
+def init_fx(app):
+    global _rates_path, _reload_interval
+    _rates_path = app.config.get('FX_RATES_FILE')
+    _reload_interval = app.config.get('FX_RELOAD_INTERVAL', _reload_interval)
+    get_rate_table(force_check=True)
+
+def _load_from_file():
+    global _table, _file_mtime
+    path = _rates_path if os.path.exists(_rates_path) else _default_rates_path
+    mtime = os.path.getmtime(path)
+    if mtime == _file_mtime:
+        return
+    with open(path) as f:
+        data = json.load(f)
+    _table = RateTable(data['base'], data['rates'], data.get('as_of'), _table.version + 1)
+    _file_mtime = mtime
+    print(f"💱 Loaded FX rates v{_table.version} ({_table.base}, as of {_table.as_of})")
+
+def get_rate_table(force_check=False):
+    """Returns the in-memory table, re-reading the file at most every `_reload_interval` seconds."""
+    global _checked_at
+    if _rates_path and (force_check or time.time() - _checked_at > _reload_interval):
+        with _lock:
+            _checked_at = time.time()
+            try:
+                _load_from_file()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"!!! Could not load FX rates from {_rates_path}: {e}")
+    return _table
+
+def is_known_currency(code):
+    return code in get_rate_table().rates
+
+def currency_for_marketplace(marketplace_id, default='GBP'):
+    return MARKETPLACE_CURRENCIES.get(marketplace_id, default)
+
+def convert_listing_prices(item_list, target_currency):
+    """
+    Returns each listing's price in `target_currency`, as floats. One factor is
+    resolved per distinct currency, then applied in a single pass; listings in
+    a currency the table doesn't know are left out.
+    """
+    table = get_rate_table()
+    factors = {}
+    for item in item_list:
+        code = item['price'].get('currency_code')
+        if code not in factors:
+            factors[code] = table.factor(code, target_currency)
+
+    if set(factors.values()) <= {1.0}:
+        return [item['price']['amount'] / item['price']['divisor'] for item in item_list]
+    return [
+        item['price']['amount'] / item['price']['divisor'] * factors[item['price'].get('currency_code')]
+        for item in item_list
+        if factors[item['price'].get('currency_code')] is not None
+    ]
+
+# --- Refresh Job ---
+
+def fetch_ecb_rates():
+    response = requests.get(ECB_DAILY_URL, timeout=15)
+    response.raise_for_status()
+    root = ET.fromstring(response.content)
+    day = root.find(".//ecb:Cube[@time]", ECB_NAMESPACE)
+    rates = {cube.get('currency'): float(cube.get('rate')) for cube in day.findall("ecb:Cube", ECB_NAMESPACE)}
+    return {"base": "EUR", "as_of": day.get('time'), "rates": rates}
+
+def refresh_rates_file(path):
+    """Downloads the latest rates and atomically replaces the rates file."""
+    data = fetch_ecb_rates()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
+    return data
@@ -0,0 +1,105 @@
+import struct
+import zlib
+from array import array
+
+# --- Listing Codec ---
+# Compact binary form for normalized listings (see api.normalize_item_summaries)
+# so cached Browse results take a fraction of the memory of the dicts. The
+# layout is columnar: amounts are a packed int64 array, the few distinct
+# currency codes / sources / divisors are dictionary-encoded to one byte per
+# listing, and ids and titles are NUL-separated UTF-8. The whole payload is
+# then zlib-compressed at a fast level. Decoding rebuilds the listing dicts
+# with one decompress, two splits and a single pass.
+
+VERSION = 1
+COMPRESS_LEVEL = 1
+HEADER = struct.Struct('<BI') # version, listing count
+LISTING_KEYS = {'listing_id', 'title', 'price', 'source'}
+PRICE_KEYS = {'amount', 'divisor', 'currency_code'}
+
+def _pack_blobs(*blobs):
+    return b''.join(struct.pack('<I', len(blob)) + blob for blob in blobs)
+
+def _unpack_blobs(data, offset, count):
+    blobs = []
+    for _ in range(count):
+        (length,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        blobs.append(data[offset:offset + length])
+        offset += length
+    return blobs
+
+def _index(table, value):
+    position = table.get(value)
+    if position is None:
+        if len(table) == 255:
+            raise ValueError("Too many distinct values to dictionary-encode")
+        position = table[value] = len(table)
+    return position
+
+def encode_listings(listings):
+    """Raises ValueError for listings that aren't in the normalized shape."""
+    currencies, sources, divisors = {}, {}, {}
+    amounts = array('q')
+    currency_ids, source_ids, divisor_ids = bytearray(), bytearray(), bytearray()
+    ids, titles = [], []
+    for listing in listings:
+        price = listing['price']
+        if listing.keys() != LISTING_KEYS or price.keys() != PRICE_KEYS:
+            raise ValueError(f"Unexpected listing shape: {sorted(listing)}")
+        amounts.append(price['amount'])
+        currency_ids.append(_index(currencies, price['currency_code']))
+        divisor_ids.append(_index(divisors, price['divisor']))
+        source_ids.append(_index(sources, listing['source']))
+        # NUL is the column separator; it never appears in real ids or titles
+        ids.append(listing['listing_id'].replace('\x00', ''))
+        titles.append(listing['title'].replace('\x00', ''))
+
+    payload = HEADER.pack(VERSION, len(amounts)) + _pack_blobs(
+        '\x00'.join(currencies).encode(),
+        '\x00'.join(sources).encode(),
+        array('q', divisors).tobytes(),
+        amounts.tobytes(),
+        bytes(currency_ids), bytes(divisor_ids), bytes(source_ids),
+        '\x00'.join(ids).encode(),
+        '\x00'.join(titles).encode(),
+    )
+    return zlib.compress(payload, COMPRESS_LEVEL)
+
+def decode_listings(data):
+    payload = zlib.decompress(data)
+    version, count = HEADER.unpack_from(payload)
+    if version != VERSION:
+        raise ValueError(f"Unsupported listing codec version {version}")
+    if count == 0:
+        return []
+    (currencies, sources, divisors, amounts, currency_ids, divisor_ids, source_ids,
+     ids, titles) = _unpack_blobs(payload, HEADER.size, 9)
+    currencies = currencies.decode().split('\x00')
+    sources = sources.decode().split('\x00')
+    divisors = array('q', divisors).tolist()
+    amounts = array('q', amounts).tolist()
+    return [
+        {'listing_id': listing_id, 'title': title,
+         'price': {'amount': amount, 'divisor': divisors[divisor_id], 'currency_code': currencies[currency_id]},
+         'source': sources[source_id]}
+        for listing_id, title, amount, currency_id, divisor_id, source_id
+        in zip(ids.decode().split('\x00'), titles.decode().split('\x00'), amounts, currency_ids, divisor_ids, source_ids)
+    ]
+
+# --- Cache codecs (see TTLCache's `codec`) ---
+
+class ListingsCodec:
+    encode = staticmethod(encode_listings)
+    decode = staticmethod(decode_listings)
+
+class SnapshotCodec:
+    """Market snapshots: {"listings": [...], "fetched_at": int}."""
+    @staticmethod
+    def encode(snapshot):
+        return struct.pack('<q', snapshot['fetched_at']) + encode_listings(snapshot['listings'])
+
+    @staticmethod
+    def decode(data):
+        (fetched_at,) = struct.unpack_from('<q', data)
+        return {"listings": decode_listings(data[8:]), "fetched_at": fetched_at}
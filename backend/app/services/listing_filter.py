@@ -0,0 +1,184 @@
+import re
+
+# --- Listing Relevance Filter ---
+# Runs over the titles returned by search_ebay_production before price
+# analysis: drops listings that don't match the query, listings that are
+# clearly bundles/spares, and collapses near-duplicate titles (usually the
+# same seller relisting one item) so they only count once.
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'the', 'for', 'with', 'of', 'in', 'on', 'to', 'by', 'x', 'uk', 'new'
+})
+
+DEFAULT_EXCLUDE_KEYWORDS = (
+    'bundle', 'job lot', 'joblot', 'wholesale', 'spares', 'repair', 'broken', 'faulty',
+)
+
+# One-permutation MinHash: each 32-bit shingle hash picks one of 16 bins by
+# its top bits and the bin keeps the minimum of the remaining bits. That is a
+# single pass over the shingles instead of one pass per hash function.
+# The 16 bins are split into 4 LSH bands of 4 rows.
+NUM_HASHES = 16
+BAND_ROWS = 4
+_BIN_SHIFT = 28
+_BINS = tuple(range(NUM_HASHES))
+_NO_VALUES = (None,) * NUM_HASHES
+_EMPTY_BAND = (None,) * BAND_ROWS
+
+def _stem(token):
+    # Cheap plural folding so "trays" matches "tray"
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+def tokenize(text):
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower())]
+
+class TokenIndex:
+    """
+    Interns tokens to small integers once per batch. Stemming happens the
+    first time a raw token is seen, so each title costs one regex pass plus
+    dict lookups, and shingles are hashed as ints instead of strings.
+    """
+    def __init__(self):
+        self._raw_ids = {}
+        self._stem_ids = {}
+
+    def ids_for_text(self, text):
+        raw_tokens = TOKEN_RE.findall(text.lower())
+        ids = list(map(self._raw_ids.get, raw_tokens))
+        if None in ids:
+            for i, raw in enumerate(raw_tokens):
+                if ids[i] is None:
+                    ids[i] = self._raw_ids[raw] = self._stem_ids.setdefault(_stem(raw), len(self._stem_ids))
+        return ids
+
+    def ids_for_words(self, words):
+        return {self._stem_ids.setdefault(w, len(self._stem_ids)) for w in words}
+
+def _shingle_hashes(token_ids):
+    """Word unigrams plus bigrams, hashed to 32-bit ints."""
+    if not token_ids:
+        return set()
+    # Multiplicative hashing of the interned ids; no string hashing per title
+    shingles = {tid * 2654435761 & 0xFFFFFFFF for tid in token_ids}
+    shingles.update(((a * 1000003) ^ b) * 2246822519 & 0xFFFFFFFF for a, b in zip(token_ids, token_ids[1:]))
+    return shingles
+
+def minhash_signature(shingles):
+    if not shingles:
+        return _NO_VALUES
+    # Sorted descending, so when the dict is built the smallest hash in each
+    # bin is written last and wins. Everything here runs in C.
+    ordered = sorted(shingles, reverse=True)
+    bins = dict(zip(map(_BIN_SHIFT.__rrshift__, ordered), ordered))
+    # Short titles leave some bins empty (None); estimated_similarity accounts for that
+    return tuple(map(bins.get, _BINS))
+
+def estimated_similarity(sig_a, sig_b):
+    """Matching bins over bins that are non-empty in either signature."""
+    matches = compared = 0
+    for a, b in zip(sig_a, sig_b):
+        if a is None and b is None:
+            continue
+        compared += 1
+        if a == b:
+            matches += 1
+    return matches / compared if compared else 1.0
+
+def _compile_exclusions(keywords, query_tokens, index):
+    """
+    Single-word keywords become a set of token ids and phrases become id
+    tuples; keywords that are part of the query itself are ignored.
+    """
+    words, phrases = set(), []
+    for keyword in keywords:
+        tokens = tokenize(keyword)
+        if not tokens or set(tokens) <= query_tokens:
+            continue
+        ids = tuple(index.ids_for_text(keyword))
+        if len(ids) == 1:
+            words.add(ids[0])
+        else:
+            phrases.append(ids)
+    return frozenset(words), phrases
+
+def _contains_phrase(ids, id_set, phrase):
+    if not id_set.issuperset(phrase):
+        return False
+    n = len(phrase)
+    return any(tuple(ids[i:i + n]) == phrase for i in range(len(ids) - n + 1))
+
+def _find_root(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+def filter_listings(listings, query, exclude_keywords=DEFAULT_EXCLUDE_KEYWORDS,
+                    min_relevance=0.5, duplicate_threshold=0.8):
+    """
+    Returns (curated_listings, stats). Each curated listing is a shallow copy
+    with `relevance` and `duplicates` (how many near-duplicates it stands for).
+    """
+    index = TokenIndex()
+    query_words = {t for t in tokenize(query) if t not in STOPWORDS}
+    query_ids = index.ids_for_words(query_words)
+    excluded_ids, excluded_phrases = _compile_exclusions(exclude_keywords, query_words, index)
+
+    kept, signatures = [], []
+    # Titles with identical token sets are duplicates without needing MinHash
+    exact_groups = {}
+    stats = {"input": len(listings), "irrelevant": 0, "excluded": 0, "duplicates": 0}
+
+    for listing in listings:
+        ids = index.ids_for_text(listing.get('title') or '')
+        id_set = frozenset(ids)
+
+        if not excluded_ids.isdisjoint(id_set) or any(_contains_phrase(ids, id_set, p) for p in excluded_phrases):
+            stats["excluded"] += 1
+            continue
+
+        relevance = len(query_ids & id_set) / len(query_ids) if query_ids else 1.0
+        if relevance < min_relevance:
+            stats["irrelevant"] += 1
+            continue
+
+        group = exact_groups.get(id_set)
+        if group is not None:
+            group.append(listing)
+            continue
+        exact_groups[id_set] = group = [listing]
+        kept.append((group, round(relevance, 2)))
+        signatures.append(minhash_signature(_shingle_hashes(ids)))
+
+    # --- Near-duplicate clustering (LSH banding + union-find) ---
+    parents = list(range(len(kept)))
+    for band_start in range(0, NUM_HASHES, BAND_ROWS):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            band = signature[band_start:band_start + BAND_ROWS]
+            if band != _EMPTY_BAND:
+                buckets.setdefault(band, []).append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_a, root_b = _find_root(parents, first), _find_root(parents, other)
+                if root_a != root_b and estimated_similarity(signatures[first], signatures[other]) >= duplicate_threshold:
+                    parents[root_b] = root_a
+
+    cluster_sizes = {}
+    for i, (group, _) in enumerate(kept):
+        root = _find_root(parents, i)
+        cluster_sizes[root] = cluster_sizes.get(root, 0) + len(group)
+
+    curated = []
+    for i, (group, relevance) in enumerate(kept):
+        if parents[i] != i:
+            continue
+        curated.append({**group[0], 'relevance': relevance, 'duplicates': cluster_sizes[i] - 1})
+    stats["kept"] = len(curated)
+    stats["duplicates"] = stats["input"] - stats["irrelevant"] - stats["excluded"] - stats["kept"]
+    return curated, stats
@@ -0,0 +1,166 @@
+import os
+import random
+import threading
+import time
+from sqlalchemy import delete, exists, select, update
+from ..extensions import db
+from ..models import User, Material, Product, EbayToken, EbayOffer, WorkshopChange, NameToken
+
+try:
+    import fcntl
+except ImportError: # Windows dev machines: no cross-process lock, the scheduler is off there anyway
+    fcntl = None
+
+# --- Maintenance Jobs ---
+# Clears out auth data nobody will use again: abandoned signups, expired
+# password-reset tokens, expired eBay tokens and old change-log rows. Each job
+# walks its table in primary-key order, CHUNK_SIZE ids at a time, with one
+# short transaction per chunk and a pause in between, so the `user` table is
+# never locked for more than a few milliseconds while people log in. Run it
+# with `flask maintenance` (e.g. a PythonAnywhere scheduled task) or let the
+# optional in-process scheduler do it (MAINTENANCE_INTERVAL_HOURS).
+
+class JobReport:
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.finished = True
+
+    def as_dict(self):
+        return {'job': self.name, 'rows': self.rows, 'chunks': self.chunks,
+                'seconds': round(self.seconds, 2), 'finished': self.finished}
+
+def run_in_chunks(report, id_column, condition, apply, chunk_size, pause, deadline):
+    """
+    Selects matching ids after the last one seen (an index range scan on the
+    primary key), hands each chunk to `apply(ids)` and commits it on its own.
+    Stops early, marking the report unfinished, once `deadline` has passed.
+    """
+    started = time.perf_counter()
+    last_id = 0
+    while True:
+        if deadline and time.time() > deadline:
+            report.finished = False
+            break
+        ids = db.session.execute(
+            select(id_column).where(id_column > last_id, condition).order_by(id_column).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        report.rows += apply(ids)
+        db.session.commit()
+        report.chunks += 1
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+        time.sleep(pause)
+    report.seconds += time.perf_counter() - started
+    return report
+
+def purge_unconfirmed_users(now, settings):
+    """Signups never confirmed within the grace period (the link itself expires after an hour)."""
+    cutoff = now - settings['unconfirmed_user_days'] * 86400
+    condition = (
+        (User.email_confirmed == False) & (User.created_at < cutoff) # noqa: E712
+        # Can't log in unconfirmed, so there is never data to lose, but never cascade blindly
+        & ~exists().where(Material.user_id == User.id)
+        & ~exists().where(Product.user_id == User.id)
+        & ~exists().where(EbayToken.user_id == User.id)
+        & ~exists().where(WorkshopChange.user_id == User.id)
+        & ~exists().where(EbayOffer.user_id == User.id)
+        & ~exists().where(NameToken.user_id == User.id)
+    )
+    def apply(ids):
+        return db.session.execute(delete(User).where(User.id.in_(ids), condition)).rowcount
+    return condition, apply
+
+def clear_expired_reset_tokens(now, settings):
+    condition = User.reset_token.isnot(None) & (User.reset_token_expiry < now)
+    def apply(ids):
+        return db.session.execute(
+            update(User).where(User.id.in_(ids), condition).values(reset_token=None, reset_token_expiry=None)
+        ).rowcount
+    return condition, apply
+
+def purge_expired_ebay_tokens(now, settings):
+    condition = EbayToken.refresh_token_expiry < now
+    def apply(ids):
+        return db.session.execute(delete(EbayToken).where(EbayToken.id.in_(ids), condition)).rowcount
+    return condition, apply
+
+def prune_change_log(now, settings):
+    """Clients behind the pruned range get a full resync (see changes_since)."""
+    condition = WorkshopChange.created_at < now - settings['change_log_days'] * 86400
+    def apply(ids):
+        return db.session.execute(delete(WorkshopChange).where(WorkshopChange.id.in_(ids))).rowcount
+    return condition, apply
+
+JOBS = {
+    'unconfirmed-users': (User.id, purge_unconfirmed_users),
+    'reset-tokens': (User.id, clear_expired_reset_tokens),
+    'ebay-tokens': (EbayToken.id, purge_expired_ebay_tokens),
+    'change-log': (WorkshopChange.id, prune_change_log),
+}
+
+def maintenance_settings(config):
+    return {
+        'chunk_size': config.get('MAINTENANCE_CHUNK_SIZE', 500),
+        'pause': config.get('MAINTENANCE_PAUSE_MS', 200) / 1000,
+        'max_seconds': config.get('MAINTENANCE_MAX_SECONDS', 300),
+        'unconfirmed_user_days': config.get('MAINTENANCE_UNCONFIRMED_USER_DAYS', 7),
+        'change_log_days': config.get('MAINTENANCE_CHANGE_LOG_DAYS', 30),
+    }
+
+def run_maintenance(settings, job_names=None):
+    """Runs the named jobs (all by default) within the time budget. Returns one report per job."""
+    now = int(time.time())
+    deadline = time.time() + settings['max_seconds'] if settings['max_seconds'] else None
+    reports = []
+    for name in job_names or JOBS:
+        id_column, build = JOBS[name]
+        condition, apply = build(now, settings)
+        report = JobReport(name)
+        try:
+            run_in_chunks(report, id_column, condition, apply, settings['chunk_size'], settings['pause'], deadline)
+        except Exception:
+            db.session.rollback()
+            raise
+        reports.append(report)
+    return reports
+
+# --- In-process scheduler (optional) ---
+
+def _run_locked(app, lock_path):
+    """Runs maintenance unless another worker holds the lock file."""
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'w') as lock_file:
+        if fcntl:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+        with app.app_context():
+            try:
+                for report in run_maintenance(maintenance_settings(app.config)):
+                    print(f"🧹 Maintenance {report.name}: {report.rows} rows in {report.chunks} chunks, {report.seconds:.1f}s")
+            finally:
+                db.session.remove()
+
+def init_maintenance(app):
+    interval_hours = app.config.get('MAINTENANCE_INTERVAL_HOURS')
+    if not interval_hours:
+        return
+    lock_path = os.path.join(app.instance_path, 'maintenance.lock')
+
+    def _loop():
+        while True:
+            # Jitter so workers reloaded together don't all wake at once
+            time.sleep(interval_hours * 3600 * random.uniform(0.9, 1.1))
+            try:
+                _run_locked(app, lock_path)
+            except Exception as e:
+                print(f"!!! Maintenance run failed: {e}")
+
+    threading.Thread(target=_loop, name='ally-maintenance', daemon=True).start()
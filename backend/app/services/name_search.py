@@ -0,0 +1,59 @@
+from sqlalchemy import and_, delete, event, insert, inspect, select, true
+from ..models import Material, Product, NameToken
+
+# --- Name Search ---
+# Word-start search over material and product names ('tray' finds 'Jesmonite
+# tray'), backed by an ordinary b-tree so it works the same on SQLite and
+# MySQL. Every name is split into lowercased words, stored in NameToken and
+# indexed by (user_id, entity, token); a search word then becomes a range
+# scan token >= 'tra' AND token < 'trb' on that index, never a LIKE with a
+# leading wildcard over the user's rows. The tokens are kept in step by ORM
+# events, so every insert, rename and delete through the session updates them.
+
+ENTITIES = {Material: 'material', Product: 'product'}
+
+def name_tokens(name):
+    """Distinct lowercased words of a name, cut to fit NameToken.token."""
+    return sorted({word[:100] for word in (name or '').lower().split()})
+
+def prefix_upper_bound(prefix):
+    """Smallest string greater than every string starting with `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def name_search_filter(id_column, entity, user_id, term):
+    """Rows whose name has a word starting with each word of `term`."""
+    conditions = []
+    for word in name_tokens(term):
+        matches = select(NameToken.entity_id).where(
+            NameToken.user_id == user_id, NameToken.entity == entity,
+            NameToken.token >= word, NameToken.token < prefix_upper_bound(word),
+        )
+        conditions.append(id_column.in_(matches))
+    return and_(*conditions) if conditions else true()
+
+def _clear_tokens(connection, entity, entity_id):
+    connection.execute(delete(NameToken).where(NameToken.entity == entity, NameToken.entity_id == entity_id))
+
+def _index_name(connection, entity, target):
+    _clear_tokens(connection, entity, target.id)
+    rows = [{'user_id': target.user_id, 'entity': entity, 'entity_id': target.id, 'token': token}
+            for token in name_tokens(target.name)]
+    if rows:
+        connection.execute(insert(NameToken), rows)
+
+def _listen(model, entity):
+    @event.listens_for(model, 'after_insert')
+    def _after_insert(mapper, connection, target):
+        _index_name(connection, entity, target)
+
+    @event.listens_for(model, 'after_update')
+    def _after_update(mapper, connection, target):
+        if inspect(target).attrs.name.history.has_changes():
+            _index_name(connection, entity, target)
+
+    @event.listens_for(model, 'after_delete')
+    def _after_delete(mapper, connection, target):
+        _clear_tokens(connection, entity, target.id)
+
+for _model, _entity in ENTITIES.items():
+    _listen(_model, _entity)
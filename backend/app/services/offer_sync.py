@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ..extensions import db
+from ..models import EbayOffer, EbayToken
+from ..routes import api
+from .circuit_breaker import CircuitOpenError
+
+# --- eBay Offer Sync ---
+# Pulls offer and listing state from the Sell Inventory API into EbayOffer, so
+# the publisher reads status from the DB. Meant for a scheduled task
+# (`flask ebay-sync`). Each run takes, per connected user, the `batch_size`
+# offers synced longest ago (the (user_id, synced_at) index is the cursor, so
+# a large account is covered over several runs), fetches their pages of
+# getOffers with at most `per_user_concurrency` calls in flight for that
+# user, and writes the results in one short transaction. Users are synced
+# `user_concurrency` at a time. A SKU that fails is still stamped as synced,
+# so it goes to the back of the queue instead of blocking the ones behind it.
+
+class SyncReport:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.offers = 0
+        self.updated = 0
+        self.missing = 0
+        self.failed = []
+        self.calls = 0
+        self.error = None
+
+    def as_dict(self):
+        return {'user_id': self.user_id, 'offers': self.offers, 'updated': self.updated,
+                'missing': self.missing, 'failed': self.failed, 'calls': self.calls, 'error': self.error}
+
+def fetch_offers_for_sku(user_access_token, sku, counter):
+    """Every offer eBay has for a SKU (one per marketplace), following pagination. None if eBay has none."""
+    offers, offset = [], 0
+    while True:
+        url, headers, params = api.offers_request(user_access_token, sku, offset)
+        response = api.ebay_request('sell', 'GET', url, headers=headers, params=params)
+        counter()
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        page = data.get('offers', [])
+        offers.extend(page)
+        offset += len(page)
+        if not page or offset >= data.get('total', 0):
+            return offers
+
+def apply_offer_state(offer, remote_offers, now):
+    """Updates an EbayOffer row from eBay's offers for its SKU. Returns True if anything changed."""
+    if remote_offers is None:
+        changed = offer.status != 'NOT_FOUND'
+        offer.status = 'NOT_FOUND'
+    else:
+        match = next((o for o in remote_offers if o.get('offerId') == offer.offer_id), None) \
+            or next((o for o in remote_offers if o.get('marketplaceId') == offer.marketplace_id), None)
+        if match is None:
+            changed = offer.status != 'NOT_FOUND'
+            offer.status = 'NOT_FOUND'
+        else:
+            changed = False
+            for field, value in api.parse_offer(match).items():
+                if value is not None and getattr(offer, field) != value:
+                    setattr(offer, field, value)
+                    changed = True
+    offer.synced_at = now
+    return changed
+
+def sync_user_offers(user_id, batch_size, per_user_concurrency):
+    report = SyncReport(user_id)
+    token = EbayToken.query.filter_by(user_id=user_id).first()
+    offers = (
+        EbayOffer.query.filter_by(user_id=user_id)
+        .order_by(EbayOffer.synced_at.is_(None).desc(), EbayOffer.synced_at, EbayOffer.id)
+        .limit(batch_size).all()
+    )
+    report.offers = len(offers)
+    if not offers or token is None:
+        return report
+    user_access_token = api.get_ebay_user_access_token(token.user)
+    if not user_access_token:
+        report.error = "Could not refresh the user's eBay token"
+        return report
+
+    lock = threading.Lock()
+    def count_call():
+        with lock:
+            report.calls += 1
+
+    def fetch(sku):
+        try:
+            return fetch_offers_for_sku(user_access_token, sku, count_call), None
+        except Exception as e:
+            return None, e
+
+    # Only the HTTP calls run on the pool; the session stays on this thread
+    skus = sorted({offer.sku for offer in offers})
+    with ThreadPoolExecutor(max_workers=per_user_concurrency, thread_name_prefix='ally-offer-sync') as pool:
+        remote = dict(zip(skus, pool.map(fetch, skus)))
+
+    now = int(time.time())
+    for offer in offers:
+        remote_offers, error = remote[offer.sku]
+        if isinstance(error, CircuitOpenError):
+            # eBay itself is down, not this SKU: leave it at the front for the next run
+            report.error = f"eBay Sell API unavailable: {error}"
+            continue
+        if error is None:
+            try:
+                if apply_offer_state(offer, remote_offers, now):
+                    report.updated += 1
+            except Exception as e:
+                error = e
+        if error is not None:
+            print(f"!!! Could not sync eBay offer {offer.sku}: {error}")
+            report.failed.append(offer.sku)
+            offer.synced_at = now
+        elif offer.status == 'NOT_FOUND':
+            report.missing += 1
+    db.session.commit()
+    return report
+
+def sync_all_offers(app, batch_size=200, user_concurrency=2, per_user_concurrency=2):
+    """Syncs every user with an eBay token and at least one offer. Returns one report per user."""
+    user_ids = [user_id for (user_id,) in db.session.query(EbayToken.user_id).join(
+        EbayOffer, EbayOffer.user_id == EbayToken.user_id).distinct()]
+
+    def sync(user_id):
+        with app.app_context():
+            try:
+                return sync_user_offers(user_id, batch_size, per_user_concurrency)
+            except Exception as e:
+                db.session.rollback()
+                report = SyncReport(user_id)
+                report.error = str(e)
+                return report
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=user_concurrency, thread_name_prefix='ally-user-sync') as pool:
+        return list(pool.map(sync, user_ids))
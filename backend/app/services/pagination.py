@@ -0,0 +1,57 @@
+import base64
+import json
+from sqlalchemy import and_, or_
+
+# --- Keyset Pagination ---
+# Pages are addressed by the (sort value, id) of the last row seen rather than
+# an OFFSET, so page 100 costs the same as page 1: the database seeks straight
+# into the (user_id, <sort column>) index and reads `limit` rows.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(sort_value, row_id):
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Returns (sort value, id); raises ValueError for anything we didn't issue."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return sort_value, row_id
+
+def page_size(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(value), MAX_PAGE_SIZE))
+
+def keyset_page(query, sort_column, id_column, limit, cursor=None, descending=False):
+    """
+    Returns (rows, next_cursor) for one page of `query` ordered by
+    (sort_column, id_column). next_cursor is None on the last page.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id)))
+        else:
+            query = query.filter(or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > row_id)))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    # One extra row tells us whether there is a next page
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
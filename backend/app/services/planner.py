@@ -0,0 +1,111 @@
+import math
+from .costing import resolve_materials, recipe_line_factor
+from .bom import topological_order
+
+# --- Production Planner ---
+# Answers "what can I make from the stock I have?". Every product is first
+# flattened into raw-material requirements per unit (sub-assemblies expanded,
+# recipe units converted to the material's unit), giving a sparse
+# product x material matrix. Capacity per product is then a min over its row,
+# and the batch plan is a greedy solution to the multi-dimensional knapsack
+#     maximise sum(profit[p] * x[p])  s.t.  sum(need[p][m] * x[p]) <= stock[m]
+# picking, at each step, the product with the best profit per unit of the
+# scarcest remaining stock. Materials without a stock level never constrain.
+
+def material_requirements(products, materials):
+    """{product_id: {material_id: quantity in the material's unit}} per unit made."""
+    resolved = resolve_materials(materials)
+    by_id = {p.id: p for p in products}
+    graph = {p.id: [pc.component_id for pc in p.components] for p in products}
+    requirements = {}
+    for product_id in topological_order(graph, list(by_id)):
+        product = by_id[product_id]
+        need = {}
+        for ri in product.recipe:
+            info = resolved.get(ri.material_id)
+            factor = recipe_line_factor(ri.unit, info[1]) if info else None
+            if factor is None:
+                continue # unit errors are left out, as in costing
+            need[ri.material_id] = need.get(ri.material_id, 0) + ri.quantity * factor
+        for pc in product.components:
+            for material_id, quantity in requirements[pc.component_id].items():
+                need[material_id] = need.get(material_id, 0) + quantity * pc.quantity
+        requirements[product_id] = need
+    return requirements
+
+def capacity(need, stock):
+    """(units that can be made, bottleneck material id); (None, None) if nothing tracked limits it."""
+    best, bottleneck = None, None
+    for material_id, quantity in need.items():
+        available = stock.get(material_id)
+        if available is None or quantity <= 0:
+            continue
+        units = math.floor(max(available, 0) / quantity + 1e-9)
+        if best is None or units < best:
+            best, bottleneck = units, material_id
+    return best, bottleneck
+
+def shortfalls(requirements, mix, stock):
+    """Material usage for a {product_id: units} mix, and how much of each tracked material is missing."""
+    usage = {}
+    for product_id, units in mix.items():
+        for material_id, quantity in requirements[product_id].items():
+            usage[material_id] = usage.get(material_id, 0) + quantity * units
+    missing = {
+        material_id: used - stock[material_id]
+        for material_id, used in usage.items()
+        if stock.get(material_id) is not None and used > stock[material_id] + 1e-9
+    }
+    return usage, missing
+
+def plan_production(requirements, profits, stock, limits=None):
+    """
+    Greedy profit-maximising whole-unit plan. Products with no profit, or that
+    nothing tracked constrains and no limit caps, are left out.
+    Returns ({product_id: units}, remaining stock).
+    """
+    limits = limits or {}
+    remaining = dict(stock)
+    # Only tracked materials matter from here on
+    tracked = {
+        product_id: [(material_id, quantity) for material_id, quantity in need.items()
+                     if stock.get(material_id) is not None and quantity > 0]
+        for product_id, need in requirements.items()
+    }
+    candidates = {
+        product_id for product_id in requirements
+        if profits.get(product_id, 0) > 0 and limits.get(product_id) != 0
+        and (product_id in limits or tracked[product_id])
+    }
+    users = {} # material -> candidate products using it, so a pick only rescores its neighbours
+    for product_id in candidates:
+        for material_id, _ in tracked[product_id]:
+            users.setdefault(material_id, set()).add(product_id)
+
+    def score(product_id):
+        # Profit per unit of the scarcest remaining stock one unit uses up
+        pressure = max(
+            (quantity / remaining[material_id] if remaining[material_id] > 0 else math.inf
+             for material_id, quantity in tracked[product_id]),
+            default=0,
+        )
+        return profits[product_id] / pressure if pressure else math.inf
+
+    scores = {product_id: score(product_id) for product_id in candidates}
+    plan = {}
+    while scores:
+        best = max(scores, key=lambda product_id: (scores[product_id], -product_id))
+        del scores[best]
+        units, _ = capacity(requirements[best], remaining)
+        cap = limits.get(best)
+        units = cap if units is None else (units if cap is None else min(units, cap))
+        if units <= 0:
+            continue
+        plan[best] = units
+        touched = set()
+        for material_id, quantity in tracked[best]:
+            remaining[material_id] -= quantity * units
+            touched |= users.get(material_id, set())
+        for product_id in touched & scores.keys():
+            scores[product_id] = score(product_id)
+    return plan, remaining
@@ -0,0 +1,139 @@
+import atexit
+import json
+import os
+import threading
+import time
+from .background import submit_once
+
+try:
+    import fcntl
+except ImportError: # Windows dev machines: single worker, nothing to coordinate with
+    fcntl = None
+
+# --- Popular Queries ---
+# Tracks the most searched (query, marketplace) pairs so a freshly reloaded
+# worker can warm its market cache with them (see api.warm_up_market_cache).
+# Counting uses the Space-Saving heavy-hitter sketch: at most `capacity`
+# counters, and any pair searched more than total/capacity times is
+# guaranteed to be among them. Each worker counts into its own small sketch
+# and periodically merges it into the shared JSON file, where older counts
+# decay with a half-life so last month's favourites fade out.
+
+class SpaceSaving:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {} # key -> [count, error]
+
+    def offer(self, key, weight=1):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0]
+        else:
+            # Replace the smallest counter; its count becomes the new key's error bound
+            smallest = min(self.counters, key=lambda k: self.counters[k][0])
+            count = self.counters.pop(smallest)[0]
+            self.counters[key] = [count + weight, count]
+
+    def merge(self, other, decay=1.0):
+        """Adds `other`'s counters to this sketch's (scaled by `decay`) and trims back to capacity."""
+        merged = {key: [count * decay, error * decay] for key, (count, error) in self.counters.items()}
+        for key, (count, error) in other.counters.items():
+            counter = merged.setdefault(key, [0, 0])
+            counter[0] += count
+            counter[1] += error
+        self.counters = dict(sorted(merged.items(), key=lambda kv: -kv[1][0])[:self.capacity])
+
+    def top(self, k):
+        """[(key, count, error)] with the highest counts first."""
+        ranked = sorted(self.counters.items(), key=lambda kv: -kv[1][0])[:k]
+        return [(key, count, error) for key, (count, error) in ranked]
+
+    def __len__(self):
+        return len(self.counters)
+
+def load_sketch(path, capacity):
+    """Returns (sketch, saved_at); an empty sketch if the file is missing or unreadable."""
+    sketch = SpaceSaving(capacity)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return sketch, None
+    for query, marketplace_id, count, error in data.get('queries', []):
+        sketch.counters[(query, marketplace_id)] = [count, error]
+    return sketch, data.get('saved_at')
+
+def save_sketch(path, sketch, saved_at):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'saved_at': saved_at,
+            'queries': [[query, marketplace_id, round(count, 3), round(error, 3)] for (query, marketplace_id), count, error in sketch.top(len(sketch))],
+        }, f)
+    os.replace(tmp_path, path)
+
+class PopularQueryTracker:
+    def __init__(self):
+        self.path = None
+        self.capacity = 200
+        self.save_interval = 300
+        self.half_life = 7 * 86400
+        self._pending = SpaceSaving(self.capacity)
+        self._last_save = time.time()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.path = app.config.get('POPULAR_QUERIES_FILE')
+        self.capacity = app.config.get('POPULAR_QUERIES_CAPACITY', self.capacity)
+        self.save_interval = app.config.get('POPULAR_QUERIES_SAVE_INTERVAL', self.save_interval)
+        self.half_life = app.config.get('POPULAR_QUERIES_HALF_LIFE_DAYS', 7) * 86400
+        self._pending = SpaceSaving(self.capacity)
+
+    def record(self, key):
+        """Counts one search for a market_cache_key; cheap enough to call on every request."""
+        if not self.path:
+            return
+        with self._lock:
+            self._pending.offer(key)
+            due = time.time() - self._last_save >= self.save_interval
+            if due:
+                self._last_save = time.time()
+        if due:
+            submit_once(('popular-queries-save',), self.flush)
+
+    def flush(self):
+        """Merges this worker's counts into the shared file."""
+        with self._lock:
+            pending, self._pending = self._pending, SpaceSaving(self.capacity)
+        if not self.path or not len(pending):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Load, merge and save under one lock, or concurrent flushes drop each other's counts
+            with open(f"{self.path}.lock", 'w') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                now = time.time()
+                stored, saved_at = load_sketch(self.path, self.capacity)
+                decay = 0.5 ** ((now - saved_at) / self.half_life) if saved_at else 1.0
+                stored.merge(pending, decay)
+                save_sketch(self.path, stored, now)
+        except OSError as e:
+            print(f"!!! Could not save popular queries to {self.path}: {e}")
+            # Keep the counts for the next flush
+            with self._lock:
+                pending.merge(self._pending)
+                self._pending = pending
+
+    def top(self, k):
+        """The k most popular (query, marketplace_id) pairs, counting saved and unsaved searches."""
+        sketch, _ = load_sketch(self.path, self.capacity) if self.path else (SpaceSaving(self.capacity), None)
+        with self._lock:
+            sketch.merge(self._pending)
+        return [key for key, _, _ in sketch.top(k)]
+
+popular_queries = PopularQueryTracker()
+atexit.register(popular_queries.flush)
@@ -0,0 +1,214 @@
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+
+# --- Request Profiler ---
+# Opt-in sampling profiler for live requests. A request is profiled when it
+# carries the admin header (`X-Ally-Profile: <PROFILER_TOKEN>`) or is picked by
+# PROFILER_SAMPLE_RATE. While it runs, a side thread records that request
+# thread's stack every PROFILER_INTERVAL_MS into collapsed-stack form (one
+# "frame;frame;frame count" line per distinct stack, ready for flamegraph.pl or
+# speedscope). DB queries and outbound eBay calls are recorded as spans, and
+# samples taken during one get a "[db] ..." / "[http] ..." leaf frame.
+# With neither a token nor a sample rate configured no hooks are installed.
+
+PROFILE_HEADER = 'X-Ally-Profile'
+PROFILE_ID_RE = re.compile(r'^\d+-[0-9a-f]{8}$')
+
+_local = threading.local()
+_settings = {'dir': None, 'keep': 50}
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class RequestProfile:
+    def __init__(self, interval):
+        self.id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.spans = []
+        self.active_span = None
+        self._span = None
+        self.started = time.perf_counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name='ally-profiler', daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        return time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.reverse()
+            span = self.active_span
+            if span is not None:
+                labels.append(span)
+            self.stacks[';'.join(labels)] += 1
+
+    def begin_span(self, kind, label):
+        self._span = (kind, label, time.perf_counter())
+        self.active_span = f"[{kind}] {label}"
+
+    def end_span(self):
+        if self.active_span is None:
+            return
+        kind, label, started = self._span
+        self.active_span = None
+        self.spans.append({'kind': kind, 'label': label, 'start_ms': round((started - self.started) * 1000, 2),
+                           'duration_ms': round((time.perf_counter() - started) * 1000, 2)})
+
+@contextmanager
+def span(kind, label):
+    """Marks an outbound call in the current request's profile; a no-op when it isn't profiled."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    profile.begin_span(kind, label)
+    try:
+        yield
+    finally:
+        profile.end_span()
+
+# --- DB spans via SQLAlchemy events ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile()
+    if profile is not None:
+        profile.begin_span('db', " ".join(statement.split())[:120])
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile()
+    if profile is not None:
+        profile.end_span()
+
+# --- Flask hooks ---
+
+def is_profiler_admin(app):
+    token = app.config.get('PROFILER_TOKEN')
+    supplied = request.headers.get(PROFILE_HEADER)
+    return bool(token and supplied and hmac.compare_digest(supplied, token))
+
+def _should_profile(app):
+    if request.path.startswith('/api/admin/profiles'):
+        return None
+    if is_profiler_admin(app):
+        return 'header'
+    rate = app.config.get('PROFILER_SAMPLE_RATE', 0)
+    if rate and random.random() < rate:
+        return 'sampled'
+    return None
+
+def init_profiler(app, engine):
+    if not app.config.get('PROFILER_TOKEN') and not app.config.get('PROFILER_SAMPLE_RATE'):
+        return
+    _settings['dir'] = app.config.get('PROFILER_DIR') or os.path.join(app.instance_path, 'profiles')
+    _settings['keep'] = app.config.get('PROFILER_KEEP', 50)
+    interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        trigger = _should_profile(app)
+        if trigger:
+            _local.profile = RequestProfile(interval)
+            g.profile_trigger = trigger
+            _local.profile.start()
+
+    @app.after_request
+    def note_status(response):
+        if current_profile() is not None:
+            g.profile_status = response.status_code
+            response.headers['X-Ally-Profile-Id'] = current_profile().id
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc):
+        profile = current_profile()
+        if profile is None:
+            return
+        _local.profile = None
+        duration = profile.stop()
+        try:
+            save_profile(profile, {
+                'id': profile.id, 'method': request.method, 'path': request.path, 'endpoint': request.endpoint,
+                'status': g.get('profile_status', 500), 'trigger': g.get('profile_trigger'),
+                'duration_ms': round(duration * 1000, 1), 'samples': sum(profile.stacks.values()),
+                'interval_ms': profile.interval * 1000, 'created_at': int(time.time()),
+            })
+        except OSError as e:
+            print(f"!!! Could not save profile {profile.id}: {e}")
+
+# --- Storage ---
+
+def profile_paths(profile_id):
+    base = os.path.join(_settings['dir'], profile_id)
+    return f"{base}.json", f"{base}.folded"
+
+def save_profile(profile, meta):
+    os.makedirs(_settings['dir'], exist_ok=True)
+    meta_path, folded_path = profile_paths(profile.id)
+    with open(folded_path, 'w') as f:
+        for stack, count in profile.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(meta_path, 'w') as f:
+        json.dump(dict(meta, spans=profile.spans), f)
+    print(f"🔬 Profiled {meta['method']} {meta['path']} in {meta['duration_ms']} ms ({meta['samples']} samples) -> {profile.id}")
+    prune_profiles()
+
+def list_profiles():
+    """Newest first, without spans."""
+    if not _settings['dir'] or not os.path.isdir(_settings['dir']):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(_settings['dir']), reverse=True):
+        if name.endswith('.json'):
+            with open(os.path.join(_settings['dir'], name)) as f:
+                meta = json.load(f)
+            meta['spans'] = len(meta['spans'])
+            profiles.append(meta)
+    return profiles
+
+def prune_profiles():
+    names = sorted(name[:-5] for name in os.listdir(_settings['dir']) if name.endswith('.json'))
+    for profile_id in names[:-_settings['keep']]:
+        for path in profile_paths(profile_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+def read_profile(profile_id, kind):
+    """'folded' text or 'json' metadata (with spans) of a saved profile, or None."""
+    if not _settings['dir'] or not PROFILE_ID_RE.match(profile_id):
+        return None
+    meta_path, folded_path = profile_paths(profile_id)
+    path = folded_path if kind == 'folded' else meta_path
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read() if kind == 'folded' else json.load(f)
@@ -0,0 +1,172 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import jsonify, request, session
+
+# --- Rate Limiting ---
+# Token buckets per (rule, client). A rule is looked up by endpoint first
+# ("api_bp.analyse_market") and then by blueprint ("api_bp"); a blueprint rule
+# gives all of that blueprint's endpoints one shared bucket. Buckets live in
+# process memory, or in a small SQLite file when several workers must share
+# them. Blocked requests get a 429 with Retry-After.
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+DEFAULT_LIMITS = {
+    'api_bp': '120/minute',
+    'api_bp.analyse_market': '20/minute',
+    'api_bp.get_related_items': '60/minute',
+    'api_bp.get_pricing_recommendations': '5/minute',
+    'api_bp.create_listing_copy_job': '10/minute',
+    'auth_bp': '60/minute',
+    'auth_bp.login': '10/minute',
+    'auth_bp.register': '5/minute',
+    'auth_bp.forgot_password': '5/hour',
+    'general_bp.contact_form': '5/hour',
+}
+
+def parse_rate(rate):
+    """'10/minute' -> (capacity 10, refill 10/60 tokens per second). None for 'none'."""
+    if rate is None or rate == 'none':
+        return None
+    count, _, period = rate.partition('/')
+    if period not in PERIODS or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit '{rate}'")
+    return int(count), int(count) / PERIODS[period]
+
+def take_token(tokens, updated, now, capacity, refill_rate):
+    """Bucket arithmetic shared by the stores. Returns (tokens left, retry_after seconds or 0)."""
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / refill_rate
+
+class MemoryBucketStore:
+    """Per-process buckets. Idle buckets (full again) are dropped once the dict gets big."""
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens, retry_after = take_token(tokens, updated, now, capacity, refill_rate)
+            # Each bucket remembers when its own rule refills it, so pruning never resets a stricter rule early
+            full_at = now + (capacity - tokens) / refill_rate
+            self._buckets[key] = (tokens, now, full_at)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return retry_after
+
+    def _prune(self, now):
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+class SQLiteBucketStore:
+    """
+    Buckets shared by every worker on the host through one SQLite file. Each
+    take is a single short BEGIN IMMEDIATE transaction; durability is switched
+    off because losing a few buckets in a crash doesn't matter.
+    """
+    PRUNE_EVERY = 10000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, refill_rate):
+        conn = self._connection()
+        now = time.time() # wall clock: monotonic clocks aren't shared between processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, retry_after = take_token(tokens, updated, now, capacity, refill_rate)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            self._takes += 1
+            if self._takes % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - 86400,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return retry_after
+
+def create_store(storage, instance_path):
+    if storage == 'memory':
+        return MemoryBucketStore()
+    if storage == 'sqlite':
+        return SQLiteBucketStore(os.path.join(instance_path, 'rate_limits.db'))
+    if storage.startswith('sqlite:///'):
+        return SQLiteBucketStore(storage[len('sqlite:///'):])
+    raise ValueError(f"Unknown RATE_LIMIT_STORAGE '{storage}'")
+
+class RateLimiter:
+    def __init__(self):
+        self.store = None
+        self.rules = {}
+        self.client_ip_header = None
+        self._resolved = {} # endpoint -> (rule name, capacity, refill rate) or None
+
+    def init_app(self, app):
+        if not app.config.get('RATE_LIMIT_ENABLED', True):
+            return
+        self.store = create_store(app.config.get('RATE_LIMIT_STORAGE', 'memory'), app.instance_path)
+        limits = dict(DEFAULT_LIMITS, **app.config.get('RATE_LIMITS', {}))
+        self.rules = {name: parse_rate(rate) for name, rate in limits.items()}
+        self.client_ip_header = app.config.get('RATE_LIMIT_CLIENT_IP_HEADER')
+        self._resolved = {}
+        app.before_request(self.check)
+
+    def rule_for(self, endpoint):
+        if endpoint not in self._resolved:
+            name = endpoint if endpoint in self.rules else endpoint.rpartition('.')[0]
+            rule = self.rules.get(name)
+            self._resolved[endpoint] = (name,) + rule if rule else None
+        return self._resolved[endpoint]
+
+    def client_id(self):
+        # Logged-in users are limited per account; the session already holds the id, so no DB hit
+        user_id = session.get('_user_id')
+        if user_id:
+            return f"user:{user_id}"
+        if self.client_ip_header:
+            return f"ip:{request.headers.get(self.client_ip_header) or request.remote_addr}"
+        return f"ip:{request.remote_addr}"
+
+    def check(self):
+        if request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+        rule = self.rule_for(request.endpoint)
+        if rule is None:
+            return None
+        name, capacity, refill_rate = rule
+        retry_after = self.store.take(f"{name}|{self.client_id()}", capacity, refill_rate)
+        if retry_after:
+            response = jsonify({"error": "Too many requests. Please slow down and try again shortly."})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response
+        return None
+
+limiter = RateLimiter()
@@ -0,0 +1,134 @@
+from sqlalchemy import case, func, literal, select, distinct
+from ..extensions import db
+from ..models import Material, Product, RecipeItem, ProductComponent
+from .units import canonical_unit, CONVERSION_FACTORS, UNITS
+
+# --- Workshop Summary ---
+# Catalog-wide figures for the dashboard, computed by the database with
+# aggregates and joins rather than by costing every product in Python:
+#   * recipe lines are costed in SQL, with unit conversion done by a CASE
+#     built from the handful of distinct material units the user has;
+#   * sub-assemblies are expanded with a recursive CTE, so a product's total
+#     cost is SUM(multiplier * (direct material cost + labour)) over itself
+#     and everything below it.
+# Totals are summed unrounded, so they can differ from /api/workshop (which
+# rounds at every level) by a cent or so.
+
+TOP_COUNT = 10
+
+def unit_factor(material_units):
+    """
+    SQL expression: multiplier from the recipe line's unit to its material's
+    unit, NULL for lines whose unit no longer converts (left out, as in costing).
+    """
+    whens = [(RecipeItem.unit.is_(None), literal(1.0))]
+    for raw_unit in material_units:
+        material_unit = canonical_unit(raw_unit)
+        dimension = UNITS.get(material_unit, (None,))[0]
+        recipe_units = {material_unit: 1.0}
+        if dimension:
+            recipe_units.update({unit: CONVERSION_FACTORS[(unit, material_unit)] for unit, (dim, _) in UNITS.items() if dim == dimension})
+        for recipe_unit, factor in recipe_units.items():
+            whens.append(((Material.unit == raw_unit) & (RecipeItem.unit == recipe_unit), literal(factor)))
+    return case(*whens, else_=None)
+
+def workshop_summary(user_id):
+    material_units = [unit for (unit,) in db.session.query(distinct(Material.unit)).filter(Material.user_id == user_id)]
+    factor = unit_factor(material_units)
+    cost_per_unit = case((Material.quantity > 0, Material.cost / Material.quantity), else_=0)
+    line_cost = RecipeItem.quantity * factor * cost_per_unit
+    user_lines = (
+        select(RecipeItem.product_id, RecipeItem.material_id, line_cost.label('cost'), factor.label('factor'))
+        .join(Material, Material.id == RecipeItem.material_id)
+        .where(Material.user_id == user_id)
+        .subquery()
+    )
+
+    # Direct material cost per product
+    direct = (
+        select(user_lines.c.product_id, func.sum(user_lines.c.cost).label('material_cost'))
+        .group_by(user_lines.c.product_id)
+        .subquery()
+    )
+
+    # (root product, product in its tree, how many of it one root needs)
+    expand = (
+        select(Product.id.label('root_id'), Product.id.label('product_id'), literal(1.0).label('multiplier'))
+        .where(Product.user_id == user_id)
+        .cte('expand', recursive=True)
+    )
+    expand = expand.union_all(
+        select(expand.c.root_id, ProductComponent.component_id, expand.c.multiplier * ProductComponent.quantity)
+        .join(ProductComponent, ProductComponent.product_id == expand.c.product_id)
+    )
+    part = Product.__table__.alias('part')
+    totals = (
+        select(
+            expand.c.root_id,
+            func.sum(expand.c.multiplier * (func.coalesce(direct.c.material_cost, 0) + part.c.labour_hours * part.c.hourly_rate)).label('total_cost'),
+        )
+        .join(part, part.c.id == expand.c.product_id)
+        .outerjoin(direct, direct.c.product_id == expand.c.product_id)
+        .group_by(expand.c.root_id)
+        .subquery()
+    )
+    profit = totals.c.total_cost * Product.profit_margin / 100
+    costed = (
+        select(Product.id, Product.name, totals.c.total_cost, profit.label('profit'))
+        .join(totals, totals.c.root_id == Product.id)
+        .subquery()
+    )
+
+    material_count, material_spend = db.session.execute(
+        select(func.count(Material.id), func.coalesce(func.sum(Material.cost), 0)).where(Material.user_id == user_id)
+    ).one()
+    product_count, average_markup, average_margin = db.session.execute(
+        select(func.count(Product.id), func.avg(Product.profit_margin),
+               func.avg(case((Product.profit_margin > -100, Product.profit_margin * 100 / (100 + Product.profit_margin)), else_=None)))
+        .where(Product.user_id == user_id)
+    ).one()
+
+    # One pass over the recipe lines per material: usage, cost and unit errors
+    by_material = db.session.execute(
+        select(Material.id, Material.name, func.count(distinct(user_lines.c.product_id)).label('products'),
+               func.coalesce(func.sum(user_lines.c.cost), 0).label('cost'),
+               func.count().label('lines'), func.count(user_lines.c.factor).label('converted'))
+        .join(user_lines, user_lines.c.material_id == Material.id)
+        .group_by(Material.id, Material.name)
+    ).all()
+    most_used = sorted(by_material, key=lambda row: (-row.products, row.id))[:TOP_COUNT]
+
+    # One pass over the expanded product trees: the catalog totals ride along as window sums
+    least_profitable = db.session.execute(
+        select(costed.c.id, costed.c.name, costed.c.total_cost, costed.c.profit,
+               func.sum(costed.c.total_cost).over().label('catalog_cost'), func.sum(costed.c.profit).over().label('catalog_profit'))
+        .order_by(costed.c.profit, costed.c.id)
+        .limit(TOP_COUNT)
+    ).all()
+    catalog_cost = least_profitable[0].catalog_cost if least_profitable else 0
+    catalog_profit = least_profitable[0].catalog_profit if least_profitable else 0
+
+    return {
+        "materials": {"count": material_count, "total_spend": round(material_spend, 2)},
+        "products": {
+            "count": product_count,
+            "average_markup_percent": round(average_markup, 2) if average_markup is not None else None,
+            # Margin at the suggested price depends only on the markup: m / (100 + m)
+            "average_margin_percent": round(average_margin, 2) if average_margin is not None else None,
+            "total_unit_cost": round(catalog_cost, 2),
+            "total_unit_profit": round(catalog_profit, 2),
+        },
+        "recipe_lines": {
+            "count": sum(row.lines for row in by_material),
+            "unit_errors": sum(row.lines - row.converted for row in by_material),
+        },
+        "most_used_materials": [
+            {"id": row.id, "name": row.name, "products": row.products, "cost_in_recipes": round(row.cost, 2)}
+            for row in most_used
+        ],
+        "least_profitable_products": [
+            {"id": row.id, "name": row.name, "total_cost": round(row.total_cost, 2),
+             "suggested_price": round(row.total_cost + row.profit, 2), "profit": round(row.profit, 2)}
+            for row in least_profitable
+        ],
+    }
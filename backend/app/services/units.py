@@ -0,0 +1,70 @@
+from functools import lru_cache
+
+# --- Unit Registry ---
+# Every unit belongs to a dimension and has a factor to that dimension's base
+# unit (g, ml, cm, unit). All pairwise conversion factors are precomputed at
+# import, so costing only ever does a dict lookup per recipe line.
+
+class UnitConversionError(ValueError):
+    """Raised when two units can't be converted (different dimensions or unknown)."""
+
+UNITS = {
+    # mass (base: g)
+    'mg': ('mass', 0.001), 'g': ('mass', 1.0), 'kg': ('mass', 1000.0),
+    'oz': ('mass', 28.349523125), 'lb': ('mass', 453.59237),
+    # volume (base: ml)
+    'ml': ('volume', 1.0), 'cl': ('volume', 10.0), 'l': ('volume', 1000.0),
+    'tsp': ('volume', 4.92892159375), 'tbsp': ('volume', 14.78676478125), 'fl oz': ('volume', 29.5735295625),
+    # length (base: cm)
+    'mm': ('length', 0.1), 'cm': ('length', 1.0), 'm': ('length', 100.0),
+    'in': ('length', 2.54), 'ft': ('length', 30.48),
+    # count (base: unit)
+    'unit': ('count', 1.0), 'pair': ('count', 2.0), 'dozen': ('count', 12.0),
+}
+
+ALIASES = {
+    'gram': 'g', 'grams': 'g', 'gm': 'g', 'gms': 'g', 'kilo': 'kg', 'kilos': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'milligram': 'mg', 'milligrams': 'mg', 'ounce': 'oz', 'ounces': 'oz', 'lbs': 'lb', 'pound': 'lb', 'pounds': 'lb',
+    'millilitre': 'ml', 'millilitres': 'ml', 'milliliter': 'ml', 'milliliters': 'ml',
+    'litre': 'l', 'litres': 'l', 'liter': 'l', 'liters': 'l', 'ltr': 'l', 'floz': 'fl oz', 'fl. oz': 'fl oz',
+    'millimetre': 'mm', 'centimetre': 'cm', 'metre': 'm', 'metres': 'm', 'meter': 'm', 'meters': 'm',
+    'inch': 'in', 'inches': 'in', 'foot': 'ft', 'feet': 'ft',
+    'units': 'unit', 'pc': 'unit', 'pcs': 'unit', 'piece': 'unit', 'pieces': 'unit', 'each': 'unit', 'item': 'unit', 'items': 'unit',
+    'pairs': 'pair',
+}
+
+# (from_unit, to_unit) -> multiplier, for every pair within the same dimension
+CONVERSION_FACTORS = {
+    (from_unit, to_unit): from_factor / to_factor
+    for from_unit, (from_dim, from_factor) in UNITS.items()
+    for to_unit, (to_dim, to_factor) in UNITS.items()
+    if from_dim == to_dim
+}
+
+@lru_cache(maxsize=1024)
+def canonical_unit(unit):
+    """Maps free-text units ('Grams', ' KG ') to registry names; unknown units are returned trimmed."""
+    if unit is None:
+        return None
+    cleaned = " ".join(unit.strip().lower().split())
+    return ALIASES.get(cleaned, cleaned)
+
+def is_known_unit(unit):
+    return canonical_unit(unit) in UNITS
+
+def dimension_of(unit):
+    entry = UNITS.get(canonical_unit(unit))
+    return entry[0] if entry else None
+
+def conversion_factor(from_unit, to_unit):
+    """
+    Multiplier turning a quantity in `from_unit` into `to_unit`. Identical
+    (including unknown, free-text) units convert 1:1.
+    """
+    from_unit, to_unit = canonical_unit(from_unit), canonical_unit(to_unit)
+    if from_unit == to_unit:
+        return 1.0
+    factor = CONVERSION_FACTORS.get((from_unit, to_unit))
+    if factor is None:
+        raise UnitConversionError(f"Can't convert '{from_unit}' to '{to_unit}'")
+    return factor
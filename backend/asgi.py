@@ -0,0 +1,5 @@
+# ASGI entry point: serves the eBay-bound endpoints asynchronously (see app/asgi.py).
+# Run with e.g. `uvicorn asgi:app --port 5000`; run.py remains the WSGI entry.
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,107 @@
+"""
+How many concurrent /api/analyse requests one worker gets through when every
+request waits on a slow eBay Browse call: the WSGI app on a fixed number of
+threads vs the ASGI app (app/asgi.py) on one event loop.
+
+eBay is replaced by a local fake server that answers after UPSTREAM_LATENCY.
+
+Usage (from backend/):
+    python benchmarks/bench_async_capacity.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.asgi import AllyASGI
+
+UPSTREAM_LATENCY = 0.3 # seconds per Browse call
+REQUESTS = 200
+WSGI_THREADS = 4 # a typical worker's thread count
+
+class FakeEbay(BaseHTTPRequestHandler):
+    def _json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._json({"access_token": "fake", "expires_in": 7200})
+
+    def do_GET(self):
+        time.sleep(UPSTREAM_LATENCY)
+        self._json({"itemSummaries": [
+            {"itemId": f"v1|{i}|0", "title": f"Jesmonite tray {i}", "price": {"value": str(10 + i), "currency": "GBP"}}
+            for i in range(50)
+        ]})
+
+    def log_message(self, *args):
+        pass
+
+def start_fake_ebay():
+    ThreadingHTTPServer.request_queue_size = 512
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeEbay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def make_app(base_url):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{db_path}", 'EBAY_API_BASE': base_url,
+        'EBAY_PROD_CLIENT_ID': 'id', 'EBAY_PROD_CLIENT_SECRET': 'secret',
+        'RATE_LIMIT_ENABLED': False, 'RELATED_PREFETCH_COUNT': 0,
+    })
+
+def bench_wsgi(flask_app, run_id):
+    local = threading.local()
+    # Latency counts from when all requests arrive, so time spent queueing for a thread is included
+    start = time.perf_counter()
+    def one(i):
+        if not hasattr(local, 'client'):
+            local.client = flask_app.test_client()
+        assert local.client.get(f"/api/analyse?query=wsgi+{run_id}+{i}").status_code == 200
+        return time.perf_counter() - start
+    with ThreadPoolExecutor(max_workers=WSGI_THREADS) as pool:
+        latencies = list(pool.map(one, range(REQUESTS)))
+    return time.perf_counter() - start, latencies
+
+async def asgi_get(asgi_app, path, query):
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(), 'headers': [],
+             'http_version': '1.1', 'scheme': 'http', 'server': ('localhost', 80), 'client': ('127.0.0.1', 1234)}
+    sent = []
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        sent.append(message)
+    start = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    assert sent[0]['status'] == 200, sent
+    return time.perf_counter() - start
+
+async def bench_asgi(asgi_app, run_id):
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(asgi_get(asgi_app, '/api/analyse', f"query=asgi+{run_id}+{i}") for i in range(REQUESTS)))
+    return time.perf_counter() - start, latencies
+
+def report(label, elapsed, latencies):
+    latencies = sorted(latencies)
+    print(f"{label:<28} {REQUESTS / elapsed:7.1f} req/s   p50 {latencies[len(latencies) // 2] * 1000:7.0f} ms   "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.0f} ms")
+
+if __name__ == '__main__':
+    flask_app = make_app(start_fake_ebay())
+    print(f"{REQUESTS} concurrent requests, eBay answering in {UPSTREAM_LATENCY * 1000:.0f} ms")
+    report(f"WSGI, {WSGI_THREADS} threads", *bench_wsgi(flask_app, 1))
+    report("ASGI, 1 event loop", *asyncio.run(bench_asgi(AllyASGI(flask_app), 1)))
@@ -0,0 +1,45 @@
+"""
+Size and encode/decode time of the binary listing codec against JSON, for
+cached market snapshots of 100 to 10,000 listings.
+
+Usage (from backend/):
+    python benchmarks/bench_listing_codec.py
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.listing_codec import encode_listings, decode_listings
+from bench_listing_filter import make_listings
+
+def time_ms(func, arg, runs):
+    func(arg)  # warm up
+    start = time.perf_counter()
+    for _ in range(runs):
+        func(arg)
+    return (time.perf_counter() - start) * 1000 / runs
+
+def dict_bytes(make):
+    """Heap held by the decoded Python objects, which is what an uncompressed cache keeps."""
+    tracemalloc.start()
+    value = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+if __name__ == '__main__':
+    print(f"{'listings':>8} {'dicts':>10} {'json':>10} {'codec':>9} | {'json enc':>9} {'json dec':>9} | {'enc':>8} {'dec':>8}")
+    for count in (100, 1000, 5000, 10000):
+        listings = make_listings(count)
+        runs = max(3, 2000 // count)
+        as_json = json.dumps(listings).encode()
+        encoded = encode_listings(listings)
+        assert decode_listings(encoded) == listings
+        print(f"{count:>8} {dict_bytes(lambda: json.loads(as_json)):>10,} {len(as_json):>10,} {len(encoded):>9,} | "
+              f"{time_ms(lambda l: json.dumps(l).encode(), listings, runs):>7.2f}ms {time_ms(json.loads, as_json, runs):>7.2f}ms | "
+              f"{time_ms(encode_listings, listings, runs):>6.2f}ms {time_ms(decode_listings, encoded, runs):>6.2f}ms")
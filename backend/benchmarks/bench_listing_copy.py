@@ -0,0 +1,53 @@
+"""
+Throughput, latency and token cost of the listing-copy generator, using the
+offline stub backend with a simulated model round trip.
+
+Usage (from backend/):
+    python benchmarks/bench_listing_copy.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.cache import TTLCache
+from app.services.copywriter import ListingCopyGenerator, StubCopyBackend, product_attributes, copy_cache_key
+
+MODEL_LATENCY = 0.25 # seconds per call
+PRODUCTS = 40
+INPUT_COST_PER_1K, OUTPUT_COST_PER_1K = 0.00015, 0.0006
+
+def make_items(count):
+    items = []
+    for i in range(count):
+        attrs = product_attributes(f"Jesmonite tray {i}", ["Jesmonite AC100", "Pigment"], [])
+        items.append((copy_cache_key(attrs), attrs))
+    return items
+
+def make_generator(batch_size):
+    return ListingCopyGenerator(StubCopyBackend(latency=MODEL_LATENCY), TTLCache(ttl=3600), batch_size,
+                                INPUT_COST_PER_1K, OUTPUT_COST_PER_1K)
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    items = make_items(PRODUCTS)
+    for batch_size in (1, 5, 10, 20):
+        generator = make_generator(batch_size)
+        cold = timed(lambda: generator.generate(items))
+        warm = timed(lambda: generator.generate(items))
+        m = generator.metrics.snapshot()
+        print(f"batch {batch_size:>2}: cold {cold:6.2f} s, warm {warm * 1000:6.2f} ms, "
+              f"{m['batches']:>2} calls, ${m['cost_per_listing_usd']:.6f}/listing, {m['avg_latency_per_listing_ms']} ms/listing")
+
+    # Four requests for the same products at once: only one of them calls the model
+    generator = make_generator(10)
+    threads = [threading.Thread(target=generator.generate, args=(items,)) for _ in range(4)]
+    elapsed = timed(lambda: ([t.start() for t in threads], [t.join() for t in threads]))
+    m = generator.metrics.snapshot()
+    print(f"4 concurrent identical requests: {elapsed:.2f} s, {m['batches']} calls, {m['joined_in_flight']} joined in flight")
@@ -0,0 +1,52 @@
+"""
+Timing for the listing relevance filter over synthetic eBay titles.
+
+Usage (from backend/):
+    python benchmarks/bench_listing_filter.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.listing_filter import filter_listings
+
+QUERY = "jesmonite tray"
+ADJECTIVES = ["handmade", "grey", "terrazzo", "round", "square", "marble", "pink", "white", "speckled",
+              "large", "small", "mini", "scalloped", "wavy", "oval", "rectangle", "eco", "neutral"]
+NOUNS = ["tray", "coaster", "dish", "trinket", "catchall", "plate", "candle", "holder", "planter", "vase"]
+FILLER = [f"word{i}" for i in range(400)]
+
+def make_listings(count, seed=7):
+    rng = random.Random(seed)
+    listings = []
+    while len(listings) < count:
+        words = rng.sample(ADJECTIVES, 3) + rng.sample(NOUNS, 1) + rng.sample(FILLER, 4)
+        if rng.random() < 0.7:
+            words.insert(0, "jesmonite")
+        if rng.random() < 0.05:
+            words.append("bundle")
+        title = " ".join(words).title()
+        # Sellers relisting the same item with a small tweak
+        for copy in range(rng.choice([1, 1, 1, 2, 3])):
+            listing_title = title if copy == 0 else f"{title} {rng.choice(['UK', 'Gift', 'New'])}"
+            listings.append({
+                'listing_id': f"v1|{len(listings)}|0",
+                'title': listing_title,
+                'price': {'amount': rng.randint(500, 4000), 'divisor': 100, 'currency_code': 'GBP'},
+                'source': 'eBay'
+            })
+    return listings[:count]
+
+if __name__ == '__main__':
+    for count in (100, 1000, 5000, 10000):
+        listings = make_listings(count)
+        filter_listings(listings, QUERY)  # warm up
+        runs = 5
+        start = time.perf_counter()
+        for _ in range(runs):
+            curated, stats = filter_listings(listings, QUERY)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / runs
+        print(f"{count:>6} titles: {elapsed_ms:7.2f} ms  {stats}")
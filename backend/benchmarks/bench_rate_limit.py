@@ -0,0 +1,46 @@
+"""
+Per-request overhead of the rate limiter, for each bucket store.
+
+Usage (from backend/):
+    python benchmarks/bench_rate_limit.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from app.services.rate_limit import RateLimiter
+
+CHECKS = 20000
+CLIENTS = 500
+
+def bench(storage):
+    app = Flask(__name__, instance_path=tempfile.mkdtemp())
+    app.config.update(RATE_LIMIT_STORAGE=storage, RATE_LIMITS={'bench': '1000000/second'})
+    limiter = RateLimiter()
+    limiter.init_app(app)
+    app.add_url_rule('/api/bench', 'bench', lambda: 'ok')
+
+    # Just the before_request hook, without the rest of Flask's dispatch
+    contexts = [app.test_request_context('/api/bench', environ_base={'REMOTE_ADDR': f"10.0.{i // 256}.{i % 256}"}) for i in range(CLIENTS)]
+    for ctx in contexts:
+        ctx.push()
+        limiter.check()
+        ctx.pop()
+
+    elapsed = 0.0
+    for i in range(CHECKS):
+        ctx = contexts[i % CLIENTS]
+        ctx.push()
+        start = time.perf_counter()
+        limiter.check()
+        elapsed += time.perf_counter() - start
+        ctx.pop()
+    return elapsed / CHECKS * 1e6
+
+if __name__ == '__main__':
+    for storage in ('memory', 'sqlite'):
+        print(f"{storage:>6}: {bench(storage):6.1f} µs per check")
@@ -34,7 +34,7 @@ export default function Home() {
         activeTab, setActiveTab,
         activeAnalysisTab, setActiveAnalysisTab,
         handleAnalyse,
-        sortedEbayListings,
+        sortedEbayListings, sortedCuratedListings,
         displayMode, setDisplayMode,
         paginationCount, setPaginationCount,        
         isProductListOpen, setIsProductListOpen,
@@ -45,15 +45,16 @@ export default function Home() {
     } = useArtisanAlly();
 
     // --- Create the curated and paginated lists to display ---
+    // The curated snapshot is drawn from the backend's filtered listings (no bundles or duplicates)
     let curatedList: Listing[] = [];
-    if (sortedEbayListings.length > 6) {
-        const lowCost = sortedEbayListings.slice(0, 2);
-        const midIndex = Math.floor(sortedEbayListings.length / 2);
-        const midCost = sortedEbayListings.slice(midIndex - 1, midIndex + 1);
-        const highCost = sortedEbayListings.slice(-2);
+    if (sortedCuratedListings.length > 6) {
+        const lowCost = sortedCuratedListings.slice(0, 2);
+        const midIndex = Math.floor(sortedCuratedListings.length / 2);
+        const midCost = sortedCuratedListings.slice(midIndex - 1, midIndex + 1);
+        const highCost = sortedCuratedListings.slice(-2);
         curatedList = [...lowCost, ...midCost, ...highCost];
     } else {
-        curatedList = sortedEbayListings;
+        curatedList = sortedCuratedListings;
     }
 
     const paginatedList = sortedEbayListings.slice(0, paginationCount);
@@ -344,7 +345,8 @@ export default function Home() {
                                                             {workshopData.materials.map(m => <option key={m.id} value={m.id}>{m.name}</option>)}
                                                         </select>
                                                         <input type="number" placeholder="Qty" step="0.01" value={item.quantity} onChange={e => handleRecipeChange(index, 'quantity', e.target.value)} className="w-1/4 mt-1 block px-3 py-2 border border-gray-300 rounded-md"/>
-                                                        <span className="w-1/4 text-sm text-gray-500 pl-1">{selectedMaterial?.unit || ''}</span>
+                                                        {/* Optional: leave blank to use the material's own unit (e.g. use 'g' for a material bought in 'kg') */}
+                                                        <input type="text" placeholder={selectedMaterial?.unit || 'unit'} value={item.unit || ''} onChange={e => handleRecipeChange(index, 'unit', e.target.value)} className="w-1/4 mt-1 block px-3 py-2 border border-gray-300 rounded-md text-sm"/>
                                                         <button type="button" onClick={() => removeRecipeItem(index)} className="text-red-500 hover:text-red-700 font-bold px-2">X</button>
                                                     </div>
                                                 );
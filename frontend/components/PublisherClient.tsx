@@ -8,6 +8,17 @@ import { useRouter, useSearchParams } from 'next/navigation';
 // const API_URL = process.env.NEXT_PUBLIC_API_URL;
 const API_URL = '';
 
+interface EbayOffer {
+    id: number;
+    sku: string;
+    offer_id: string | null;
+    status: string;
+    listing_status: string | null;
+    price: number | null;
+    currency: string | null;
+    synced_at: number | null;
+}
+
 export default function PublisherClient() {
     const { user, isLoading: isAuthLoading } = useAuth();
     const router = useRouter();
@@ -21,6 +32,7 @@ export default function PublisherClient() {
     const [isSubmitting, setIsSubmitting] = useState(false);
     const [submitStatus, setSubmitStatus] = useState<'success' | 'error' | null>(null);
     const [submitMessage, setSubmitMessage] = useState('');
+    const [offers, setOffers] = useState<EbayOffer[]>([]);
 
     useEffect(() => {
         if (searchParams.get('success')) {
@@ -32,6 +44,22 @@ export default function PublisherClient() {
         }
     }, [searchParams, router]);
 
+    // Statuses come from our own database (kept fresh by the backend sync job), not from eBay
+    const loadOffers = async () => {
+        try {
+            const response = await fetch(`/api/ebay/offers`, { credentials: 'include' });
+            if (!response.ok) return;
+            const data = await response.json();
+            setOffers(data.offers);
+        } catch (_err) {
+            console.error(_err);
+        }
+    };
+
+    useEffect(() => {
+        if (user?.has_ebay_token) loadOffers();
+    }, [user]);
+
     const handleEbayAuth = async () => {
         setIsConnecting(true);
         try {
@@ -66,6 +94,7 @@ export default function PublisherClient() {
                 setSubmitStatus('success');
                 setSubmitMessage(`Success! Draft listing created with Offer ID: ${data.offerId}. You can now find this draft in your eBay account.`);
                 setTitle(''); setDescription(''); setPrice('');
+                loadOffers();
             }
         } catch (_err) {
             setSubmitStatus('error');
@@ -117,6 +146,19 @@ export default function PublisherClient() {
                                 {isSubmitting ? 'Creating Draft...' : 'Create Draft on eBay'}
                             </button>
                         </form>
+                        {offers.length > 0 && (
+                            <div className="mt-8">
+                                <h3 className="text-lg font-semibold text-gray-800 mb-2">Your eBay Offers</h3>
+                                <ul className="divide-y divide-gray-200 text-sm">
+                                    {offers.map((offer) => (
+                                        <li key={offer.id} className="py-2 flex justify-between gap-4">
+                                            <span className="text-gray-700 truncate">{offer.sku}{offer.price !== null && ` · ${offer.price.toFixed(2)} ${offer.currency ?? ''}`}</span>
+                                            <span className="font-medium text-gray-600">{offer.listing_status || offer.status}</span>
+                                        </li>
+                                    ))}
+                                </ul>
+                            </div>
+                        )}
                     </div>
                 ) : (
                     <div className="text-center">
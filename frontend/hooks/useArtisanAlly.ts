@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect, FormEvent } from 'react';
+import { useState, useEffect, useRef, FormEvent } from 'react';
 import { useAuth } from '@/context/AuthContext';
 import { useRouter } from 'next/navigation';
 
@@ -9,20 +9,36 @@ type Listing = { listing_id: string | number; title: string; price: { amount: nu
 type AnalysisBreakdown = { count: number; average_price: number; min_price: number; max_price: number; };
 type ProfitScenario = { name: string; price: number; profit: number; };
 type Material = { id: number; name: string; cost: number; quantity: number; unit: string; cost_per_unit?: number; };
-type RecipeItem = { material_id: string; quantity: string; };
+type RecipeItem = { material_id: string; quantity: string; unit?: string; };
 type Product = { 
     id: number; 
     name: string; 
-    recipe: { material_id: number; quantity: number }[];
+    recipe: { material_id: number; quantity: number; unit?: string | null }[];
+    components?: { product_id: number; quantity: number }[];
     labour_hours: number;
     hourly_rate: number;
     profit_margin: number;
     material_cost: number;
+    component_cost?: number;
     labour_cost: number;
     total_cost: number;
     suggested_price: number;
 };
 type WorkshopData = { materials: Material[]; products: Product[]; };
+type WorkshopDelta = {
+    seq: number;
+    reset?: boolean;
+    materials: { upserted: Material[]; deleted: number[]; };
+    products: { upserted: Product[]; deleted: number[]; };
+};
+
+// --- Applies upserted/deleted rows from /api/workshop/changes to a list ---
+const mergeById = <T extends { id: number }>(rows: T[], upserted: T[], deleted: number[]): T[] => {
+    const updates = new Map(upserted.map(row => [row.id, row]));
+    const merged = rows.filter(row => !deleted.includes(row.id)).map(row => updates.get(row.id) ?? row);
+    const existingIds = new Set(rows.map(row => row.id));
+    return [...merged, ...upserted.filter(row => !existingIds.has(row.id))];
+};
 
 // const API_URL = process.env.NEXT_PUBLIC_API_URL;
 const API_URL = '';
@@ -40,6 +56,7 @@ export const useArtisanAlly = () => {
     const [isProductListOpen, setIsProductListOpen] = useState(false);
     
     const [ebayListings, setEbayListings] = useState<Listing[]>([]);
+    const [ebayCuratedListings, setEbayCuratedListings] = useState<Listing[]>([]);
     const [overallAnalysis, setOverallAnalysis] = useState<AnalysisBreakdown | null>(null);
     const [ebayAnalysis, setEbayAnalysis] = useState<AnalysisBreakdown | null>(null);
     const [scenarios, setScenarios] = useState<ProfitScenario[]>([]);
@@ -77,6 +94,9 @@ export const useArtisanAlly = () => {
         else setCurrencySymbol('£');
     }, [user?.currency]);
 
+    // Last change sequence we've applied; lets us fetch only what changed after an edit
+    const workshopSeq = useRef(0);
+
     const fetchWorkshopData = async () => {
         setIsWorkshopLoading(true);
         try {
@@ -85,11 +105,27 @@ export const useArtisanAlly = () => {
                 if (response.status === 401) { setWorkshopData({ materials: [], products: [] }); return; }
                 throw new Error("Failed to fetch workshop data");
             }
-            const data = await response.json(); setWorkshopData(data);
+            const data = await response.json();
+            setWorkshopData({ materials: data.materials, products: data.products });
+            workshopSeq.current = data.seq ?? 0;
         } catch (err) { console.error(err);
         } finally { setIsWorkshopLoading(false); }
     };
 
+    const syncWorkshopData = async () => {
+        try {
+            const response = await fetch(`${API_URL}/api/workshop/changes?since=${workshopSeq.current}`, { credentials: 'include' });
+            if (!response.ok) throw new Error("Failed to sync workshop data");
+            const delta: WorkshopDelta = await response.json();
+            if (delta.reset) { await fetchWorkshopData(); return; }
+            setWorkshopData(prev => ({
+                materials: mergeById(prev.materials, delta.materials.upserted, delta.materials.deleted),
+                products: mergeById(prev.products, delta.products.upserted, delta.products.deleted),
+            }));
+            workshopSeq.current = delta.seq;
+        } catch (err) { console.error(err); fetchWorkshopData(); }
+    };
+
     useEffect(() => {
         if (user) { fetchWorkshopData(); } 
         else { setWorkshopData({ materials: [], products: [] }); setIsWorkshopLoading(false); }
@@ -108,7 +144,7 @@ export const useArtisanAlly = () => {
 
     const handleAnalyse = async () => {
         if (!totalCost) { setError("Please enter your product's total cost first."); return; }
-        setIsLoading(true); setError(''); setEbayListings([]);
+        setIsLoading(true); setError(''); setEbayListings([]); setEbayCuratedListings([]);
         setOverallAnalysis(null); setEbayAnalysis(null);
         setScenarios([]); setActiveTab('analysis');
         setActiveAnalysisTab('ebay'); setDisplayMode('curated'); setPaginationCount(50);
@@ -119,6 +155,7 @@ export const useArtisanAlly = () => {
             const analysisData = await response.json();
             
             setEbayListings(analysisData.listings.ebay);
+            setEbayCuratedListings(analysisData.listings.ebay_curated || analysisData.listings.ebay);
             setOverallAnalysis(analysisData.analysis.overall);
             setEbayAnalysis(analysisData.analysis.ebay);
             setScenarios(analysisData.profit_scenarios);
@@ -140,9 +177,21 @@ export const useArtisanAlly = () => {
         setIsProductListOpen(true);
     };
 
-    const filteredProducts = workshopData.products.filter(product => 
-        product.name.toLowerCase().includes(searchTerm.toLowerCase())
-    );
+    // --- Product combobox: the backend searches (and costs) just the matching page ---
+    const [filteredProducts, setFilteredProducts] = useState<Product[]>([]);
+    useEffect(() => {
+        if (!user || !isProductListOpen) return;
+        const controller = new AbortController();
+        const timer = setTimeout(async () => {
+            try {
+                const response = await fetch(`${API_URL}/api/products?limit=20&q=${encodeURIComponent(searchTerm)}`, { credentials: 'include', signal: controller.signal });
+                if (!response.ok) throw new Error("Failed to search products");
+                const data = await response.json();
+                setFilteredProducts(data.products);
+            } catch (err) { if ((err as Error).name !== 'AbortError') console.error(err); }
+        }, 200);
+        return () => { clearTimeout(timer); controller.abort(); };
+    }, [searchTerm, isProductListOpen, user]);
     
     const openMaterialModal = (material: Material | null = null) => {
         if (material) {
@@ -163,7 +212,7 @@ export const useArtisanAlly = () => {
         try {
             const response = await fetch(url, { method: method, headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(materialData), credentials: 'include' });
             if (!response.ok) throw new Error(`Failed to ${method} material`);
-            fetchWorkshopData(); closeMaterialModal();
+            syncWorkshopData(); closeMaterialModal();
         } catch (err) { console.error(err); setError(`Failed to save material.`); }
     };
     const openProductModal = (product: Product | null = null) => {
@@ -171,7 +220,7 @@ export const useArtisanAlly = () => {
             setEditingProduct(product);
             setProductForm({
                 name: product.name,
-                recipe: product.recipe.map(r => ({ material_id: String(r.material_id), quantity: String(r.quantity) })),
+                recipe: product.recipe.map(r => ({ material_id: String(r.material_id), quantity: String(r.quantity), unit: r.unit || '' })),
                 labourHours: String(product.labour_hours), hourlyRate: String(product.hourly_rate), profitMargin: String(product.profit_margin)
             });
         } else {
@@ -185,7 +234,7 @@ export const useArtisanAlly = () => {
         e.preventDefault();
         const productData = { 
             name: productForm.name, 
-            recipe: productForm.recipe.filter(item => item.material_id && item.quantity).map(item => ({ material_id: parseInt(item.material_id), quantity: parseFloat(item.quantity) })),
+            recipe: productForm.recipe.filter(item => item.material_id && item.quantity).map(item => ({ material_id: parseInt(item.material_id), quantity: parseFloat(item.quantity), unit: item.unit || null })),
             labour_hours: parseFloat(productForm.labourHours) || 0,
             hourly_rate: parseFloat(productForm.hourlyRate) || 0,
             profit_margin: parseFloat(productForm.profitMargin) || 100,
@@ -196,7 +245,7 @@ export const useArtisanAlly = () => {
             try {
                 const response = await fetch(url, { method: method, headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(productData), credentials: 'include' });
                 if (!response.ok) throw new Error(`Failed to ${method} product`);
-                fetchWorkshopData(); closeProductModal();
+                syncWorkshopData(); closeProductModal();
             } catch (err) { console.error(err); setError("Failed to save product."); }
         }
     };
@@ -205,7 +254,7 @@ export const useArtisanAlly = () => {
         try {
             const response = await fetch(`${API_URL}/api/materials/${materialId}`, { method: 'DELETE', credentials: 'include' });
             if (!response.ok) throw new Error('Failed to delete material.');
-            fetchWorkshopData();
+            syncWorkshopData();
         } catch (err) { console.error(err); setError('Could not delete the material.'); }
     };
     const handleDeleteProduct = async (productId: number) => {
@@ -213,14 +262,14 @@ export const useArtisanAlly = () => {
         try {
             const response = await fetch(`${API_URL}/api/products/${productId}`, { method: 'DELETE', credentials: 'include' });
             if (!response.ok) throw new Error('Failed to delete product.');
-            fetchWorkshopData();
+            syncWorkshopData();
         } catch (err) { console.error(err); setError('Could not delete the product.'); }
     };
     const handleFindSimilar = async (itemId: string | number, title: string) => {
         setIsRelatedModalOpen(true); setIsRelatedLoading(true); setSelectedListingTitle(title);
         setRelatedItems([]); setError('');
         try {
-            const response = await fetch(`${API_URL}/api/related-items/${itemId}`);
+            const response = await fetch(`${API_URL}/api/related-items/${itemId}?marketplace=${marketplace}`);
             if (!response.ok) throw new Error("Failed to fetch related items.");
             const data = await response.json(); setRelatedItems(data.listings || []);
         } catch (err) {
@@ -228,7 +277,7 @@ export const useArtisanAlly = () => {
             setTimeout(() => { setIsRelatedModalOpen(false); setError(''); }, 2000);
         } finally { setIsRelatedLoading(false); }
     };
-    const handleRecipeChange = (index: number, field: 'material_id' | 'quantity', value: string) => {
+    const handleRecipeChange = (index: number, field: 'material_id' | 'quantity' | 'unit', value: string) => {
         const updatedRecipe = [...productForm.recipe];
         updatedRecipe[index] = { ...updatedRecipe[index], [field]: value };
         setProductForm(prev => ({...prev, recipe: updatedRecipe}));
@@ -241,6 +290,7 @@ export const useArtisanAlly = () => {
     const addRecipeItem = () => { setProductForm(prev => ({...prev, recipe: [...prev.recipe, { material_id: '', quantity: '' }]})) };
     
     const sortedEbayListings = [...ebayListings].sort((a, b) => (a.price.amount / a.price.divisor) - (b.price.amount / b.price.divisor));
+    const sortedCuratedListings = [...ebayCuratedListings].sort((a, b) => (a.price.amount / a.price.divisor) - (b.price.amount / b.price.divisor));
 
     return {
         user, isAuthLoading, router,
@@ -266,7 +316,7 @@ export const useArtisanAlly = () => {
         activeTab, setActiveTab,
         activeAnalysisTab, setActiveAnalysisTab,
         handleAnalyse,
-        sortedEbayListings,
+        sortedEbayListings, sortedCuratedListings,
         displayMode, setDisplayMode,
         paginationCount, setPaginationCount,
         isProductListOpen, setIsProductListOpen,